@@ -1,7 +1,7 @@
-from langchain_pymupdf4llm import PyMuPDF4LLMLoader
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 from schema import GraphState, CandidateProfile
+from services.pdf_extraction import extract_pdf_file
 from dotenv import load_dotenv
 import os
 import json
@@ -15,10 +15,8 @@ def parser_node(state: GraphState):
     2. Parses it into structured JSON format
     3. Saves the parsed data
     """
-    # Step 1: Extract text from PDF
-    loader = PyMuPDF4LLMLoader(file_path=state["resume_path"])
-    docs = [doc for doc in loader.lazy_load()]
-    content = "\n\n".join([doc.page_content for doc in docs])
+    # Step 1: Extract text from PDF (plain text, or markdown when the layout needs it)
+    content = extract_pdf_file(state["resume_path"]).text
     state["raw_resume_text"] = content
     
     # Step 2: Parse into structured data using LLM
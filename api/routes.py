@@ -2,14 +2,22 @@ from __future__ import annotations
 
 from fastapi import APIRouter, UploadFile, File, Form
 from typing import Optional
-from fastapi.background import BackgroundTasks
 
-from services.ingest_resume import ingest_resume, extract_text_from_pdf
+from services.document_dedup import content_sha256, find_current_duplicate
+from services.ingest_resume import ingest_resume
+from services.pdf_extraction import extract_pdf
 from services.ingest_jd import ingest_jd
-from services.db import fetch_one_commit, fetch_one, execute
-from services.embeddings import embed_texts
-from services.retrieval import search_similar_chunks
+from services.db import fetch_one_commit, fetch_one, execute, get_pool_stats
+from services import db_async
+from services.embeddings import embed_texts, get_embedding_scheduler_stats
+from services.embedding_cache import get_embedding_cache_stats
+from services.retrieval import get_retrieval_stats, search_similar_chunks
+from services.retrieval_cache import get_retrieval_cache_stats
 from services.screening import run_screening
+from services.processing import enqueue_resume_processing
+from services.bulk_screening import run_screening_for_job
+from services.executors import get_executor_stats, run_cpu, run_db
+from services.vector_index import get_vector_index_stats
 
 
 router = APIRouter()
@@ -30,40 +38,38 @@ def create_candidate(
     return {"candidate_id": row["id"]}
 
 
+# Async routes run blocking work on the sized pools in services.executors:
+# single queries via run_db; full ingests via run_cpu, since they hold a
+# pooled connection while waiting on the embedding scheduler and must queue
+# behind the cores rather than take the db threads sized to the pool. PDF
+# extraction runs in the services.pdf_extraction process pool; run_cpu only
+# waits on it.
 @router.post("/candidates/{candidate_id}/resumes:upload")
 async def upload_resume(candidate_id: str, file: UploadFile = File(...)):
     # Ensure candidate exists in current DB
-    exists = fetch_one("SELECT 1 AS ok FROM candidates WHERE id = %s", (candidate_id,))
+    exists = await run_db(fetch_one, "SELECT 1 AS ok FROM candidates WHERE id = %s", (candidate_id,))
     if not exists:
         return {"error": f"candidate_id {candidate_id} not found in database"}
-    # Save to a temp file (delete=False) to avoid Windows file locking issues
-    import tempfile, os
     content = await file.read()
-    tmp_path: str = ""
-    try:
-        fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
-        with os.fdopen(fd, "wb") as f:
-            f.write(content)
-        # Ensure file handle is closed before PyMuPDF opens it
-        text = extract_text_from_pdf(tmp_path)
-    finally:
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                os.remove(tmp_path)
-            except Exception:
-                pass
-    doc_id, num_chunks, num_vecs = ingest_resume(candidate_id=candidate_id, resume_title=file.filename, raw_text=text)
+    content_hash = content_sha256(content)
+    existing = await run_db(find_current_duplicate, source_type="resume", candidate_id=candidate_id, content_hash=content_hash)
+    if existing is not None:
+        doc_id, num_chunks, num_vecs = existing.as_result()
+        return {"document_id": doc_id, "chunks": num_chunks, "embedded": num_vecs}
+    extraction = await run_cpu(extract_pdf, content)
+    doc_id, num_chunks, num_vecs = await run_cpu(
+        ingest_resume,
+        candidate_id=candidate_id,
+        resume_title=file.filename,
+        raw_text=extraction.text,
+        extraction=extraction,
+        content_sha256=content_hash,
+    )
     return {"document_id": doc_id, "chunks": num_chunks, "embedded": num_vecs}
 
 
-@router.post("/jobs/{job_id}/resumes:upload")
-async def upload_resume_and_process(job_id: str, background: BackgroundTasks, file: UploadFile = File(...),
-                                    full_name: Optional[str] = Form(None), email: Optional[str] = Form(None),
-                                    phone: Optional[str] = Form(None), location: Optional[str] = Form(None),
-                                    linkedin_url: Optional[str] = Form(None)):
-    # Read file data immediately (before background processing)
-    data = await file.read()
-    
+def _upsert_candidate(full_name: Optional[str], email: Optional[str], phone: Optional[str],
+                      location: Optional[str], linkedin_url: Optional[str]):
     # Create or upsert candidate (by email/phone if provided)
     if email:
         row = fetch_one("SELECT id FROM candidates WHERE email = %s", (email,))
@@ -76,110 +82,48 @@ async def upload_resume_and_process(job_id: str, background: BackgroundTasks, fi
         if full_name or location or linkedin_url:
             execute("UPDATE candidates SET full_name = COALESCE(%s, full_name), location = COALESCE(%s, location), linkedin_url = COALESCE(%s, linkedin_url) WHERE id = %s",
                     (full_name, location, linkedin_url, candidate_id))
-    else:
-        row = fetch_one_commit(
-            "INSERT INTO candidates (full_name, email, phone, location, linkedin_url) VALUES (%s, %s, %s, %s, %s) RETURNING id",
-            (full_name or "Unknown", email, phone, location, linkedin_url),
-        )
-        candidate_id = row["id"]
+        return candidate_id
+    row = fetch_one_commit(
+        "INSERT INTO candidates (full_name, email, phone, location, linkedin_url) VALUES (%s, %s, %s, %s, %s) RETURNING id",
+        (full_name or "Unknown", email, phone, location, linkedin_url),
+    )
+    return row["id"]
 
-    # Create processing job
-    pj = fetch_one_commit(
-        "INSERT INTO processing_jobs (job_id, candidate_id, status, progress) VALUES (%s, %s, 'queued', 0) RETURNING id",
-        (job_id, candidate_id),
+
+@router.post("/jobs/{job_id}/resumes:upload")
+async def upload_resume_and_process(job_id: str, file: UploadFile = File(...),
+                                    full_name: Optional[str] = Form(None), email: Optional[str] = Form(None),
+                                    phone: Optional[str] = Form(None), location: Optional[str] = Form(None),
+                                    linkedin_url: Optional[str] = Form(None)):
+    data = await file.read()
+    candidate_id = await run_db(_upsert_candidate, full_name, email, phone, location, linkedin_url)
+
+    # Spool the upload and queue it; services.worker extracts, ingests and screens
+    processing_id = await run_db(
+        enqueue_resume_processing, job_id=job_id, candidate_id=str(candidate_id), data=data, filename=file.filename,
     )
-    processing_id = pj["id"]
-
-    # Background task: extract, ingest, screen
-    async def _process():
-        tmp_path = None
-        try:
-            execute("UPDATE processing_jobs SET status='running', progress=10 WHERE id=%s", (processing_id,))
-            
-            # Write to temporary file
-            import tempfile, os
-            fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
-            try:
-                with os.fdopen(fd, "wb") as f:
-                    f.write(data)
-                # Ensure file is closed before processing
-                f.close()
-            except Exception as e:
-                os.close(fd)
-                raise e
-                
-            from services.ingest_resume import extract_text_from_pdf
-            text = extract_text_from_pdf(tmp_path)
-
-            # Extract candidate info from resume text
-            import re
-            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
-            phone_match = re.search(r'(\+?91[\s-]?)?[6-9]\d{9}', text)
-            name_match = re.search(r'^#\s*\*\*([^*]+)\*\*', text, re.MULTILINE)
-            
-            extracted_email = email_match.group(0) if email_match else None
-            extracted_phone = phone_match.group(0) if phone_match else None
-            extracted_name = name_match.group(1).strip() if name_match else None
-            
-            # Update candidate with extracted info
-            if extracted_name or extracted_email or extracted_phone:
-                update_fields = []
-                params = []
-                if extracted_name:
-                    update_fields.append("full_name = %s")
-                    params.append(extracted_name)
-                if extracted_email:
-                    update_fields.append("email = %s")
-                    params.append(extracted_email)
-                if extracted_phone:
-                    update_fields.append("phone = %s")
-                    params.append(extracted_phone)
-                
-                if update_fields:
-                    params.append(candidate_id)
-                    execute(f"UPDATE candidates SET {', '.join(update_fields)} WHERE id = %s", tuple(params))
-
-            # Ingest resume
-            ingest_resume(candidate_id=candidate_id, resume_title=file.filename, raw_text=text)
-            execute("UPDATE processing_jobs SET progress=60 WHERE id=%s", (processing_id,))
-
-            # Run full RAG screening
-            from services.screening import run_screening
-            screening_result = run_screening(job_id=job_id, candidate_id=candidate_id)
-            execute("UPDATE processing_jobs SET status='done', progress=100 WHERE id=%s", (processing_id,))
-        except Exception as e:
-            execute("UPDATE processing_jobs SET status='error', error_message=%s WHERE id=%s", (str(e), processing_id))
-        finally:
-            # Clean up temporary file
-            if tmp_path and os.path.exists(tmp_path):
-                try:
-                    os.remove(tmp_path)
-                except Exception:
-                    pass
-
-    background.add_task(_process)
     return {"processing_id": processing_id, "candidate_id": candidate_id}
 
 
 @router.get("/processing/{processing_id}")
-def get_processing_status(processing_id: str):
-    row = fetch_one("SELECT id, job_id, candidate_id, status, progress, error_message, created_at, updated_at FROM processing_jobs WHERE id = %s", (processing_id,))
+async def get_processing_status(processing_id: str):
+    row = await db_async.fetch_one("SELECT id, job_id, candidate_id, status, progress, error_message, created_at, updated_at FROM processing_jobs WHERE id = %s", (processing_id,))
     if not row:
         return {"error": "not found"}
     return row
 
 
 @router.get("/candidates/{candidate_id}")
-def get_candidate(candidate_id: str):
-    row = fetch_one("SELECT * FROM candidates WHERE id = %s", (candidate_id,))
+async def get_candidate(candidate_id: str):
+    row = await db_async.fetch_one("SELECT * FROM candidates WHERE id = %s", (candidate_id,))
     if not row:
         return {"error": "not found"}
     return row
 
 
 @router.get("/candidates/{candidate_id}/screenings/{job_id}")
-def get_screening(candidate_id: str, job_id: str):
-    row = fetch_one("SELECT * FROM screenings WHERE candidate_id = %s AND job_id = %s", (candidate_id, job_id))
+async def get_screening(candidate_id: str, job_id: str):
+    row = await db_async.fetch_one("SELECT * FROM screenings WHERE candidate_id = %s AND job_id = %s", (candidate_id, job_id))
     if not row:
         return {"error": "not found"}
     return row
@@ -190,6 +134,11 @@ def run_screening_endpoint(job_id: str = Form(...), candidate_id: str = Form(...
     return run_screening(job_id=job_id, candidate_id=candidate_id)
 
 
+@router.post("/jobs/{job_id}/screenings:run-all")
+def run_all_screenings_endpoint(job_id: str):
+    return run_screening_for_job(job_id=job_id)
+
+
 @router.post("/jobs")
 def create_job(
     title: str = Form(...),
@@ -213,7 +162,22 @@ async def upload_jd(job_id: str, title: str = Form(...), file: UploadFile = File
     if file is not None:
         content = await file.read()
         text = content.decode("utf-8", errors="ignore")
-    assert text is not None
-    doc_id, num_chunks, num_vecs = ingest_jd(job_id=job_id, title=title, text=text)
+    if text is None or not text.strip():
+        return {"error": "JD is empty"}
+    # A full ingest: chunk, embed and write the document and its profile
+    doc_id, num_chunks, num_vecs = await run_cpu(ingest_jd, job_id=job_id, title=title, text=text)
     return {"document_id": doc_id, "chunks": num_chunks, "embedded": num_vecs}
 
+
+@router.get("/metrics")
+def get_metrics():
+    return {
+        "db_pool": get_pool_stats(),
+        "db_async_pool": db_async.get_async_pool_stats(),
+        "embedding_cache": get_embedding_cache_stats(),
+        "embedding_scheduler": get_embedding_scheduler_stats(),
+        "executors": get_executor_stats(),
+        "retrieval": get_retrieval_stats(),
+        "retrieval_cache": get_retrieval_cache_stats(),
+        "vector_index": get_vector_index_stats(),
+    }
@@ -0,0 +1,90 @@
+"""Compare the execute_batch insert path with the COPY bulk loader.
+
+Loads synthetic chunks and 768-dim embeddings into temporary copies of the
+``chunks`` and ``embeddings`` tables, so nothing is written to real tables.
+
+    python -m benchmarks.bench_bulk_load --rows 5000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+
+import numpy as np
+import psycopg2.extras
+from dotenv import load_dotenv
+
+from services.bulk_load import copy_chunks, copy_embeddings
+from services.chunking import Chunk
+from services.db import get_cursor
+from services.embeddings import EMBEDDING_DIMENSION, EMBEDDING_MODEL_NAME
+
+
+def _make_temp_tables(cur, with_indexes: bool) -> None:
+    including = "INCLUDING ALL" if with_indexes else "INCLUDING DEFAULTS"
+    cur.execute(f"CREATE TEMP TABLE bench_chunks (LIKE chunks {including}) ON COMMIT DROP")
+    cur.execute(f"CREATE TEMP TABLE bench_embeddings (LIKE embeddings {including}) ON COMMIT DROP")
+
+
+def _truncate(cur) -> None:
+    cur.execute("TRUNCATE bench_chunks, bench_embeddings")
+
+
+def _synthetic(rows: int):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((rows, EMBEDDING_DIMENSION)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    chunks = [
+        Chunk(content=f"chunk {i} " + "lorem ipsum " * 200, section="experience", heading=None, position=i, token_count=600)
+        for i in range(rows)
+    ]
+    return chunks, vectors
+
+
+def _execute_batch_path(cur, document_id: str, chunks, vectors: np.ndarray) -> None:
+    chunk_ids = [str(uuid.uuid4()) for _ in chunks]
+    psycopg2.extras.execute_batch(
+        cur,
+        "INSERT INTO bench_chunks (id, document_id, job_id, candidate_id, section, heading, content, token_count, position) "
+        "VALUES (%s, %s, NULL, NULL, %s, %s, %s, %s, %s)",
+        [(cid, document_id, ch.section, ch.heading, ch.content, ch.token_count, ch.position) for cid, ch in zip(chunk_ids, chunks)],
+    )
+    psycopg2.extras.execute_batch(
+        cur,
+        "INSERT INTO bench_embeddings (chunk_id, model, dim, vector) VALUES (%s, %s, %s, %s)",
+        [(cid, EMBEDDING_MODEL_NAME, EMBEDDING_DIMENSION, v) for cid, v in zip(chunk_ids, vectors.tolist())],
+    )
+
+
+def _copy_path(cur, document_id: str, chunks, vectors: np.ndarray) -> None:
+    chunk_ids = copy_chunks(cur, document_id, chunks, table="bench_chunks")
+    copy_embeddings(cur, chunk_ids, vectors, model=EMBEDDING_MODEL_NAME, table="bench_embeddings")
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--with-indexes", action="store_true", help="copy the real tables' indexes (incl. HNSW)")
+    args = parser.parse_args()
+
+    chunks, vectors = _synthetic(args.rows)
+    document_id = str(uuid.uuid4())
+
+    with get_cursor(commit=False) as cur:
+        _make_temp_tables(cur, args.with_indexes)
+        for name, path in (("execute_batch", _execute_batch_path), ("copy", _copy_path)):
+            timings = []
+            for _ in range(args.repeat):
+                _truncate(cur)
+                started = time.perf_counter()
+                path(cur, document_id, chunks, vectors)
+                timings.append(time.perf_counter() - started)
+            best = min(timings)
+            print(f"{name:>14}: best {best * 1000:9.1f} ms  ({args.rows / best:10.0f} rows/s) over {args.repeat} runs")
+
+
+if __name__ == "__main__":
+    main()
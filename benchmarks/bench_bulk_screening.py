@@ -0,0 +1,128 @@
+"""Time screening every applicant of a large job, batched vs one at a time.
+
+Seeds a synthetic job (ingested through ingest_jd) and --candidates
+candidates, each with one active resume document of --chunks chunks and
+random unit embeddings. Then times run_screening_for_job over all of them,
+and run_screening on a --baseline-sample of them, extrapolated to the whole
+set. With --cold, candidate_features is left empty so the batched backfill
+path is measured too. Everything seeded is deleted afterwards.
+
+    python -m benchmarks.bench_bulk_screening --candidates 10000 --chunks 8
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import uuid
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.bulk_load import copy_embeddings
+from services.bulk_screening import run_screening_for_job
+from services.candidate_features import rebuild_candidate_features
+from services.db import fetch_all, get_cursor
+from services.embeddings import EMBEDDING_DIMENSION, EMBEDDING_MODEL_NAME
+from services.ingest_jd import ingest_jd
+from services.screening import run_screening
+
+
+JD_TEXT = """Senior Backend Engineer
+Requirements
+5+ years of Python and PostgreSQL, Docker and AWS experience in fintech or SaaS.
+Responsibilities
+Design services, own data pipelines and mentor engineers.
+"""
+RESUME_LINES = (
+    "Built payment services in Python and PostgreSQL for a fintech startup",
+    "Ran Docker workloads on AWS for a SaaS analytics product",
+    "Led a team of engineers shipping Go and Kubernetes tooling",
+    "Maintained React frontends and Node.js APIs",
+)
+
+
+def _seed(candidates: int, chunks: int, seed: int):
+    job_id = str(uuid.uuid4())
+    tag = job_id[:8]
+    with get_cursor(commit=True) as cur:
+        cur.execute(
+            "INSERT INTO jobs (id, title, team, seniority, location) VALUES (%s, 'Bench Backend Engineer', 'bench', "
+            "'senior', 'Berlin')",
+            (job_id,),
+        )
+        cur.execute(
+            "INSERT INTO candidates (full_name, location) "
+            "SELECT %s || '-' || i, (ARRAY['Berlin', 'Remote', 'Paris'])[1 + i %% 3] FROM generate_series(1, %s) i "
+            "RETURNING id",
+            (f"bench-{tag}", candidates),
+        )
+        candidate_ids = [str(r["id"]) for r in cur.fetchall()]
+        cur.execute(
+            "INSERT INTO documents (candidate_id, source_type, title, raw_text) "
+            "SELECT id, 'resume', 'bench resume', 'bench' FROM unnest(%s::uuid[]) AS c(id)",
+            (candidate_ids,),
+        )
+        cur.execute(
+            "INSERT INTO chunks (document_id, candidate_id, section, content, token_count, position) "
+            "SELECT d.id, d.candidate_id, 'experience', (%s::text[])[1 + abs(p + hashtext(d.id::text)) %% %s] "
+            "|| ' for ' || (1 + p) || ' years', 20, p "
+            "FROM documents d CROSS JOIN generate_series(0, %s - 1) p WHERE d.candidate_id = ANY(%s::uuid[]) "
+            "RETURNING id",
+            (list(RESUME_LINES), len(RESUME_LINES), chunks, candidate_ids),
+        )
+        chunk_ids = [str(r["id"]) for r in cur.fetchall()]
+        vectors = np.random.default_rng(seed).standard_normal((len(chunk_ids), EMBEDDING_DIMENSION)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        copy_embeddings(cur, chunk_ids, vectors, model=EMBEDDING_MODEL_NAME)
+    ingest_jd(job_id=job_id, title="Bench Backend Engineer", text=JD_TEXT)
+    return job_id, candidate_ids
+
+
+def _cleanup(job_id: str, candidate_ids) -> None:
+    with get_cursor(commit=True) as cur:
+        cur.execute("DELETE FROM candidates WHERE id = ANY(%s::uuid[])", (list(candidate_ids),))
+        cur.execute("DELETE FROM jobs WHERE id = %s", (job_id,))
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=10000)
+    parser.add_argument("--chunks", type=int, default=8, help="chunks per resume")
+    parser.add_argument("--baseline-sample", type=int, default=200, help="0 skips the per-candidate baseline")
+    parser.add_argument("--cold", action="store_true", help="leave candidate_features empty (batched backfill)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    job_id, candidate_ids = _seed(args.candidates, args.chunks, args.seed)
+    print(f"seeded {len(candidate_ids)} candidates x {args.chunks} chunks in {time.perf_counter() - started:.1f} s")
+    try:
+        if not args.cold:
+            rebuild_candidate_features(candidate_ids)
+
+        result = run_screening_for_job(job_id=job_id, candidate_ids=candidate_ids)
+        batched = result["elapsed_ms"] / 1000
+        print(
+            f"{'batched':>10}: {batched:8.2f} s  ({len(candidate_ids) / batched:8.0f} candidates/s)  "
+            f"{result['recommendations']}"
+        )
+        stored = fetch_all("SELECT count(*) AS n FROM screenings WHERE job_id = %s", (job_id,))[0]["n"]
+        assert stored == len(candidate_ids), f"expected {len(candidate_ids)} screenings, found {stored}"
+
+        if args.baseline_sample:
+            sample = candidate_ids[: args.baseline_sample]
+            started = time.perf_counter()
+            for candidate_id in sample:
+                run_screening(job_id=job_id, candidate_id=candidate_id)
+            per_candidate = (time.perf_counter() - started) / len(sample)
+            print(
+                f"{'single':>10}: {per_candidate * len(candidate_ids):8.2f} s  "
+                f"({1 / per_candidate:8.0f} candidates/s, extrapolated from {len(sample)})"
+            )
+    finally:
+        _cleanup(job_id, candidate_ids)
+
+
+if __name__ == "__main__":
+    main()
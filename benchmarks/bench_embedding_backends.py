@@ -0,0 +1,82 @@
+"""Parity check and throughput benchmark: PyTorch vs quantized ONNX embeddings.
+
+Chunks every sample in storage/resumes the same way ingestion does, embeds
+the chunks with both backends, and reports per-chunk cosine agreement and
+texts/second. Exits non-zero when the minimum cosine is below --min-cosine.
+
+    python -m benchmarks.bench_embedding_backends --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+from services.chunking import chunk_text
+from services.embeddings import OnnxEmbeddingBackend, TorchEmbeddingBackend
+from services.ingest_resume import extract_text_from_pdf
+
+
+def _load_sample_chunks(directory: str) -> List[str]:
+    texts: List[str] = []
+    for path in sorted(glob.glob(os.path.join(directory, "*"))):
+        if path.endswith(".pdf"):
+            text = extract_text_from_pdf(path)
+        elif path.endswith(".txt"):
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+        else:
+            continue
+        texts.extend(ch.content for ch in chunk_text(text))
+    return texts
+
+
+def _throughput(backend, texts: List[str], repeat: int) -> float:
+    backend.encode(texts[:2])  # warm-up
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        backend.encode(texts)
+        best = min(best, time.perf_counter() - started)
+    return len(texts) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", default=os.path.join("storage", "resumes"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    args = parser.parse_args()
+
+    texts = _load_sample_chunks(args.samples)
+    if not texts:
+        sys.exit(f"no .txt or .pdf samples found in {args.samples}")
+
+    torch_backend = TorchEmbeddingBackend()
+    onnx_backend = OnnxEmbeddingBackend()
+
+    reference = torch_backend.encode(texts)
+    candidate = onnx_backend.encode(texts)
+    # Both backends return L2-normalized vectors, so the dot product is the cosine
+    cosines = np.sum(reference * candidate, axis=1)
+    print(f"chunks: {len(texts)}")
+    print(
+        f"cosine agreement: min {cosines.min():.5f}  mean {cosines.mean():.5f}  "
+        f"p5 {np.percentile(cosines, 5):.5f}"
+    )
+
+    for backend in (torch_backend, onnx_backend):
+        rate = _throughput(backend, texts, args.repeat)
+        print(f"{backend.name:>6}: {rate:8.1f} texts/s")
+
+    if cosines.min() < args.min_cosine:
+        sys.exit(f"parity check failed: min cosine {cosines.min():.5f} < {args.min_cosine}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare hybrid_search_chunks with reciprocal-rank-fusion hybrid retrieval.
+
+Known-item evaluation over the active corpus: each sampled chunk yields a
+query made of a window of its own words, and a hit is that chunk appearing
+in the top k. Reports recall@k, p50/p95 latency, and how often each method
+returns fewer than k rows (the filter-then-rank query drops every chunk
+without lexical overlap).
+
+    python -m benchmarks.bench_hybrid_retrieval --queries 200 --k 5
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.db import fetch_all
+from services.embeddings import embed_texts
+from services.retrieval import hybrid_search_chunks, rrf_hybrid_search_chunks
+
+
+def _sample_queries(n: int, words: int, seed: int):
+    rows = fetch_all(
+        "SELECT c.id, c.content FROM chunks c JOIN embeddings e ON e.chunk_id = c.id "
+        "WHERE c.is_active AND e.is_active ORDER BY random() LIMIT %s",
+        (n,),
+    )
+    rng = random.Random(seed)
+    queries = []
+    for row in rows:
+        tokens = row["content"].split()
+        if len(tokens) < words:
+            continue
+        start = rng.randrange(0, len(tokens) - words + 1)
+        queries.append((str(row["id"]), " ".join(tokens[start : start + words])))
+    return queries
+
+
+def _run(name: str, search, queries, vectors, k: int) -> None:
+    latencies, found, short = [], 0, 0
+    for (chunk_id, text), vector in zip(queries, vectors):
+        started = time.perf_counter()
+        rows = search(query_vector=vector, query_text=text, limit=k)
+        latencies.append(time.perf_counter() - started)
+        found += any(str(r["chunk_id"]) == chunk_id for r in rows)
+        short += len(rows) < k
+    p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+    print(
+        f"{name:>8}: recall@{k} {found / len(queries):6.3f}  p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  "
+        f"<{k} rows {short}/{len(queries)}"
+    )
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--words", type=int, default=8, help="query window length in words")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    queries = _sample_queries(args.queries, args.words, args.seed)
+    if not queries:
+        raise SystemExit("no active chunks with embeddings to sample queries from")
+    vectors = embed_texts([text for _, text in queries])
+
+    # One untimed pass each warms the pools, caches and leg threads
+    for search in (hybrid_search_chunks, rrf_hybrid_search_chunks):
+        search(query_vector=vectors[0], query_text=queries[0][1], limit=args.k)
+
+    _run("current", hybrid_search_chunks, queries, vectors, args.k)
+    _run("rrf", rrf_hybrid_search_chunks, queries, vectors, args.k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Recall@k and latency of the vector storage modes against exact search.
+
+Query vectors are the embeddings of sampled active chunks (the chunk itself
+is excluded from both sides). Ground truth is an exact scan of all active
+embeddings; each VECTOR_STORAGE_MODE then runs through search_similar_chunks
+on its HNSW plan. Index sizes are printed for the full-precision and the
+compact indexes from migration 0016.
+
+    python -m benchmarks.bench_vector_storage --queries 200 --k 10
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.db import fetch_all
+from services.retrieval import STORAGE_MODES, search_similar_chunks
+
+
+INDEXES = ("idx_embeddings_vector_hnsw_active", "idx_embeddings_halfvec_hnsw_active", "idx_embeddings_binary_hnsw_active")
+
+
+def _sample_queries(n: int):
+    rows = fetch_all(
+        "SELECT e.chunk_id, e.vector::real[] AS vector FROM embeddings e "
+        "WHERE e.is_active ORDER BY random() LIMIT %s",
+        (n,),
+    )
+    return [(str(r["chunk_id"]), r["vector"]) for r in rows]
+
+
+def _exact_top_k(vector, k: int, exclude: str) -> set:
+    # MATERIALIZED keeps the planner off every HNSW index: a full exact scan
+    rows = fetch_all(
+        """
+        WITH active AS MATERIALIZED (SELECT chunk_id, vector FROM embeddings WHERE is_active)
+        SELECT chunk_id FROM active WHERE chunk_id <> %s
+        ORDER BY vector <=> %s::vector
+        LIMIT %s
+        """,
+        (exclude, vector, k),
+    )
+    return {str(r["chunk_id"]) for r in rows}
+
+
+def _index_sizes() -> dict:
+    rows = fetch_all(
+        "SELECT relname, pg_relation_size(oid) AS bytes FROM pg_class WHERE relname = ANY(%s)",
+        (list(INDEXES),),
+    )
+    return {r["relname"]: r["bytes"] for r in rows}
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=list(STORAGE_MODES), choices=STORAGE_MODES)
+    args = parser.parse_args()
+
+    queries = _sample_queries(args.queries)
+    if not queries:
+        raise SystemExit("no active embeddings to sample queries from")
+    truth = [_exact_top_k(vector, args.k, chunk_id) for chunk_id, vector in queries]
+
+    for name, size in sorted(_index_sizes().items()):
+        print(f"{name:>36}: {size / 1024 / 1024:9.1f} MiB")
+
+    os.environ["VECTOR_SEARCH_PLAN"] = "hnsw"
+    for mode in args.modes:
+        os.environ["VECTOR_STORAGE_MODE"] = mode
+        search_similar_chunks(query_vector=queries[0][1], limit=args.k + 1)  # warm the index pages
+        latencies, recalls = [], []
+        for (chunk_id, vector), expected in zip(queries, truth):
+            started = time.perf_counter()
+            rows = search_similar_chunks(query_vector=vector, limit=args.k + 1)
+            latencies.append(time.perf_counter() - started)
+            found = [str(r["chunk_id"]) for r in rows if str(r["chunk_id"]) != chunk_id][: args.k]
+            recalls.append(len(expected.intersection(found)) / len(expected) if expected else 1.0)
+        p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+        print(f"{mode:>8}: recall@{args.k} {np.mean(recalls):6.3f}  p50 {p50:7.1f} ms  p95 {p95:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from dotenv import load_dotenv
 from api.routes import router as api_router
+from services.db import close_pool
+from services.db_async import close_async_pool, open_async_pool
+from services.executors import shutdown_executors
+from services.pdf_extraction import shutdown_pdf_executor
+from services.retrieval_cache import start_invalidation_listener, stop_invalidation_listener
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_async_pool()
+    start_invalidation_listener()
+    try:
+        yield
+    finally:
+        stop_invalidation_listener()
+        shutdown_executors()
+        shutdown_pdf_executor()
+        await close_async_pool()
+        close_pool()
 
 
 def main():
     # Ensure .env variables are loaded when running via uvicorn factory
     load_dotenv()
-    app = FastAPI(title="HireLoom Backend")
+    app = FastAPI(title="HireLoom Backend", lifespan=lifespan)
     app.include_router(api_router)
     return app
 
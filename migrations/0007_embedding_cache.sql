@@ -0,0 +1,15 @@
+-- Content-addressed cache of embedding vectors, shared by every API worker
+-- key = sha256(model || NUL || normalized text); vector = raw little-endian float32
+CREATE TABLE embedding_cache (
+    key BYTEA PRIMARY KEY,
+    model TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    vector BYTEA NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE embedding_cache ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role full access on embedding_cache" ON embedding_cache
+    FOR ALL USING (auth.role() = 'service_role');
+
+CREATE INDEX idx_embedding_cache_model ON embedding_cache(model);
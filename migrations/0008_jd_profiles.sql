@@ -0,0 +1,19 @@
+-- Materialized per-job JD profile, rebuilt whenever a JD is ingested
+CREATE TABLE jd_profiles (
+    job_id UUID PRIMARY KEY REFERENCES jobs(id) ON DELETE CASCADE,
+    document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    skills TEXT[] NOT NULL DEFAULT '{}',
+    domains TEXT[] NOT NULL DEFAULT '{}',
+    seniority TEXT,
+    model TEXT,
+    embedding BYTEA, -- raw little-endian float32; NULL when the JD has no targetable text
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE jd_profiles ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role full access on jd_profiles" ON jd_profiles
+    FOR ALL USING (auth.role() = 'service_role');
+
+CREATE TRIGGER update_jd_profiles_updated_at BEFORE UPDATE ON jd_profiles
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
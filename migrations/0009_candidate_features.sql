@@ -0,0 +1,19 @@
+-- Resume-derived screening features, recomputed only when a newer resume is ingested
+CREATE TABLE candidate_features (
+    candidate_id UUID PRIMARY KEY REFERENCES candidates(id) ON DELETE CASCADE,
+    document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    skills TEXT[] NOT NULL DEFAULT '{}',
+    domains TEXT[] NOT NULL DEFAULT '{}',
+    years_experience REAL NOT NULL DEFAULT 0,
+    seniority TEXT NOT NULL,
+    has_text BOOLEAN NOT NULL DEFAULT false,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE candidate_features ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Service role full access on candidate_features" ON candidate_features
+    FOR ALL USING (auth.role() = 'service_role');
+
+CREATE TRIGGER update_candidate_features_updated_at BEFORE UPDATE ON candidate_features
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
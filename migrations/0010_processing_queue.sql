@@ -0,0 +1,13 @@
+-- Turn processing_jobs into a durable work queue claimed with FOR UPDATE SKIP LOCKED
+ALTER TABLE processing_jobs
+    ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN max_attempts INTEGER NOT NULL DEFAULT 5,
+    ADD COLUMN run_after TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    ADD COLUMN lease_expires_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN locked_by TEXT,
+    ADD COLUMN payload_path TEXT,
+    ADD COLUMN filename TEXT;
+
+-- Claimable work: queued rows that are due, and running rows whose lease expired
+CREATE INDEX idx_processing_jobs_due ON processing_jobs(run_after) WHERE status = 'queued';
+CREATE INDEX idx_processing_jobs_lease ON processing_jobs(lease_expires_at) WHERE status = 'running';
@@ -0,0 +1,5 @@
+-- Which PDF extraction tier produced documents.raw_text, and how long it took.
+-- NULL for documents ingested from raw text (JDs, pasted resumes).
+ALTER TABLE documents
+    ADD COLUMN extraction_tier TEXT,
+    ADD COLUMN extraction_ms REAL;
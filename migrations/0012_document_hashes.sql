@@ -0,0 +1,28 @@
+-- Content hashes for short-circuiting re-uploads of a document, and the owning
+-- candidate of resume documents (until now only recorded on their chunks)
+ALTER TABLE documents
+    ADD COLUMN candidate_id UUID REFERENCES candidates(id) ON DELETE CASCADE,
+    ADD COLUMN content_sha256 BYTEA,
+    ADD COLUMN text_sha256 BYTEA;
+
+UPDATE documents d
+SET candidate_id = c.candidate_id
+FROM (SELECT DISTINCT document_id, candidate_id FROM chunks WHERE candidate_id IS NOT NULL) c
+WHERE d.id = c.document_id AND d.source_type = 'resume';
+
+-- Same normalization as services.embedding_cache.normalize_text: NFC, whitespace runs collapsed.
+-- The class lists exactly the characters Python's str.split() splits on; \s
+-- depends on the database locale and misses some of them (NBSP, U+2028, ...).
+-- Shared with the chunk hash backfill in 0013.
+CREATE OR REPLACE FUNCTION normalized_text_sha256(body TEXT)
+RETURNS BYTEA AS $$
+    SELECT sha256(convert_to(btrim(regexp_replace(
+        normalize(body, NFC),
+        '[\u0009-\u000d\u001c-\u0020\u0085\u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+',
+        ' ', 'g')), 'UTF8'))
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+
+-- Raw-byte hashes cannot be backfilled; those documents dedupe on text only.
+UPDATE documents SET text_sha256 = normalized_text_sha256(raw_text);
+
+CREATE INDEX idx_documents_candidate_source ON documents(candidate_id, source_type, is_active);
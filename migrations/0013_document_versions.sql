@@ -0,0 +1,47 @@
+-- Per-chunk content hash (normalized_text_sha256 from 0012, the same normalization as
+-- services.embedding_cache.normalize_text), so a new document version can reuse the
+-- embeddings of its unchanged chunks. Run with psql outside a transaction block: the
+-- backfill commits per batch of ids instead of holding row locks on every chunk at once.
+ALTER TABLE chunks ADD COLUMN content_sha256 BYTEA;
+
+DO $$
+DECLARE
+    last_id UUID := '00000000-0000-0000-0000-000000000000';
+    batch_end UUID;
+BEGIN
+    LOOP
+        SELECT max(id) INTO batch_end
+        FROM (SELECT id FROM chunks WHERE id > last_id ORDER BY id LIMIT 5000) batch;
+        EXIT WHEN batch_end IS NULL;
+        UPDATE chunks SET content_sha256 = normalized_text_sha256(content)
+        WHERE id > last_id AND id <= batch_end AND content_sha256 IS NULL;
+        last_id := batch_end;
+        COMMIT;
+    END LOOP;
+END $$;
+
+CREATE INDEX idx_chunks_document_hash ON chunks(document_id, content_sha256);
+
+-- Keep only the newest resume per candidate and the newest JD per job active;
+-- older uploads stay as inactive versions
+UPDATE documents d
+SET is_active = false
+WHERE d.is_active AND d.source_type = 'resume' AND d.candidate_id IS NOT NULL
+  AND EXISTS (
+      SELECT 1 FROM documents n
+      WHERE n.source_type = 'resume' AND n.candidate_id = d.candidate_id AND n.is_active
+        AND (n.created_at, n.id) > (d.created_at, d.id)
+  );
+
+UPDATE documents d
+SET is_active = false
+WHERE d.is_active AND d.source_type = 'jd' AND d.job_id IS NOT NULL
+  AND EXISTS (
+      SELECT 1 FROM documents n
+      WHERE n.source_type = 'jd' AND n.job_id = d.job_id AND n.is_active
+        AND (n.created_at, n.id) > (d.created_at, d.id)
+  );
+
+-- At most one active version per owner; ingestion locks it FOR UPDATE before replacing it
+CREATE UNIQUE INDEX uq_documents_active_resume ON documents(candidate_id) WHERE is_active AND source_type = 'resume';
+CREATE UNIQUE INDEX uq_documents_active_jd ON documents(job_id) WHERE is_active AND source_type = 'jd';
@@ -0,0 +1,138 @@
+-- Denormalized documents.is_active on chunks and embeddings, so retrieval can skip
+-- superseded document versions inside the indexes instead of joining documents.
+-- Run with psql outside a transaction block (CREATE/DROP INDEX CONCURRENTLY).
+
+ALTER TABLE chunks ADD COLUMN is_active BOOLEAN NOT NULL DEFAULT true;
+ALTER TABLE embeddings ADD COLUMN is_active BOOLEAN NOT NULL DEFAULT true;
+
+UPDATE chunks c
+SET is_active = false
+FROM documents d
+WHERE c.document_id = d.id AND d.is_active IS NOT TRUE;
+
+UPDATE embeddings e
+SET is_active = false
+FROM chunks c
+WHERE e.chunk_id = c.id AND NOT c.is_active;
+
+-- Keep the flags in sync when a document version is (de)activated
+CREATE OR REPLACE FUNCTION sync_document_active_flag()
+RETURNS TRIGGER AS $$
+DECLARE
+    active BOOLEAN := COALESCE(NEW.is_active, false);
+BEGIN
+    UPDATE chunks SET is_active = active
+    WHERE document_id = NEW.id AND is_active <> active;
+
+    UPDATE embeddings e SET is_active = active
+    FROM chunks c
+    WHERE e.chunk_id = c.id AND c.document_id = NEW.id AND e.is_active <> active;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER sync_documents_active_flag AFTER UPDATE OF is_active ON documents
+    FOR EACH ROW WHEN (OLD.is_active IS DISTINCT FROM NEW.is_active)
+    EXECUTE FUNCTION sync_document_active_flag();
+
+-- Partial indexes over active rows only; the full-table ones they replace grow with history
+CREATE INDEX CONCURRENTLY idx_embeddings_vector_hnsw_active ON embeddings USING hnsw (vector vector_cosine_ops)
+WITH (m = 16, ef_construction = 64) WHERE is_active;
+DROP INDEX CONCURRENTLY idx_embeddings_vector_hnsw;
+
+CREATE INDEX CONCURRENTLY idx_chunks_content_gin_active ON chunks USING gin(to_tsvector('english', content)) WHERE is_active;
+DROP INDEX CONCURRENTLY idx_chunks_content_gin;
+
+CREATE INDEX CONCURRENTLY idx_chunks_candidate_active ON chunks(candidate_id) WHERE is_active;
+CREATE INDEX CONCURRENTLY idx_chunks_job_active ON chunks(job_id) WHERE is_active;
+
+-- SQL retrieval functions: active rows only
+CREATE OR REPLACE FUNCTION search_similar_chunks(
+    query_vector vector(768),
+    match_job_id UUID DEFAULT NULL,
+    match_candidate_id UUID DEFAULT NULL,
+    match_section section_type DEFAULT NULL,
+    limit_count INTEGER DEFAULT 10,
+    similarity_threshold FLOAT DEFAULT 0.7
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    content TEXT,
+    section section_type,
+    heading TEXT,
+    similarity FLOAT,
+    document_title TEXT,
+    job_title TEXT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT 
+        c.id as chunk_id,
+        c.content,
+        c.section,
+        c.heading,
+        1 - (e.vector <=> query_vector) as similarity,
+        d.title as document_title,
+        j.title as job_title
+    FROM chunks c
+    JOIN embeddings e ON c.id = e.chunk_id
+    JOIN documents d ON c.document_id = d.id
+    LEFT JOIN jobs j ON c.job_id = j.id
+    WHERE 
+        e.is_active AND c.is_active
+        AND (match_job_id IS NULL OR c.job_id = match_job_id)
+        AND (match_candidate_id IS NULL OR c.candidate_id = match_candidate_id)
+        AND (match_section IS NULL OR c.section = match_section)
+        AND (1 - (e.vector <=> query_vector)) >= similarity_threshold
+    ORDER BY e.vector <=> query_vector
+    LIMIT limit_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION hybrid_search_chunks(
+    query_vector vector(768),
+    query_text TEXT,
+    match_job_id UUID DEFAULT NULL,
+    match_candidate_id UUID DEFAULT NULL,
+    match_section section_type DEFAULT NULL,
+    limit_count INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    content TEXT,
+    section section_type,
+    heading TEXT,
+    vector_similarity FLOAT,
+    text_rank FLOAT,
+    combined_score FLOAT,
+    document_title TEXT,
+    job_title TEXT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT 
+        c.id as chunk_id,
+        c.content,
+        c.section,
+        c.heading,
+        1 - (e.vector <=> query_vector) as vector_similarity,
+        ts_rank(to_tsvector('english', c.content), plainto_tsquery('english', query_text)) as text_rank,
+        (1 - (e.vector <=> query_vector)) * 0.7 + 
+        ts_rank(to_tsvector('english', c.content), plainto_tsquery('english', query_text)) * 0.3 as combined_score,
+        d.title as document_title,
+        j.title as job_title
+    FROM chunks c
+    JOIN embeddings e ON c.id = e.chunk_id
+    JOIN documents d ON c.document_id = d.id
+    LEFT JOIN jobs j ON c.job_id = j.id
+    WHERE 
+        e.is_active AND c.is_active
+        AND (match_job_id IS NULL OR c.job_id = match_job_id)
+        AND (match_candidate_id IS NULL OR c.candidate_id = match_candidate_id)
+        AND (match_section IS NULL OR c.section = match_section)
+        AND to_tsvector('english', c.content) @@ plainto_tsquery('english', query_text)
+    ORDER BY combined_score DESC
+    LIMIT limit_count;
+END;
+$$ LANGUAGE plpgsql;
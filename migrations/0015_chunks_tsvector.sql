@@ -0,0 +1,102 @@
+-- Stored tsvector for full-text search, so queries stop re-tokenizing content per row.
+-- A trigger-maintained column rather than GENERATED ALWAYS ... STORED: adding a
+-- generated column rewrites the whole table under an exclusive lock, while this
+-- backfills in short batches. Run with psql outside a transaction block
+-- (the backfill commits per batch; indexes are built CONCURRENTLY).
+
+ALTER TABLE chunks ADD COLUMN content_tsv TSVECTOR;
+
+CREATE OR REPLACE FUNCTION chunks_content_tsv_update()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.content_tsv = to_tsvector('english', NEW.content);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Installed before the backfill so rows written meanwhile are covered
+CREATE TRIGGER chunks_content_tsv BEFORE INSERT OR UPDATE OF content ON chunks
+    FOR EACH ROW EXECUTE FUNCTION chunks_content_tsv_update();
+
+DO $$
+DECLARE
+    updated INTEGER;
+BEGIN
+    LOOP
+        UPDATE chunks SET content_tsv = to_tsvector('english', content)
+        WHERE id IN (SELECT id FROM chunks WHERE content_tsv IS NULL LIMIT 5000 FOR UPDATE SKIP LOCKED);
+        GET DIAGNOSTICS updated = ROW_COUNT;
+        COMMIT;
+        IF updated = 0 THEN
+            -- An empty batch can still leave rows that SKIP LOCKED passed over
+            -- while a concurrent writer held them; wait for those
+            EXIT WHEN NOT EXISTS (SELECT 1 FROM chunks WHERE content_tsv IS NULL);
+            PERFORM pg_sleep(1);
+        END IF;
+    END LOOP;
+END $$;
+
+CREATE INDEX CONCURRENTLY idx_chunks_content_tsv_active ON chunks USING gin(content_tsv) WHERE is_active;
+DROP INDEX CONCURRENTLY idx_chunks_content_gin_active;
+
+-- Similarity and rank computed once per row in the MATERIALIZED CTE (a LATERAL
+-- subquery would be flattened and its expressions repeated in ORDER BY); the
+-- query parsed once per call
+CREATE OR REPLACE FUNCTION hybrid_search_chunks(
+    query_vector vector(768),
+    query_text TEXT,
+    match_job_id UUID DEFAULT NULL,
+    match_candidate_id UUID DEFAULT NULL,
+    match_section section_type DEFAULT NULL,
+    limit_count INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    content TEXT,
+    section section_type,
+    heading TEXT,
+    vector_similarity FLOAT,
+    text_rank FLOAT,
+    combined_score FLOAT,
+    document_title TEXT,
+    job_title TEXT
+) AS $$
+BEGIN
+    RETURN QUERY
+    WITH scored AS MATERIALIZED (
+        SELECT 
+            c.id as id,
+            c.content as body,
+            c.section as sec,
+            c.heading as head,
+            (1 - (e.vector <=> query_vector))::FLOAT as similarity,
+            ts_rank(c.content_tsv, q.tsq)::FLOAT as rnk,
+            d.title as doc_title,
+            j.title as jd_title
+        FROM chunks c
+        JOIN embeddings e ON c.id = e.chunk_id
+        JOIN documents d ON c.document_id = d.id
+        LEFT JOIN jobs j ON c.job_id = j.id
+        CROSS JOIN plainto_tsquery('english', query_text) AS q(tsq)
+        WHERE 
+            e.is_active AND c.is_active
+            AND (match_job_id IS NULL OR c.job_id = match_job_id)
+            AND (match_candidate_id IS NULL OR c.candidate_id = match_candidate_id)
+            AND (match_section IS NULL OR c.section = match_section)
+            AND c.content_tsv @@ q.tsq
+    )
+    SELECT 
+        s.id,
+        s.body,
+        s.sec,
+        s.head,
+        s.similarity,
+        s.rnk,
+        s.similarity * 0.7 + s.rnk * 0.3,
+        s.doc_title,
+        s.jd_title
+    FROM scored s
+    ORDER BY 7 DESC
+    LIMIT limit_count;
+END;
+$$ LANGUAGE plpgsql;
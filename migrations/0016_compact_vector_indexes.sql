@@ -0,0 +1,22 @@
+-- Compact ANN indexes for VECTOR_STORAGE_MODE=halfvec|binary (see services/retrieval.py):
+-- the HNSW graph is built over a half-precision or binary-quantized copy of each
+-- vector, and the coarse candidates it returns are reranked with the full-precision
+-- embeddings.vector, which stays the source of truth.
+-- Expression indexes quantize existing rows while they are built and new rows on
+-- insert, so there is no backfill and no extra column to keep in sync.
+-- Requires pgvector >= 0.7. Run with psql outside a transaction block (CREATE INDEX CONCURRENTLY).
+
+-- 2 bytes per dimension instead of 4; ordering is near-identical to full precision
+CREATE INDEX CONCURRENTLY idx_embeddings_halfvec_hnsw_active ON embeddings
+USING hnsw ((vector::halfvec(768)) halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64) WHERE is_active;
+
+-- 1 bit per dimension; needs a wider coarse candidate set before the rerank
+CREATE INDEX CONCURRENTLY idx_embeddings_binary_hnsw_active ON embeddings
+USING hnsw ((binary_quantize(vector)::bit(768)) bit_hamming_ops)
+WITH (m = 16, ef_construction = 64) WHERE is_active;
+
+-- Once one compact mode is in use and benchmarks/bench_vector_storage.py shows acceptable
+-- recall, drop the indexes that are no longer read (the full-precision graph is the largest):
+-- DROP INDEX CONCURRENTLY idx_embeddings_vector_hnsw_active;
+-- DROP INDEX CONCURRENTLY idx_embeddings_binary_hnsw_active;  -- or idx_embeddings_halfvec_hnsw_active
@@ -0,0 +1,31 @@
+"""Export the embedding model to ONNX and write an int8 dynamically-quantized copy.
+
+    python -m scripts.export_onnx_model --quantization avx2
+
+Then run the API with EMBEDDING_BACKEND=onnx (and EMBEDDING_ONNX_FILE_NAME
+if the quantization target is not avx2).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+
+from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+from services.embeddings import DEFAULT_ONNX_MODEL_DIR, EMBEDDING_MODEL_NAME
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output-dir", default=DEFAULT_ONNX_MODEL_DIR)
+    parser.add_argument("--quantization", default="avx2", choices=["arm64", "avx2", "avx512", "avx512_vnni"])
+    args = parser.parse_args()
+
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME, backend="onnx")
+    model.save_pretrained(args.output_dir)
+    export_dynamic_quantized_onnx_model(model, args.quantization, args.output_dir)
+    print(f"Wrote {os.path.join(args.output_dir, 'onnx', f'model_qint8_{args.quantization}.onnx')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import csv
+import io
+import struct
+import uuid
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from services.chunking import Chunk
+
+
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_PGCOPY_TRAILER = struct.pack(">h", -1)
+
+
+def copy_chunks(
+    cur,
+    document_id: str,
+    chunks: Sequence[Chunk],
+    *,
+    job_id: Optional[str] = None,
+    candidate_id: Optional[str] = None,
+    content_hashes: Optional[Sequence[bytes]] = None,
+    table: str = "chunks",
+) -> List[str]:
+    """COPY chunks in one round trip; ids are generated client-side so callers
+    can reference them without a RETURNING readback."""
+    chunk_ids = [str(uuid.uuid4()) for _ in chunks]
+    if not chunks:
+        return chunk_ids
+    if content_hashes is not None and len(content_hashes) != len(chunks):
+        raise ValueError(f"got {len(content_hashes)} content hashes for {len(chunks)} chunks")
+
+    buf = io.StringIO()
+    # QUOTE_NOTNULL keeps None unquoted, which COPY ... CSV reads as NULL
+    writer = csv.writer(buf, quoting=csv.QUOTE_NOTNULL, lineterminator="\n")
+    for i, (chunk_id, ch) in enumerate(zip(chunk_ids, chunks)):
+        # bytea in COPY text input uses the hex format: \x followed by hex digits
+        content_hash = "\\x" + content_hashes[i].hex() if content_hashes is not None else None
+        writer.writerow(
+            (
+                chunk_id, document_id, job_id, candidate_id, ch.section, ch.heading, ch.content, ch.token_count,
+                ch.position, content_hash,
+            )
+        )
+    buf.seek(0)
+    cur.copy_expert(
+        f"COPY {table} (id, document_id, job_id, candidate_id, section, heading, content, token_count, position, "
+        "content_sha256) FROM STDIN WITH (FORMAT csv)",
+        buf,
+    )
+    return chunk_ids
+
+
+def encode_embeddings_copy_binary(chunk_ids: Sequence[str], vectors: np.ndarray, model: str) -> bytes:
+    """Encode (chunk_id, model, dim, vector) rows in PostgreSQL binary COPY format.
+
+    The pgvector binary representation is int16 dim, int16 unused, then
+    dim big-endian float4 values, so the whole payload is built with one
+    NumPy structured array instead of per-float Python objects.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim != 2 or vectors.shape[0] != len(chunk_ids):
+        raise ValueError(f"expected {len(chunk_ids)} vectors, got array of shape {vectors.shape}")
+    dim = vectors.shape[1]
+    model_bytes = model.encode("utf-8")
+
+    row_dtype = np.dtype(
+        [
+            ("nfields", ">i2"),
+            ("id_len", ">i4"),
+            ("id", "V16"),
+            ("model_len", ">i4"),
+            ("model", f"S{len(model_bytes)}"),
+            ("dim_len", ">i4"),
+            ("dim", ">i4"),
+            ("vec_len", ">i4"),
+            ("vec_dim", ">i2"),
+            ("vec_unused", ">i2"),
+            ("vec", ">f4", (dim,)),
+        ]
+    )
+    rows = np.empty(len(chunk_ids), dtype=row_dtype)
+    rows["nfields"] = 4
+    rows["id_len"] = 16
+    rows["id"] = np.frombuffer(b"".join(uuid.UUID(str(c)).bytes for c in chunk_ids), dtype="V16")
+    rows["model_len"] = len(model_bytes)
+    rows["model"] = model_bytes
+    rows["dim_len"] = 4
+    rows["dim"] = dim
+    rows["vec_len"] = 4 + 4 * dim
+    rows["vec_dim"] = dim
+    rows["vec_unused"] = 0
+    rows["vec"] = vectors
+    return _PGCOPY_HEADER + rows.tobytes() + _PGCOPY_TRAILER
+
+
+def copy_embeddings(
+    cur,
+    chunk_ids: Sequence[str],
+    vectors: np.ndarray,
+    *,
+    model: str,
+    table: str = "embeddings",
+) -> int:
+    if len(chunk_ids) == 0:
+        return 0
+    payload = encode_embeddings_copy_binary(chunk_ids, vectors, model)
+    cur.copy_expert(
+        f"COPY {table} (chunk_id, model, dim, vector) FROM STDIN WITH (FORMAT binary)",
+        io.BytesIO(payload),
+    )
+    return len(chunk_ids)
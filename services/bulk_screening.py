@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import os
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import psycopg2.extras
+from psycopg2.extras import Json
+
+from services.candidate_features import CandidateFeatures, rebuild_candidate_features
+from services.db import fetch_all, fetch_one, get_cursor
+from services.features import assess_seniority_level
+from services.jd_profile import JDProfile, get_jd_profile
+from services.retrieval import JOB_APPLICANTS_SQL, search_similar_chunks_for_candidates
+from services.screening import (
+    SCORING_WEIGHTS,
+    SENIORITY_MATCH,
+    _location_score,
+    _recommendation,
+    _summary,
+)
+from services.vector_index import get_job_vector_index
+
+
+DEFAULT_BATCH_SIZE = 1000
+EXPERIENCE_HITS_PER_CANDIDATE = 10
+EVIDENCE_HITS_PER_CANDIDATE = 5
+
+
+def _job_applicants(job_id: str) -> List[str]:
+    rows = fetch_all(JOB_APPLICANTS_SQL, (job_id, job_id))
+    return sorted(str(r["candidate_id"]) for r in rows)
+
+
+def _load_batch(candidate_ids: Sequence[str]) -> tuple[Dict[str, Optional[str]], Dict[str, CandidateFeatures]]:
+    rows = fetch_all(
+        "SELECT c.id AS candidate_id, c.location, f.document_id, f.skills, f.domains, f.years_experience, "
+        "f.seniority, f.has_text "
+        "FROM candidates c LEFT JOIN candidate_features f ON f.candidate_id = c.id "
+        "WHERE c.id = ANY(%s::uuid[])",
+        (list(candidate_ids),),
+    )
+    locations: Dict[str, Optional[str]] = {}
+    features: Dict[str, CandidateFeatures] = {}
+    for r in rows:
+        candidate_id = str(r["candidate_id"])
+        locations[candidate_id] = r["location"]
+        if r["document_id"] is not None:
+            features[candidate_id] = CandidateFeatures(
+                candidate_id=candidate_id,
+                document_id=str(r["document_id"]),
+                skills=list(r["skills"] or []),
+                domains=list(r["domains"] or []),
+                years_experience=float(r["years_experience"]),
+                seniority=r["seniority"],
+                has_text=r["has_text"],
+            )
+    # One batched backfill for every candidate still missing precomputed features
+    features.update(rebuild_candidate_features([c for c in locations if c not in features]))
+    return locations, features
+
+
+def _experience_hits(job_id: str, jd_vector: np.ndarray, candidate_ids: Sequence[str]) -> Dict[str, List[dict]]:
+    index = get_job_vector_index(job_id)
+    if index is not None:
+        return index.top_k_per_candidate(jd_vector, candidate_ids, EXPERIENCE_HITS_PER_CANDIDATE)
+    # One set-based query for the whole batch, with the JD vector sent once
+    return dict(
+        search_similar_chunks_for_candidates(
+            query_vector=jd_vector.tolist(),
+            candidate_ids=candidate_ids,
+            limit_per_candidate=EXPERIENCE_HITS_PER_CANDIDATE,
+        )
+    )
+
+
+def _membership(values: Sequence[Sequence[str]], vocabulary: Sequence[str]) -> np.ndarray:
+    matrix = np.zeros((len(values), len(vocabulary)), dtype=bool)
+    index = {term: j for j, term in enumerate(vocabulary)}
+    for i, terms in enumerate(values):
+        for term in terms:
+            j = index.get(term)
+            if j is not None:
+                matrix[i, j] = True
+    return matrix
+
+
+def _score_batch(
+    *,
+    job_id: str,
+    job_seniority: Optional[str],
+    job_location: Optional[str],
+    jd_profile: Optional[JDProfile],
+    candidate_ids: Sequence[str],
+) -> List[tuple]:
+    locations, features = _load_batch(candidate_ids)
+    candidate_ids = [c for c in candidate_ids if c in locations]
+    if not candidate_ids:
+        return []
+    empty = CandidateFeatures("", None, [], [], 0.0, assess_seniority_level(""), False)
+    feats = [features.get(c, empty) for c in candidate_ids]
+
+    jd_skills = jd_profile.skills if jd_profile else []
+    jd_domains = sorted(set(jd_profile.domains)) if jd_profile else []
+
+    # 1. Skills: candidates x JD-skills membership matrix
+    skill_matrix = _membership([f.skills for f in feats], jd_skills)
+    matched_counts = skill_matrix.sum(axis=1)
+    skills_score = matched_counts / len(jd_skills) if jd_skills else np.zeros(len(feats))
+
+    # 2. Seniority
+    job_level = (job_seniority or "").lower()
+    seniority_score = np.array(
+        [SENIORITY_MATCH.get((job_level, f.seniority), 1.0) if job_level else 1.0 for f in feats]
+    )
+
+    # 3. Domain
+    domain_matrix = _membership([f.domains for f in feats], jd_domains)
+    domain_score = domain_matrix.sum(axis=1) / len(jd_domains) if jd_domains else np.full(len(feats), 0.5)
+
+    # 4. Location
+    location_score = np.array([_location_score(job_location, locations[c]) for c in candidate_ids])
+
+    # 5. Experience: mean similarity of the top resume chunks to the JD
+    has_text = np.array([f.has_text for f in feats])
+    hits: Dict[str, List[dict]] = {}
+    if jd_profile and jd_profile.has_text and has_text.any():
+        hits = _experience_hits(job_id, jd_profile.embedding, [c for c, t in zip(candidate_ids, has_text) if t])
+    experience_score = np.array(
+        [round(float(np.mean([h["similarity"] for h in hits[c]])), 4) if hits.get(c) else 0.0 for c in candidate_ids]
+    )
+
+    weights = np.array([SCORING_WEIGHTS[k] for k in ("skills", "seniority", "domain", "location", "experience")])
+    criteria = np.column_stack([skills_score, seniority_score, domain_score, location_score, experience_score])
+    overall = criteria @ weights
+
+    rows = []
+    for i, candidate_id in enumerate(candidate_ids):
+        f = feats[i]
+        score = float(overall[i])
+        recommendation = _recommendation(score)
+        matching = [s for s, m in zip(jd_skills, skill_matrix[i]) if m]
+        summary = _summary(
+            recommendation, score, len(matching), len(jd_skills),
+            f.seniority, job_seniority, f.years_experience, float(location_score[i]),
+        )
+        evidence = {
+            "matching_skills": matching,
+            "missing_skills": [s for s, m in zip(jd_skills, skill_matrix[i]) if not m],
+            "candidate_seniority": f.seniority,
+            "job_seniority": job_seniority,
+            "experience_years": f.years_experience,
+            "domain_match": [d for d, m in zip(jd_domains, domain_matrix[i]) if m],
+            "location_match": bool(location_score[i] > 0.7),
+            "resume_evidence": hits.get(candidate_id, [])[:EVIDENCE_HITS_PER_CANDIDATE],
+        }
+        rows.append((candidate_id, job_id, score, summary, Json(evidence)))
+    return rows
+
+
+def _upsert_screenings(rows: List[tuple]) -> None:
+    with get_cursor(commit=True) as cur:
+        psycopg2.extras.execute_values(
+            cur,
+            "INSERT INTO screenings (candidate_id, job_id, fit_score, summary, evidence) VALUES %s "
+            "ON CONFLICT (candidate_id, job_id) DO UPDATE SET fit_score=EXCLUDED.fit_score, "
+            "summary=EXCLUDED.summary, evidence=EXCLUDED.evidence",
+            rows,
+            page_size=len(rows),
+        )
+
+
+def run_screening_for_job(*, job_id: str, candidate_ids: Optional[Sequence[str]] = None) -> Dict:
+    """Screen every applicant of a job (or the given candidates) in batches.
+
+    Scores use the same weights and rules as run_screening, computed as
+    NumPy arrays over a whole batch; retrieval and upserts are one query each
+    per batch.
+    """
+    started = time.perf_counter()
+    job_row = fetch_one("SELECT seniority, location FROM jobs WHERE id = %s", (job_id,))
+    job_seniority = job_row["seniority"] if job_row else ""
+    job_location = job_row["location"] if job_row else ""
+    jd_profile = get_jd_profile(job_id)
+
+    applicants = list(candidate_ids) if candidate_ids is not None else _job_applicants(job_id)
+    batch_size = int(os.getenv("SCREEN_ALL_BATCH_SIZE") or DEFAULT_BATCH_SIZE)
+
+    recommendations: Counter = Counter()
+    screened = 0
+    for offset in range(0, len(applicants), batch_size):
+        rows = _score_batch(
+            job_id=job_id,
+            job_seniority=job_seniority,
+            job_location=job_location,
+            jd_profile=jd_profile,
+            candidate_ids=applicants[offset : offset + batch_size],
+        )
+        if rows:
+            _upsert_screenings(rows)
+        screened += len(rows)
+        recommendations.update(_recommendation(row[2]) for row in rows)
+
+    return {
+        "job_id": job_id,
+        "screened": screened,
+        "recommendations": dict(recommendations),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
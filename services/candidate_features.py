@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence
+
+import psycopg2.extras
+
+from services.chunking import Chunk
+from services.db import fetch_all, get_cursor
+from services.features import assess_seniority_level, extract_domains, extract_skills, extract_years_experience
+
+
+_FEATURE_COLUMNS = "candidate_id, document_id, skills, domains, years_experience, seniority, has_text"
+
+
+@dataclass
+class CandidateFeatures:
+    candidate_id: str
+    document_id: Optional[str]
+    skills: List[str]
+    domains: List[str]
+    years_experience: float
+    seniority: str
+    has_text: bool
+
+
+def _features_from_text(candidate_id: str, document_id: Optional[str], resume_text: str) -> CandidateFeatures:
+    return CandidateFeatures(
+        candidate_id=candidate_id,
+        document_id=document_id,
+        skills=extract_skills(resume_text),
+        domains=extract_domains(resume_text),
+        years_experience=extract_years_experience(resume_text),
+        seniority=assess_seniority_level(resume_text),
+        has_text=bool(resume_text),
+    )
+
+
+def build_candidate_features(candidate_id: str, chunks: Sequence[Chunk], document_id: Optional[str] = None) -> CandidateFeatures:
+    # Same text screening used to rebuild from chunks: contents joined in position order
+    resume_text = "\n".join(ch.content for ch in sorted(chunks, key=lambda c: c.position))
+    return _features_from_text(candidate_id, document_id, resume_text)
+
+
+def save_candidate_features(cur, features: CandidateFeatures) -> None:
+    save_candidate_features_many(cur, [features])
+
+
+def save_candidate_features_many(cur, features: Sequence[CandidateFeatures]) -> None:
+    if not features:
+        return
+    psycopg2.extras.execute_values(
+        cur,
+        f"INSERT INTO candidate_features ({_FEATURE_COLUMNS}) VALUES %s "
+        "ON CONFLICT (candidate_id) DO UPDATE SET document_id=EXCLUDED.document_id, skills=EXCLUDED.skills, "
+        "domains=EXCLUDED.domains, years_experience=EXCLUDED.years_experience, seniority=EXCLUDED.seniority, "
+        "has_text=EXCLUDED.has_text",
+        [
+            (f.candidate_id, f.document_id, f.skills, f.domains, f.years_experience, f.seniority, f.has_text)
+            for f in features
+        ],
+        page_size=len(features),
+    )
+
+
+def _from_row(row: dict) -> CandidateFeatures:
+    return CandidateFeatures(
+        candidate_id=str(row["candidate_id"]),
+        document_id=str(row["document_id"]),
+        skills=list(row["skills"] or []),
+        domains=list(row["domains"] or []),
+        years_experience=float(row["years_experience"]),
+        seniority=row["seniority"],
+        has_text=row["has_text"],
+    )
+
+
+def rebuild_candidate_features(candidate_ids: Sequence[str]) -> Dict[str, CandidateFeatures]:
+    """Build and save features for resumes ingested before features existed.
+
+    Joins each candidate's active chunks, as screening did before features
+    were precomputed; one read and one write for the whole set. Candidates
+    without active chunks are left out.
+    """
+    if not candidate_ids:
+        return {}
+    rows = fetch_all(
+        "SELECT candidate_id, document_id, content, created_at FROM chunks "
+        "WHERE candidate_id = ANY(%s::uuid[]) AND is_active ORDER BY candidate_id, position",
+        (list(candidate_ids),),
+    )
+    rebuilt: Dict[str, CandidateFeatures] = {}
+    for candidate_id, group in groupby(rows, key=lambda r: str(r["candidate_id"])):
+        chunks = list(group)
+        latest_document_id = str(max(chunks, key=lambda r: r["created_at"])["document_id"])
+        rebuilt[candidate_id] = _features_from_text(
+            candidate_id, latest_document_id, "\n".join(r["content"] for r in chunks)
+        )
+    if rebuilt:
+        with get_cursor(commit=True) as cur:
+            save_candidate_features_many(cur, list(rebuilt.values()))
+    return rebuilt
+
+
+def load_candidate_features(candidate_ids: Sequence[str]) -> Dict[str, CandidateFeatures]:
+    if not candidate_ids:
+        return {}
+    rows = fetch_all(
+        f"SELECT {_FEATURE_COLUMNS} FROM candidate_features WHERE candidate_id = ANY(%s::uuid[])",
+        (list(candidate_ids),),
+    )
+    return {str(r["candidate_id"]): _from_row(r) for r in rows}
+
+
+def get_candidate_features(candidate_id: str) -> Optional[CandidateFeatures]:
+    features = load_candidate_features([candidate_id]).get(candidate_id)
+    return features or rebuild_candidate_features([candidate_id]).get(candidate_id)
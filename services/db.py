@@ -1,12 +1,22 @@
 import os
 import ssl
+import threading
+import time
 from contextlib import contextmanager
-from typing import Iterator, Optional
+from typing import Dict, Iterator, List, Optional
 
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
 
 
+DEFAULT_POOL_MIN_SIZE = 1
+DEFAULT_POOL_MAX_SIZE = 10
+DEFAULT_POOL_MAX_LIFETIME_SECONDS = 1800.0
+DEFAULT_POOL_CHECKOUT_TIMEOUT_SECONDS = 30.0
+DEFAULT_POOL_HEALTHCHECK_IDLE_SECONDS = 30.0
+
+
 def _build_conn_kwargs_from_env() -> dict:
     database_url: Optional[str] = os.getenv("DATABASE_URL")
     if not database_url:
@@ -15,14 +25,268 @@ def _build_conn_kwargs_from_env() -> dict:
     return {"dsn": database_url}
 
 
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+class PoolTimeoutError(RuntimeError):
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe psycopg2 connection pool.
+
+    Connections are validated on checkout: closed or broken connections and
+    connections older than ``max_lifetime`` are replaced, and connections idle
+    for longer than ``healthcheck_idle`` are pinged with ``SELECT 1`` first.
+    """
+
+    def __init__(
+        self,
+        conn_kwargs: dict,
+        *,
+        min_size: int = DEFAULT_POOL_MIN_SIZE,
+        max_size: int = DEFAULT_POOL_MAX_SIZE,
+        max_lifetime: float = DEFAULT_POOL_MAX_LIFETIME_SECONDS,
+        checkout_timeout: float = DEFAULT_POOL_CHECKOUT_TIMEOUT_SECONDS,
+        healthcheck_idle: float = DEFAULT_POOL_HEALTHCHECK_IDLE_SECONDS,
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"invalid pool size: min={min_size} max={max_size}")
+        self._conn_kwargs = conn_kwargs
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.healthcheck_idle = healthcheck_idle
+
+        self._cond = threading.Condition()
+        # (connection, created_at, returned_at); most recently returned last
+        self._idle: List[tuple] = []
+        self._created_at: Dict[int, float] = {}
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._timeouts = 0
+        self._connections_created = 0
+        self._connections_closed = 0
+        self._healthcheck_failures = 0
+
+        for _ in range(min_size):
+            conn = self._connect()
+            self._idle.append((conn, self._created_at[id(conn)], time.monotonic()))
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + self._in_use
+
+    def _connect(self) -> psycopg2.extensions.connection:
+        conn = psycopg2.connect(**self._conn_kwargs)
+        self._created_at[id(conn)] = time.monotonic()
+        self._connections_created += 1
+        return conn
+
+    def _forget(self, conn: psycopg2.extensions.connection) -> None:
+        # Caller holds self._cond; the connection is closed after releasing it
+        self._created_at.pop(id(conn), None)
+        self._connections_closed += 1
+
+    @staticmethod
+    def _close(conn: psycopg2.extensions.connection) -> None:
+        # Never under self._cond: a slow close must not stall every getconn
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, conn: psycopg2.extensions.connection, created_at: float, returned_at: float) -> bool:
+        now = time.monotonic()
+        if conn.closed or now - created_at > self.max_lifetime:
+            return False
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if now - returned_at > self.healthcheck_idle:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                conn.rollback()
+            except Exception:
+                self._healthcheck_failures += 1
+                return False
+        return True
+
+    def getconn(self) -> psycopg2.extensions.connection:
+        started = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("connection pool is closed")
+                if self._idle:
+                    conn, created_at, returned_at = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self.size < self.max_size:
+                    self._in_use += 1
+                    conn = None
+                    break
+                remaining = self.checkout_timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"timed out after {self.checkout_timeout}s waiting for a database connection "
+                        f"(pool max_size={self.max_size})"
+                    )
+                waited = True
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            self._checkouts += 1
+            if waited:
+                elapsed = time.monotonic() - started
+                self._waits += 1
+                self._wait_seconds += elapsed
+                self._max_wait_seconds = max(self._max_wait_seconds, elapsed)
+
+        # Connecting and health checks happen outside the lock; the slot is
+        # already reserved through _in_use.
+        try:
+            if conn is not None and not self._is_usable(conn, created_at, returned_at):
+                with self._cond:
+                    self._forget(conn)
+                self._close(conn)
+                conn = None
+            if conn is None:
+                conn = psycopg2.connect(**self._conn_kwargs)
+                with self._cond:
+                    self._created_at[id(conn)] = time.monotonic()
+                    self._connections_created += 1
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def putconn(self, conn: psycopg2.extensions.connection, discard: bool = False) -> None:
+        with self._cond:
+            if id(conn) not in self._created_at:
+                raise ValueError("connection was not checked out from this pool")
+        if not conn.closed and not discard:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            self._in_use -= 1
+            created_at = self._created_at[id(conn)]
+            expired = time.monotonic() - created_at > self.max_lifetime
+            discard = discard or conn.closed or expired or self._closed
+            if discard:
+                self._forget(conn)
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+        if discard:
+            self._close(conn)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for conn, _, _ in idle:
+                self._forget(conn)
+            self._cond.notify_all()
+        for conn, _, _ in idle:
+            self._close(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "saturation": round(self._in_use / self.max_size, 4),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "wait_seconds_total": round(self._wait_seconds, 6),
+                "wait_seconds_max": round(self._max_wait_seconds, 6),
+                "timeouts": self._timeouts,
+                "connections_created": self._connections_created,
+                "connections_closed": self._connections_closed,
+                "healthcheck_failures": self._healthcheck_failures,
+            }
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    _build_conn_kwargs_from_env(),
+                    min_size=_env_int("DB_POOL_MIN_SIZE", DEFAULT_POOL_MIN_SIZE),
+                    max_size=_env_int("DB_POOL_MAX_SIZE", DEFAULT_POOL_MAX_SIZE),
+                    max_lifetime=_env_float("DB_POOL_MAX_LIFETIME_SECONDS", DEFAULT_POOL_MAX_LIFETIME_SECONDS),
+                    checkout_timeout=_env_float("DB_POOL_CHECKOUT_TIMEOUT_SECONDS", DEFAULT_POOL_CHECKOUT_TIMEOUT_SECONDS),
+                    healthcheck_idle=_env_float("DB_POOL_HEALTHCHECK_IDLE_SECONDS", DEFAULT_POOL_HEALTHCHECK_IDLE_SECONDS),
+                )
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def connect_unpooled() -> psycopg2.extensions.connection:
+    """A connection outside the pool, for long-lived sessions such as LISTEN."""
+    return psycopg2.connect(**_build_conn_kwargs_from_env())
+
+
+def get_pool_stats() -> dict:
+    if _pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_pool.stats()}
+
+
 @contextmanager
 def get_connection() -> Iterator[psycopg2.extensions.connection]:
-    kwargs = _build_conn_kwargs_from_env()
-    conn = psycopg2.connect(**kwargs)
+    pool = get_pool()
+    conn = pool.getconn()
+    broken = False
     try:
         yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
     finally:
-        conn.close()
+        pool.putconn(conn, discard=broken)
 
 
 @contextmanager
@@ -38,6 +302,22 @@ def get_cursor(commit: bool = True) -> Iterator[psycopg2.extras.RealDictCursor]:
                 raise
 
 
+@contextmanager
+def get_server_cursor(name: str, itersize: int = 2000) -> Iterator[psycopg2.extras.RealDictCursor]:
+    """Named (server-side) cursor for large read-only results.
+
+    Iterating it fetches ``itersize`` rows per round trip instead of
+    materializing the whole result client-side.
+    """
+    with get_connection() as conn:
+        try:
+            with conn.cursor(name=name, cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                cur.itersize = itersize
+                yield cur
+        finally:
+            conn.rollback()
+
+
 def fetch_one(query: str, params: tuple | dict | None = None):
     with get_cursor(commit=False) as cur:
         cur.execute(query, params or ())
@@ -64,4 +344,3 @@ def execute(query: str, params: tuple | dict | None = None) -> None:
 def execute_many(query: str, seq_of_params: list[tuple] | list[dict]) -> None:
     with get_cursor(commit=True) as cur:
         psycopg2.extras.execute_batch(cur, query, seq_of_params)
-
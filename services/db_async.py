@@ -0,0 +1,100 @@
+"""Async counterparts of the services.db query helpers, on psycopg 3.
+
+The API's read-heavy async routes use these so that waiting on Postgres does
+not hold a thread. Queries use the same %s placeholders as psycopg2, and rows
+come back as dicts like RealDictCursor rows. The pool is opened and closed by
+the app's startup/shutdown handlers; ingestion, workers and scripts keep using
+the synchronous pool in services.db.
+"""
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from services.db import (
+    DEFAULT_POOL_CHECKOUT_TIMEOUT_SECONDS,
+    DEFAULT_POOL_MAX_LIFETIME_SECONDS,
+    DEFAULT_POOL_MAX_SIZE,
+    DEFAULT_POOL_MIN_SIZE,
+    _env_float,
+    _env_int,
+)
+
+
+_pool: Optional[AsyncConnectionPool] = None
+
+
+def _create_pool() -> AsyncConnectionPool:
+    database_url = os.getenv("DATABASE_URL")
+    if not database_url:
+        raise RuntimeError("DATABASE_URL is not set in environment")
+    return AsyncConnectionPool(
+        database_url,
+        min_size=_env_int("DB_ASYNC_POOL_MIN_SIZE", DEFAULT_POOL_MIN_SIZE),
+        max_size=_env_int("DB_ASYNC_POOL_MAX_SIZE", DEFAULT_POOL_MAX_SIZE),
+        max_lifetime=_env_float("DB_POOL_MAX_LIFETIME_SECONDS", DEFAULT_POOL_MAX_LIFETIME_SECONDS),
+        timeout=_env_float("DB_POOL_CHECKOUT_TIMEOUT_SECONDS", DEFAULT_POOL_CHECKOUT_TIMEOUT_SECONDS),
+        check=AsyncConnectionPool.check_connection,
+        kwargs={"row_factory": dict_row},
+        open=False,
+        name="hireloom-async",
+    )
+
+
+async def open_async_pool() -> None:
+    global _pool
+    if _pool is None:
+        _pool = _create_pool()
+        await _pool.open()
+
+
+async def close_async_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_async_pool() -> AsyncConnectionPool:
+    if _pool is None:
+        raise RuntimeError("Async DB pool is not open; call open_async_pool() at startup")
+    return _pool
+
+
+def get_async_pool_stats() -> dict:
+    if _pool is None:
+        return {"initialized": False}
+    return {"initialized": True, **_pool.get_stats()}
+
+
+async def fetch_one(query: str, params: tuple | dict | None = None):
+    async with get_async_pool().connection() as conn:
+        cur = await conn.execute(query, params or ())
+        return await cur.fetchone()
+
+
+async def fetch_one_commit(query: str, params: tuple | dict | None = None):
+    # The pool's connection context commits on a clean exit
+    async with get_async_pool().connection() as conn:
+        cur = await conn.execute(query, params or ())
+        return await cur.fetchone()
+
+
+async def fetch_all(query: str, params: tuple | dict | None = None):
+    async with get_async_pool().connection() as conn:
+        cur = await conn.execute(query, params or ())
+        return await cur.fetchall()
+
+
+async def execute(query: str, params: tuple | dict | None = None) -> None:
+    async with get_async_pool().connection() as conn:
+        await conn.execute(query, params or ())
+
+
+async def execute_many(query: str, seq_of_params: list[tuple] | list[dict]) -> None:
+    async with get_async_pool().connection() as conn:
+        async with conn.cursor() as cur:
+            await cur.executemany(query, seq_of_params)
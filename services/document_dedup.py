@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from services.db import fetch_one
+from services.embedding_cache import normalize_text
+
+
+_COUNTS = (
+    "(SELECT count(*) FROM chunks c WHERE c.document_id = d.id) AS chunks, "
+    "(SELECT count(*) FROM chunks c JOIN embeddings e ON e.chunk_id = c.id WHERE c.document_id = d.id) AS embedded"
+)
+
+
+@dataclass
+class ExistingDocument:
+    document_id: str
+    chunks: int
+    embedded: int
+
+    def as_result(self) -> Tuple[str, int, int]:
+        return self.document_id, self.chunks, self.embedded
+
+
+def content_sha256(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()
+
+
+def text_sha256(text: str) -> bytes:
+    # Extraction differences that only change whitespace still dedupe
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+def document_owner(source_type: str, job_id: Optional[str], candidate_id: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(column, id) that owns a document's versions: the candidate for resumes, the job for JDs."""
+    if source_type == "resume":
+        return "candidate_id", candidate_id
+    if source_type == "jd":
+        return "job_id", job_id
+    return None, None
+
+
+def find_current_duplicate(
+    *,
+    source_type: str,
+    job_id: Optional[str] = None,
+    candidate_id: Optional[str] = None,
+    content_hash: Optional[bytes] = None,
+    text_hash: Optional[bytes] = None,
+) -> Optional[ExistingDocument]:
+    """Return the owner's current document if it has the same bytes or text.
+
+    Only the latest active document of the owner (the candidate for resumes,
+    the job for JDs) is compared: re-uploading an older version is a new
+    version, not a duplicate, so derived features keep following the latest.
+    """
+    owner_column, owner_id = document_owner(source_type, job_id, candidate_id)
+    if not owner_id or not (content_hash or text_hash):
+        return None
+
+    row = fetch_one(
+        f"""
+        SELECT d.id, d.content_sha256, d.text_sha256, {_COUNTS}
+        FROM documents d
+        WHERE d.source_type = %s AND d.{owner_column} = %s AND d.is_active
+        ORDER BY d.created_at DESC
+        LIMIT 1
+        """,
+        (source_type, owner_id),
+    )
+    if not row or not is_same_document(row, content_hash=content_hash, text_hash=text_hash):
+        return None
+    return ExistingDocument(document_id=str(row["id"]), chunks=row["chunks"], embedded=row["embedded"])
+
+
+def is_same_document(row: dict, *, content_hash: Optional[bytes], text_hash: Optional[bytes]) -> bool:
+    """Whether a documents row (with its hash columns) has the same bytes or text."""
+    same_bytes = content_hash is not None and row["content_sha256"] is not None and bytes(row["content_sha256"]) == content_hash
+    same_text = text_hash is not None and row["text_sha256"] is not None and bytes(row["text_sha256"]) == text_hash
+    return same_bytes or same_text
+
+
+def existing_document(cur, document_id: str) -> ExistingDocument:
+    """The stored document's result, read on the caller's transaction."""
+    cur.execute(f"SELECT d.id, {_COUNTS} FROM documents d WHERE d.id = %s", (document_id,))
+    row = cur.fetchone()
+    return ExistingDocument(document_id=str(row["id"]), chunks=row["chunks"], embedded=row["embedded"])
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import psycopg2
+import psycopg2.extras
+
+from services.db import fetch_all, get_cursor
+
+
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def normalize_text(text: str) -> str:
+    # The tokenizer splits on whitespace, so runs of spaces/newlines and
+    # Unicode composition differences do not change the embedding.
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model_id: str, text: str) -> bytes:
+    return hashlib.sha256(model_id.encode("utf-8") + b"\x00" + normalize_text(text).encode("utf-8")).digest()
+
+
+class EmbeddingLRU:
+    """In-process LRU of embedding vectors bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    @staticmethod
+    def _entry_size(key: bytes, vector: np.ndarray) -> int:
+        return len(key) + vector.nbytes
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+            return vector
+
+    def put(self, key: bytes, vector: np.ndarray) -> None:
+        size = self._entry_size(key, vector)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= self._entry_size(key, previous)
+            self._entries[key] = vector
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                old_key, old_vector = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(old_key, old_vector)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+            }
+
+
+class EmbeddingCache:
+    """Two-tier cache: EmbeddingLRU in front of the ``embedding_cache`` table."""
+
+    def __init__(self, max_bytes: int, persistent: bool = True):
+        self.memory = EmbeddingLRU(max_bytes)
+        self.persistent = persistent
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    def _count(self, memory_hits: int = 0, persistent_hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            self.memory_hits += memory_hits
+            self.persistent_hits += persistent_hits
+            self.misses += misses
+
+    def get_many(self, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        found: Dict[bytes, np.ndarray] = {}
+        pending: List[bytes] = []
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[key] = vector
+            else:
+                pending.append(key)
+        memory_hits = len(found)
+
+        if pending and self.persistent:
+            rows = fetch_all(
+                "SELECT key, vector FROM embedding_cache WHERE key = ANY(%s::bytea[])",
+                ([psycopg2.Binary(k) for k in pending],),
+            )
+            for row in rows:
+                key = bytes(row["key"])
+                vector = np.frombuffer(bytes(row["vector"]), dtype="<f4")
+                self.memory.put(key, vector)
+                found[key] = vector
+
+        persistent_hits = len(found) - memory_hits
+        self._count(memory_hits, persistent_hits, len(keys) - len(found))
+        return found
+
+    def put_many(self, model_id: str, keys: Sequence[bytes], vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype="<f4")
+        for key, vector in zip(keys, vectors):
+            # A row view would keep the whole batch buffer alive behind one entry
+            self.memory.put(key, vector.copy())
+        if not self.persistent or not len(keys):
+            return
+        with get_cursor(commit=True) as cur:
+            psycopg2.extras.execute_values(
+                cur,
+                "INSERT INTO embedding_cache (key, model, dim, vector) VALUES %s ON CONFLICT (key) DO NOTHING",
+                [
+                    (psycopg2.Binary(key), model_id, vectors.shape[1], psycopg2.Binary(vector.tobytes()))
+                    for key, vector in zip(keys, vectors)
+                ],
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.persistent_hits + self.misses
+            hits = self.memory_hits + self.persistent_hits
+            counters = {
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+        return {"persistent": self.persistent, **counters, "memory": self.memory.stats()}
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                max_bytes = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES") or DEFAULT_CACHE_MAX_BYTES)
+                persistent = os.getenv("EMBEDDING_CACHE_PERSIST", "1").lower() not in ("0", "false", "no")
+                _cache = EmbeddingCache(max_bytes, persistent=persistent)
+    return _cache
+
+
+def get_embedding_cache_stats() -> dict:
+    if _cache is None:
+        return {"initialized": False}
+    return {"initialized": True, **_cache.stats()}
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import socket
+import struct
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+
+# Wire format over a Unix stream socket (all integers big-endian):
+#   on connect, server -> client: u32 length + UTF-8 model_id
+#   request,    client -> server: u32 length + UTF-8 JSON array of texts
+#   response,   server -> client: u8 status
+#       status 0: u32 rows + u32 dim + rows*dim little-endian float32
+#       status 1: u32 length + UTF-8 error message
+STATUS_OK = 0
+STATUS_ERROR = 1
+# Frames carry a batch of texts or a message; a larger length prefix means a
+# corrupt or hostile stream, not something to allocate
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+_U32 = struct.Struct(">I")
+_SHAPE = struct.Struct(">II")
+
+
+class EmbeddingWorkerError(RuntimeError):
+    pass
+
+
+class FrameTooLargeError(ValueError):
+    pass
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray(size)
+    view = memoryview(buf)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            raise ConnectionError("embedding worker connection closed")
+        received += n
+    return bytes(buf)
+
+
+def send_frame(sock: socket.socket, payload: bytes) -> None:
+    if len(payload) > MAX_FRAME_BYTES:
+        raise FrameTooLargeError(f"frame of {len(payload)} bytes exceeds {MAX_FRAME_BYTES}")
+    sock.sendall(_U32.pack(len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> bytes:
+    """Read one frame; FrameTooLargeError leaves the stream unusable."""
+    (length,) = _U32.unpack(recv_exact(sock, _U32.size))
+    if length > MAX_FRAME_BYTES:
+        raise FrameTooLargeError(f"frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+    return recv_exact(sock, length)
+
+
+def send_vectors(sock: socket.socket, vectors: np.ndarray) -> None:
+    vectors = np.ascontiguousarray(vectors, dtype="<f4")
+    rows, dim = vectors.shape
+    sock.sendall(bytes([STATUS_OK]) + _SHAPE.pack(rows, dim) + vectors.tobytes())
+
+
+def send_error(sock: socket.socket, message: str) -> None:
+    sock.sendall(bytes([STATUS_ERROR]))
+    send_frame(sock, message.encode("utf-8"))
+
+
+class RemoteEmbeddingBackend:
+    """Embedding backend that delegates to a shared ``services.embedding_worker``.
+
+    Each calling thread keeps its own persistent connection to the socket.
+    """
+
+    name = "remote"
+
+    def __init__(self, socket_path: str, timeout: float = 120.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._model_id: Optional[str] = None
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+            self._model_id = recv_frame(sock).decode("utf-8")
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def _socket(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = self._connect()
+            self._local.sock = sock
+        return sock
+
+    def _drop_socket(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    @property
+    def model_id(self) -> str:
+        if self._model_id is None:
+            self._socket()
+        assert self._model_id is not None
+        return self._model_id
+
+    def _request(self, texts: List[str]) -> np.ndarray:
+        sock = self._socket()
+        send_frame(sock, json.dumps(texts).encode("utf-8"))
+        status = recv_exact(sock, 1)[0]
+        if status != STATUS_OK:
+            raise EmbeddingWorkerError(recv_frame(sock).decode("utf-8"))
+        rows, dim = _SHAPE.unpack(recv_exact(sock, _SHAPE.size))
+        return np.frombuffer(recv_exact(sock, rows * dim * 4), dtype="<f4").reshape(rows, dim)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        try:
+            return self._request(texts)
+        except EmbeddingWorkerError:
+            raise
+        except FrameTooLargeError:
+            # Out of sync with the worker: this connection cannot be reused
+            self._drop_socket()
+            raise
+        except (ConnectionError, OSError):
+            # The worker may have restarted since this thread last connected
+            self._drop_socket()
+            try:
+                return self._request(texts)
+            except (ConnectionError, OSError):
+                self._drop_socket()
+                raise
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from services.metrics import Histogram
+
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 10.0
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+QUEUE_WAIT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+@dataclass
+class _EmbeddingRequest:
+    texts: List[str]
+    future: Future = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class EmbeddingScheduler:
+    """Coalesces embed calls from concurrent threads into shared model batches.
+
+    A batch is closed when it holds ``max_batch_size`` texts or when the
+    oldest request in it has waited ``max_wait_ms``. A single request larger
+    than ``max_batch_size`` is never split and forms its own batch.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        *,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+    ):
+        self._encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[_EmbeddingRequest]" = queue.Queue()
+        self._carry: Optional[_EmbeddingRequest] = None
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait = Histogram(QUEUE_WAIT_BUCKETS)
+
+        self._worker = threading.Thread(target=self._run, name="embedding-scheduler", daemon=True)
+        self._worker.start()
+
+    def submit(self, texts: List[str]) -> "Future[np.ndarray]":
+        request = _EmbeddingRequest(texts=list(texts))
+        self._queue.put(request)
+        return request.future
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.submit(texts).result()
+
+    def _collect_batch(self) -> List[_EmbeddingRequest]:
+        first = self._carry or self._queue.get()
+        self._carry = None
+        batch = [first]
+        size = len(first.texts)
+        deadline = first.enqueued_at + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if size + len(request.texts) > self.max_batch_size:
+                # Start the next batch with it instead of overshooting this one
+                self._carry = request
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            self._run_batch(self._collect_batch())
+
+    def _run_batch(self, batch: List[_EmbeddingRequest]) -> None:
+        started = time.monotonic()
+        texts: List[str] = []
+        for request in batch:
+            self.queue_wait.observe(started - request.enqueued_at)
+            texts.extend(request.texts)
+        self.batch_size.observe(len(texts))
+
+        try:
+            # Length-sorted batches minimise padding inside the forward pass
+            order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+            encoded = self._encode([texts[i] for i in order]) if texts else np.empty((0, 0), dtype=np.float32)
+            vectors = np.empty_like(encoded)
+            vectors[order] = encoded
+        except Exception as exc:
+            for request in batch:
+                request.future.set_exception(exc)
+            return
+
+        offset = 0
+        for request in batch:
+            request.future.set_result(vectors[offset : offset + len(request.texts)])
+            offset += len(request.texts)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queued_requests": self._queue.qsize(),
+            "batch_size": self.batch_size.snapshot(),
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+        }
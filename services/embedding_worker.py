@@ -0,0 +1,133 @@
+"""Long-lived embedding worker shared by every API worker on a node.
+
+    python -m services.embedding_worker --socket /run/hireloom/embed.sock --processes 2
+
+Each process loads the configured EMBEDDING_BACKEND once, optionally pinned
+to its own slice of the available cores. API workers connect by setting
+EMBEDDING_WORKER_SOCKET to the same path; requests from all connections are
+micro-batched together through an EmbeddingScheduler.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import signal
+import socket
+import threading
+from typing import List, Optional, Sequence
+
+from dotenv import load_dotenv
+
+from services.embedding_ipc import FrameTooLargeError, recv_frame, send_error, send_frame, send_vectors
+
+
+def _handle_connection(conn: socket.socket, backend, scheduler) -> None:
+    with conn:
+        try:
+            send_frame(conn, backend.model_id.encode("utf-8"))
+            while True:
+                try:
+                    texts = json.loads(recv_frame(conn).decode("utf-8"))
+                except (ConnectionError, FrameTooLargeError):
+                    # Closed, or a length prefix the stream cannot be resynced after
+                    return
+                except ValueError as exc:
+                    # The frame was read whole, so the connection stays usable
+                    send_error(conn, f"invalid request: {exc}")
+                    continue
+                try:
+                    vectors = scheduler.embed(texts)
+                except Exception as exc:
+                    send_error(conn, f"{type(exc).__name__}: {exc}")
+                    continue
+                send_vectors(conn, vectors)
+        except OSError:
+            return
+
+
+def _pin_to_cores(cores: Sequence[int]) -> None:
+    os.sched_setaffinity(0, set(cores))
+    try:
+        import torch
+
+        torch.set_num_threads(len(cores))
+    except ImportError:
+        pass
+
+
+def _serve_forever(listener: socket.socket, cores: Optional[Sequence[int]]) -> None:
+    # Imported here so the model is loaded after fork(), once per process
+    from services.embeddings import create_embedding_backend, get_embedding_scheduler_config
+    from services.embedding_scheduler import EmbeddingScheduler
+
+    if cores:
+        _pin_to_cores(cores)
+    backend = create_embedding_backend((os.getenv("EMBEDDING_BACKEND") or "torch").lower())
+    backend.encode(["warm-up"])
+    scheduler = EmbeddingScheduler(backend.encode, **get_embedding_scheduler_config())
+
+    while True:
+        conn, _ = listener.accept()
+        threading.Thread(target=_handle_connection, args=(conn, backend, scheduler), daemon=True).start()
+
+
+def _split_cores(processes: int) -> List[List[int]]:
+    available = sorted(os.sched_getaffinity(0))
+    per_process = max(1, len(available) // processes)
+    return [available[i * per_process : (i + 1) * per_process] or available for i in range(processes)]
+
+
+def serve(socket_path: str, processes: int = 1, pin_cores: bool = True) -> None:
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    os.chmod(socket_path, 0o660)
+    listener.listen(128)
+
+    if processes <= 1:
+        _serve_forever(listener, None)
+        return
+
+    core_sets = _split_cores(processes) if pin_cores else [None] * processes
+    children: List[int] = []
+    for cores in core_sets:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _serve_forever(listener, cores)
+            finally:
+                os._exit(1)
+        children.append(pid)
+
+    def _terminate(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _terminate)
+    signal.signal(signal.SIGINT, _terminate)
+    try:
+        for _ in children:
+            os.wait()
+    finally:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Shared embedding worker")
+    parser.add_argument("--socket", default=os.getenv("EMBEDDING_WORKER_SOCKET") or "/tmp/hireloom-embeddings.sock")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--no-pin", action="store_true", help="do not pin processes to cores")
+    args = parser.parse_args()
+    serve(args.socket, processes=args.processes, pin_cores=not args.no_pin)
+
+
+if __name__ == "__main__":
+    main()
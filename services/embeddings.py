@@ -1,26 +1,169 @@
+import os
+import threading
 from functools import lru_cache
-from typing import List
+from typing import TYPE_CHECKING, Dict, List, Optional
 
-try:
+import numpy as np
+
+from services.embedding_cache import cache_key, get_embedding_cache
+from services.embedding_ipc import RemoteEmbeddingBackend
+from services.embedding_scheduler import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, EmbeddingScheduler
+
+if TYPE_CHECKING:
     from sentence_transformers import SentenceTransformer
-except Exception as exc:  # pragma: no cover
-    raise RuntimeError(
-        "sentence-transformers is required. Please install it in your environment."
-    ) from exc
 
 
 EMBEDDING_MODEL_NAME = "BAAI/bge-base-en-v1.5"
 EMBEDDING_DIMENSION = 768
 
 
+DEFAULT_ONNX_MODEL_DIR = os.path.join("storage", "models", "bge-base-en-v1.5-onnx")
+DEFAULT_ONNX_FILE_NAME = os.path.join("onnx", "model_qint8_avx2.onnx")
+
+
+def _load_sentence_transformer(*args, **kwargs) -> "SentenceTransformer":
+    # Imported on first use: torch takes seconds to import, and every process
+    # that imports this module (PDF pool children re-importing __main__, the
+    # worker, scripts) would pay for it even when it never embeds
+    try:
+        from sentence_transformers import SentenceTransformer
+    except Exception as exc:  # pragma: no cover
+        raise RuntimeError(
+            "sentence-transformers is required. Please install it in your environment."
+        ) from exc
+    return SentenceTransformer(*args, **kwargs)
+
+
 @lru_cache(maxsize=1)
-def get_embedding_model() -> SentenceTransformer:
-    model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+def get_embedding_model() -> "SentenceTransformer":
+    model = _load_sentence_transformer(EMBEDDING_MODEL_NAME)
     return model
 
 
+class TorchEmbeddingBackend:
+    name = "torch"
+
+    def __init__(self) -> None:
+        self.model_id = EMBEDDING_MODEL_NAME
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = get_embedding_model().encode(texts, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+class OnnxEmbeddingBackend:
+    """Serves the same model from an int8-quantized ONNX export.
+
+    Create the export with ``python -m scripts.export_onnx_model``; requires
+    the ``onnx`` extra (sentence-transformers[onnx]).
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_dir: str = DEFAULT_ONNX_MODEL_DIR, file_name: str = DEFAULT_ONNX_FILE_NAME) -> None:
+        if not os.path.exists(os.path.join(model_dir, file_name)):
+            raise RuntimeError(
+                f"ONNX model {os.path.join(model_dir, file_name)} not found; run `python -m scripts.export_onnx_model` first"
+            )
+        self.model = _load_sentence_transformer(
+            model_dir,
+            backend="onnx",
+            model_kwargs={"file_name": file_name, "provider": "CPUExecutionProvider"},
+        )
+        # Quantized vectors differ slightly, so they get their own cache keys
+        self.model_id = f"{EMBEDDING_MODEL_NAME}#onnx:{os.path.basename(file_name)}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+EmbeddingBackend = TorchEmbeddingBackend | OnnxEmbeddingBackend | RemoteEmbeddingBackend
+
+
+def create_embedding_backend(name: str) -> EmbeddingBackend:
+    if name == "torch":
+        return TorchEmbeddingBackend()
+    if name == "onnx":
+        return OnnxEmbeddingBackend(
+            model_dir=os.getenv("EMBEDDING_ONNX_MODEL_DIR") or DEFAULT_ONNX_MODEL_DIR,
+            file_name=os.getenv("EMBEDDING_ONNX_FILE_NAME") or DEFAULT_ONNX_FILE_NAME,
+        )
+    raise ValueError(f"unknown EMBEDDING_BACKEND {name!r}; expected 'torch' or 'onnx'")
+
+
+@lru_cache(maxsize=1)
+def get_embedding_backend() -> EmbeddingBackend:
+    # With a shared worker on the node, this process never loads the model
+    worker_socket = os.getenv("EMBEDDING_WORKER_SOCKET")
+    if worker_socket:
+        return RemoteEmbeddingBackend(worker_socket)
+    return create_embedding_backend((os.getenv("EMBEDDING_BACKEND") or "torch").lower())
+
+
+def _encode(texts: List[str]) -> np.ndarray:
+    return get_embedding_backend().encode(texts)
+
+
+_scheduler: Optional[EmbeddingScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def _batching_enabled() -> bool:
+    return os.getenv("EMBEDDING_BATCHING", "1").lower() not in ("0", "false", "no")
+
+
+def get_embedding_scheduler_config() -> dict:
+    return {
+        "max_batch_size": int(os.getenv("EMBEDDING_BATCH_MAX_SIZE") or DEFAULT_MAX_BATCH_SIZE),
+        "max_wait_ms": float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS") or DEFAULT_MAX_WAIT_MS),
+    }
+
+
+def get_embedding_scheduler() -> EmbeddingScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = EmbeddingScheduler(_encode, **get_embedding_scheduler_config())
+    return _scheduler
+
+
+def get_embedding_scheduler_stats() -> dict:
+    if _scheduler is None:
+        return {"initialized": False}
+    return {"initialized": True, **_scheduler.stats()}
+
+
+def _encode_misses(texts: List[str]) -> np.ndarray:
+    if _batching_enabled():
+        return get_embedding_scheduler().embed(texts)
+    return _encode(texts)
+
+
+def embed_texts_array(texts: List[str]) -> np.ndarray:
+    if not texts:
+        return np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+
+    cache = get_embedding_cache()
+    model_id = get_embedding_backend().model_id
+    keys = [cache_key(model_id, t) for t in texts]
+    found = cache.get_many(list(dict.fromkeys(keys)))
+
+    # Only the first occurrence of each uncached text goes to the model
+    miss_texts: Dict[bytes, str] = {}
+    for key, text in zip(keys, texts):
+        if key not in found and key not in miss_texts:
+            miss_texts[key] = text
+    if miss_texts:
+        miss_keys = list(miss_texts)
+        vectors = _encode_misses(list(miss_texts.values()))
+        cache.put_many(model_id, miss_keys, vectors)
+        found.update(zip(miss_keys, vectors))
+
+    return np.stack([found[key] for key in keys]).astype(np.float32, copy=False)
+
+
 def embed_texts(texts: List[str]) -> List[List[float]]:
-    model = get_embedding_model()
-    vectors = model.encode(texts, normalize_embeddings=True, show_progress_bar=False)
-    return vectors.tolist()
+    return embed_texts_array(texts).tolist()
 
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from services.db import DEFAULT_POOL_MAX_SIZE
+
+
+T = TypeVar("T")
+
+# Async routes must not call blocking code on the event loop. Work goes to one
+# of two sized pools instead:
+#  - db:  short psycopg2 queries; sized to the connection pool so a thread never
+#         waits on a checkout while holding a slot
+#  - cpu: PDF extraction, embedding and full ingests; sized to the cores so
+#         uploads queue here rather than starving the db pool
+_db_executor: Optional[ThreadPoolExecutor] = None
+_cpu_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    global _db_executor
+    if _db_executor is None:
+        with _executor_lock:
+            if _db_executor is None:
+                size = int(os.getenv("API_DB_THREADS") or os.getenv("DB_POOL_MAX_SIZE") or DEFAULT_POOL_MAX_SIZE)
+                _db_executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="api-db")
+    return _db_executor
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    global _cpu_executor
+    if _cpu_executor is None:
+        with _executor_lock:
+            if _cpu_executor is None:
+                size = int(os.getenv("API_CPU_THREADS") or os.cpu_count() or 1)
+                _cpu_executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="api-cpu")
+    return _cpu_executor
+
+
+async def run_db(fn: Callable[..., T], *args, **kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_cpu(fn: Callable[..., T], *args, **kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_cpu_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def get_executor_stats() -> dict:
+    def _stats(executor: Optional[ThreadPoolExecutor]) -> dict:
+        if executor is None:
+            return {"initialized": False}
+        return {"initialized": True, "max_workers": executor._max_workers, "queued": executor._work_queue.qsize()}
+
+    return {"db": _stats(_db_executor), "cpu": _stats(_cpu_executor)}
+
+
+def shutdown_executors() -> None:
+    global _db_executor, _cpu_executor
+    with _executor_lock:
+        for executor in (_db_executor, _cpu_executor):
+            if executor is not None:
+                executor.shutdown(wait=True)
+        _db_executor = None
+        _cpu_executor = None
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import re
+from typing import List
+
+
+TECH_SKILLS = {
+    # frontend
+    "react", "next.js", "nextjs", "typescript", "javascript", "tailwind", "redux", "vite", "webpack",
+    # backend
+    "node", "express", "fastapi", "flask", "django", "go", "gin", "python",
+    # db/devops
+    "postgresql", "postgres", "mysql", "mongodb", "prisma", "docker", "kubernetes", "aws", "gcp", "cloudflare",
+}
+
+ALIASES = {
+    "nextjs": "next.js",
+    "js": "javascript",
+    "ts": "typescript",
+    "postgres": "postgresql",
+}
+
+DOMAIN_KEYWORDS = ['frontend', 'backend', 'full-stack', 'mobile', 'web', 'api', 'database', 'cloud', 'devops']
+
+
+def normalize_skill(token: str) -> str:
+    k = token.lower()
+    return ALIASES.get(k, k)
+
+
+def extract_skills(text: str) -> List[str]:
+    # crude skill extraction: keep tokens with letters, dots, plus signs, and hashes
+    tokens = re.findall(r"[A-Za-z][A-Za-z0-9.+#/-]{1,}\b", text)
+    norm = {normalize_skill(t) for t in tokens}
+    skills = [s for s in norm if s in TECH_SKILLS]
+    return sorted(set(skills))
+
+
+def extract_domains(text: str) -> List[str]:
+    lower = text.lower()
+    return [kw for kw in DOMAIN_KEYWORDS if kw in lower]
+
+
+def extract_years_experience(resume_text: str) -> float:
+    # Look for patterns like "2 years", "3+ years", "6 months"
+    patterns = [
+        r'(\d+(?:\.\d+)?)\s*(?:years?|yrs?)',
+        r'(\d+)\s*months?',
+        r'(\d+(?:\.\d+)?)\+\s*years?'
+    ]
+
+    years = 0.0
+    for pattern in patterns:
+        matches = re.findall(pattern, resume_text.lower())
+        for match in matches:
+            if 'month' in pattern:
+                years += float(match) / 12
+            else:
+                years += float(match)
+
+    return min(years, 20.0)  # cap at 20 years
+
+
+def assess_seniority_level(resume_text: str) -> str:
+    senior_keywords = ['senior', 'lead', 'principal', 'architect', 'manager', 'director', 'cto', 'vp']
+    mid_keywords = ['mid', 'intermediate', 'experienced']
+    junior_keywords = ['junior', 'entry', 'graduate', 'intern', 'trainee']
+
+    text_lower = resume_text.lower()
+
+    if any(keyword in text_lower for keyword in senior_keywords):
+        return 'senior'
+    elif any(keyword in text_lower for keyword in mid_keywords):
+        return 'mid'
+    elif any(keyword in text_lower for keyword in junior_keywords):
+        return 'junior'
+    else:
+        # Infer from experience years
+        years = extract_years_experience(resume_text)
+        if years >= 5:
+            return 'senior'
+        elif years >= 2:
+            return 'mid'
+        else:
+            return 'junior'
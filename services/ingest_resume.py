@@ -1,69 +1,17 @@
 from __future__ import annotations
 
-import hashlib
 from typing import Optional, Tuple
 
-from services.db import execute, fetch_one, fetch_one_commit, execute_many, fetch_all
+from services.candidate_features import build_candidate_features, save_candidate_features
 from services.chunking import chunk_text
-from services.embeddings import embed_texts, EMBEDDING_DIMENSION, EMBEDDING_MODEL_NAME
-
-try:
-    import pymupdf4llm
-except Exception as exc:  # pragma: no cover
-    raise RuntimeError("pymupdf4llm is required for PDF text extraction") from exc
-
-
-def _insert_document(title: str, raw_text: str, source_type: str, candidate_id: Optional[str] = None) -> str:
-    # For resumes, job_id is NULL
-    query = (
-        "INSERT INTO documents (job_id, source_type, title, raw_text, version, is_active) "
-        "VALUES (NULL, %s, %s, %s, 1, true) RETURNING id"
-    )
-    row = fetch_one_commit(query, (source_type, title, raw_text))
-    return row["id"]
-
-
-def _insert_chunks(document_id: str, candidate_id: Optional[str], chunks):
-    query = (
-        "INSERT INTO chunks (document_id, job_id, candidate_id, section, heading, content, token_count, position) "
-        "VALUES (%s, NULL, %s, %s, %s, %s, %s, %s) RETURNING id"
-    )
-    params = []
-    for ch in chunks:
-        params.append((document_id, candidate_id, ch.section, ch.heading, ch.content, ch.token_count, ch.position))
-    execute_many(query, params)
-    rows = fetch_one("SELECT COUNT(1) AS c FROM chunks WHERE document_id = %s", (document_id,))
-    return rows["c"]
-
-
-def _insert_embeddings_for_document(document_id: str) -> int:
-    # Read back chunks for this document
-    rows = fetch_one(
-        "SELECT count(1) AS c FROM chunks WHERE document_id = %s",
-        (document_id,),
-    )
-    # We will fetch in pages to embed
-    # Simplify: embed in one go for now
-    with_query = (
-        "SELECT id, content FROM chunks WHERE document_id = %s ORDER BY position"
-    )
-    chunks = fetch_all(with_query, (document_id,))
-    texts = [r["content"] for r in chunks]
-    vectors = embed_texts(texts)
-    assert len(vectors) == len(chunks)
-
-    insert_q = (
-        "INSERT INTO embeddings (chunk_id, model, dim, vector) VALUES (%s, %s, %s, %s)"
-    )
-    params = []
-    for r, v in zip(chunks, vectors):
-        params.append((r["id"], EMBEDDING_MODEL_NAME, EMBEDDING_DIMENSION, v))
-    execute_many(insert_q, params)
-    return len(params)
+from services.document_dedup import content_sha256 as document_content_sha256, find_current_duplicate, text_sha256
+from services.ingestion import IngestionUnitOfWork, ingest_document
+from services.pdf_extraction import ExtractionResult, extract_pdf, extract_pdf_file
+from services.vector_index import note_resume_ingested
 
 
 def extract_text_from_pdf(pdf_path: str) -> str:
-    return pymupdf4llm.to_markdown(pdf_path)
+    return extract_pdf_file(pdf_path).text
 
 
 def ingest_resume(
@@ -72,15 +20,58 @@ def ingest_resume(
     resume_title: str,
     pdf_path: Optional[str] = None,
     raw_text: Optional[str] = None,
+    extraction: Optional[ExtractionResult] = None,
+    content_sha256: Optional[bytes] = None,
 ) -> Tuple[str, int, int]:
+    """Ingest a resume from a PDF path or already-extracted text.
+
+    Pass ``extraction`` alongside ``raw_text`` when the text came from
+    services.pdf_extraction so the tier and time are recorded on the document,
+    and ``content_sha256`` of the uploaded bytes when there were any.
+
+    A re-upload of the candidate's current resume (same bytes, or same text
+    after normalization) returns the existing document without re-embedding.
+    """
     if not (pdf_path or raw_text):
         raise ValueError("Provide either pdf_path or raw_text")
 
-    text = raw_text or extract_text_from_pdf(pdf_path)  # type: ignore[arg-type]
-    document_id = _insert_document(resume_title, text, source_type="resume", candidate_id=candidate_id)
+    if not raw_text:
+        with open(pdf_path, "rb") as f:  # type: ignore[arg-type]
+            data = f.read()
+        content_sha256 = document_content_sha256(data)
+        # Checked before extraction: identical bytes need no parsing at all
+        existing = find_current_duplicate(source_type="resume", candidate_id=candidate_id, content_hash=content_sha256)
+        if existing is not None:
+            return existing.as_result()
+        extraction = extract_pdf(data)
+        raw_text = extraction.text
+    text = raw_text
+    text_hash = text_sha256(text)
+    existing = find_current_duplicate(
+        source_type="resume", candidate_id=candidate_id, content_hash=content_sha256, text_hash=text_hash
+    )
+    if existing is not None:
+        return existing.as_result()
 
     chunks = chunk_text(text)
-    _insert_chunks(document_id, candidate_id, chunks)
-    num_embedded = _insert_embeddings_for_document(document_id)
-    return document_id, len(chunks), num_embedded
 
+    def _save_features(uow: IngestionUnitOfWork, document_id: str) -> None:
+        if candidate_id:
+            save_candidate_features(uow.cursor, build_candidate_features(candidate_id, chunks, document_id=document_id))
+
+    # For resumes, documents.job_id is NULL; ownership lives on chunks.candidate_id
+    result = ingest_document(
+        source_type="resume",
+        title=resume_title,
+        raw_text=text,
+        candidate_id=candidate_id,
+        chunks=chunks,
+        on_written=_save_features,
+        content_sha256=content_sha256,
+        text_sha256=text_hash,
+        extraction_tier=extraction.tier if extraction else None,
+        extraction_ms=extraction.elapsed_ms if extraction else None,
+    )
+    # The candidate's previous chunks are no longer active
+    note_resume_ingested(candidate_id)
+    return result
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import psycopg2
+import psycopg2.extras
+
+from services.bulk_load import copy_chunks, copy_embeddings
+from services.chunking import Chunk, chunk_text
+from services.db import fetch_all, get_cursor
+from services.document_dedup import document_owner, existing_document, is_same_document, text_sha256 as document_text_sha256
+from services.embeddings import embed_texts_array, EMBEDDING_DIMENSION, EMBEDDING_MODEL_NAME
+from services.retrieval_cache import invalidate_local, notify_invalidation
+
+
+class IngestionUnitOfWork:
+    """Writes one document, its chunks and its embeddings on a single cursor.
+
+    Chunks and embeddings go through COPY (see services.bulk_load).
+    Everything is committed together when the surrounding
+    ``ingestion_unit_of_work()`` block exits, or rolled back on error,
+    including the deactivation of the version the document replaces.
+    """
+
+    def __init__(self, cur: psycopg2.extras.RealDictCursor):
+        self._cur = cur
+
+    @property
+    def cursor(self) -> psycopg2.extras.RealDictCursor:
+        return self._cur
+
+    def insert_document(
+        self,
+        *,
+        source_type: str,
+        title: str,
+        raw_text: str,
+        job_id: Optional[str] = None,
+        candidate_id: Optional[str] = None,
+        version: int = 1,
+        content_sha256: Optional[bytes] = None,
+        text_sha256: Optional[bytes] = None,
+        extraction_tier: Optional[str] = None,
+        extraction_ms: Optional[float] = None,
+    ) -> str:
+        self._cur.execute(
+            "INSERT INTO documents (job_id, candidate_id, source_type, title, raw_text, version, is_active, "
+            "content_sha256, text_sha256, extraction_tier, extraction_ms) "
+            "VALUES (%s, %s, %s, %s, %s, %s, true, %s, %s, %s, %s) RETURNING id",
+            (
+                job_id,
+                candidate_id,
+                source_type,
+                title,
+                raw_text,
+                version,
+                psycopg2.Binary(content_sha256) if content_sha256 is not None else None,
+                psycopg2.Binary(text_sha256) if text_sha256 is not None else None,
+                extraction_tier,
+                extraction_ms,
+            ),
+        )
+        return self._cur.fetchone()["id"]
+
+    def lock_active_document(self, *, source_type: str, owner_column: str, owner_id: str) -> Optional[dict]:
+        # Serializes concurrent new versions of the same owner's document. The
+        # advisory lock covers a first ingest, when there is no active row for
+        # FOR UPDATE to wait on and both inserts would hit the unique index.
+        self._cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"documents:{source_type}:{owner_id}",))
+        self._cur.execute(
+            "SELECT id, version, content_sha256, text_sha256 FROM documents "
+            f"WHERE source_type = %s AND {owner_column} = %s AND is_active "
+            "FOR UPDATE",
+            (source_type, owner_id),
+        )
+        return self._cur.fetchone()
+
+    def deactivate_document(self, document_id: str) -> None:
+        self._cur.execute("UPDATE documents SET is_active = false WHERE id = %s", (document_id,))
+
+    def insert_chunks(
+        self,
+        document_id: str,
+        chunks: Sequence[Chunk],
+        *,
+        job_id: Optional[str] = None,
+        candidate_id: Optional[str] = None,
+        content_hashes: Optional[Sequence[bytes]] = None,
+    ) -> List[str]:
+        return copy_chunks(
+            self._cur, document_id, chunks, job_id=job_id, candidate_id=candidate_id, content_hashes=content_hashes
+        )
+
+    def insert_embeddings(self, chunk_ids: Sequence[str], vectors: np.ndarray) -> int:
+        if len(chunk_ids) != len(vectors):
+            raise ValueError(f"got {len(vectors)} vectors for {len(chunk_ids)} chunks")
+        return copy_embeddings(self._cur, chunk_ids, vectors, model=EMBEDDING_MODEL_NAME)
+
+    def reuse_embeddings(self, source_document_id: str, chunk_ids: Sequence[str], content_hashes: Sequence[bytes]) -> List[str]:
+        """Copy vectors server-side from the source document's chunks with the same content hash.
+
+        Returns the chunk ids that received an embedding.
+        """
+        if not chunk_ids:
+            return []
+        self._cur.execute(
+            """
+            INSERT INTO embeddings (chunk_id, model, dim, vector)
+            SELECT n.chunk_id, src.model, src.dim, src.vector
+            FROM unnest(%s::uuid[], %s::bytea[]) AS n(chunk_id, content_sha256)
+            CROSS JOIN LATERAL (
+                SELECT e.model, e.dim, e.vector
+                FROM chunks c
+                JOIN embeddings e ON e.chunk_id = c.id
+                WHERE c.document_id = %s AND c.content_sha256 = n.content_sha256 AND e.model = %s
+                LIMIT 1
+            ) src
+            RETURNING chunk_id
+            """,
+            (list(chunk_ids), [psycopg2.Binary(h) for h in content_hashes], source_document_id, EMBEDDING_MODEL_NAME),
+        )
+        return [str(r["chunk_id"]) for r in self._cur.fetchall()]
+
+
+def _embed_chunks(chunks: Sequence[Chunk]) -> np.ndarray:
+    if not chunks:
+        return np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+    return embed_texts_array([ch.content for ch in chunks])
+
+
+def _reusable_chunk_hashes(source_type: str, owner_column: str, owner_id: str, content_hashes: Sequence[bytes]) -> Set[bytes]:
+    # Hashes of the new version's chunks that the active version already has embeddings for
+    rows = fetch_all(
+        f"""
+        SELECT DISTINCT c.content_sha256
+        FROM documents d
+        JOIN chunks c ON c.document_id = d.id
+        JOIN embeddings e ON e.chunk_id = c.id
+        WHERE d.source_type = %s AND d.{owner_column} = %s AND d.is_active
+          AND e.model = %s AND c.content_sha256 = ANY(%s::bytea[])
+        """,
+        (source_type, owner_id, EMBEDDING_MODEL_NAME, [psycopg2.Binary(h) for h in set(content_hashes)]),
+    )
+    return {bytes(r["content_sha256"]) for r in rows}
+
+
+@contextmanager
+def ingestion_unit_of_work() -> Iterator[IngestionUnitOfWork]:
+    with get_cursor(commit=True) as cur:
+        yield IngestionUnitOfWork(cur)
+
+
+def ingest_document(
+    *,
+    source_type: str,
+    title: str,
+    raw_text: str,
+    job_id: Optional[str] = None,
+    candidate_id: Optional[str] = None,
+    chunks: Optional[List[Chunk]] = None,
+    on_written: Optional[Callable[[IngestionUnitOfWork, str], None]] = None,
+    content_sha256: Optional[bytes] = None,
+    text_sha256: Optional[bytes] = None,
+    extraction_tier: Optional[str] = None,
+    extraction_ms: Optional[float] = None,
+) -> Tuple[str, int, int]:
+    """Chunk, embed and store a document atomically.
+
+    A resume with a candidate, or a JD, becomes the next version of its
+    owner's document: the active version is locked, deactivated and replaced
+    in the same transaction. Chunks whose content hash matches a chunk of the
+    active version get that embedding copied server-side; only new or changed
+    chunks are embedded.
+
+    ``on_written(uow, document_id)`` runs inside the same transaction, after
+    the document, chunks and embeddings are written, for derived records
+    that must commit (or roll back) together with them. Content hashes are
+    stored for services.document_dedup; ``text_sha256`` defaults to the hash
+    of ``raw_text``. If the active version turns out to have the same bytes
+    or text once it is locked, nothing is written and that document is
+    returned.
+    """
+    if chunks is None:
+        chunks = chunk_text(raw_text)
+    if text_sha256 is None:
+        text_sha256 = document_text_sha256(raw_text)
+    chunk_hashes = [document_text_sha256(ch.content) for ch in chunks]
+    owner_column, owner_id = document_owner(source_type, job_id, candidate_id)
+    reusable = _reusable_chunk_hashes(source_type, owner_column, owner_id, chunk_hashes) if owner_id and chunks else set()
+    to_embed = [i for i, h in enumerate(chunk_hashes) if h not in reusable]
+    to_reuse = [i for i, h in enumerate(chunk_hashes) if h in reusable]
+
+    # Embed before opening the transaction so a slow or failing model call
+    # neither holds a pooled connection nor leaves a half-written document.
+    vectors = _embed_chunks([chunks[i] for i in to_embed])
+
+    with ingestion_unit_of_work() as uow:
+        previous = None
+        if owner_id:
+            previous = uow.lock_active_document(source_type=source_type, owner_column=owner_column, owner_id=owner_id)
+        if previous is not None:
+            # The callers' find_current_duplicate ran before the lock; a concurrent
+            # upload of the same document may have committed since
+            if is_same_document(previous, content_hash=content_sha256, text_hash=text_sha256):
+                return existing_document(uow.cursor, previous["id"]).as_result()
+            uow.deactivate_document(previous["id"])
+        document_id = uow.insert_document(
+            source_type=source_type,
+            title=title,
+            raw_text=raw_text,
+            job_id=job_id,
+            candidate_id=candidate_id,
+            version=(previous["version"] or 1) + 1 if previous is not None else 1,
+            content_sha256=content_sha256,
+            text_sha256=text_sha256,
+            extraction_tier=extraction_tier,
+            extraction_ms=extraction_ms,
+        )
+        chunk_ids = uow.insert_chunks(document_id, chunks, job_id=job_id, candidate_id=candidate_id, content_hashes=chunk_hashes)
+        num_embedded = uow.insert_embeddings([chunk_ids[i] for i in to_embed], vectors)
+
+        if to_reuse:
+            reused = set()
+            if previous is not None:
+                reused.update(
+                    uow.reuse_embeddings(
+                        previous["id"], [chunk_ids[i] for i in to_reuse], [chunk_hashes[i] for i in to_reuse]
+                    )
+                )
+            # Another version replaced the planned source in the meantime: embed what it lacked
+            missing = [i for i in to_reuse if chunk_ids[i] not in reused]
+            num_embedded += len(reused) + uow.insert_embeddings(
+                [chunk_ids[i] for i in missing], _embed_chunks([chunks[i] for i in missing])
+            )
+        if on_written is not None:
+            on_written(uow, document_id)
+        # Delivered to every process's retrieval cache when this transaction commits
+        notify_invalidation(uow.cursor, job_id=job_id, candidate_id=candidate_id)
+    invalidate_local(job_id=job_id, candidate_id=candidate_id)
+    return document_id, len(chunks), num_embedded
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import psycopg2
+
+from services.chunking import Chunk
+from services.db import fetch_all, fetch_one, get_cursor
+from services.embeddings import embed_texts_array, get_embedding_backend
+from services.features import assess_seniority_level, extract_domains, extract_skills
+from services.retrieval_cache import invalidations_heard, subscribe_invalidations
+
+
+JD_TARGET_SECTIONS = ("requirements", "responsibilities", "other")
+DEFAULT_CACHE_TTL_SECONDS = 300.0
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+
+
+@dataclass
+class JDProfile:
+    job_id: str
+    document_id: Optional[str]
+    skills: List[str]
+    domains: List[str]
+    seniority: str
+    embedding: Optional[np.ndarray]
+
+    @property
+    def has_text(self) -> bool:
+        return self.embedding is not None
+
+
+def jd_target_text(sections: Dict[str, List[str]]) -> str:
+    return "\n".join(content for section in JD_TARGET_SECTIONS for content in sections.get(section, []))
+
+
+def build_jd_profile(job_id: str, chunks: Sequence[Chunk], document_id: Optional[str] = None) -> JDProfile:
+    sections: Dict[str, List[str]] = {}
+    for ch in sorted(chunks, key=lambda c: c.position):
+        sections.setdefault(ch.section, []).append(ch.content)
+    text = jd_target_text(sections)
+    return JDProfile(
+        job_id=job_id,
+        document_id=document_id,
+        skills=extract_skills(text),
+        domains=extract_domains(text),
+        seniority=assess_seniority_level(text),
+        embedding=embed_texts_array([text])[0] if text else None,
+    )
+
+
+def save_jd_profile(cur, profile: JDProfile) -> None:
+    embedding = (
+        psycopg2.Binary(np.ascontiguousarray(profile.embedding, dtype="<f4").tobytes())
+        if profile.embedding is not None
+        else None
+    )
+    cur.execute(
+        "INSERT INTO jd_profiles (job_id, document_id, skills, domains, seniority, model, embedding) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s) "
+        "ON CONFLICT (job_id) DO UPDATE SET document_id=EXCLUDED.document_id, skills=EXCLUDED.skills, "
+        "domains=EXCLUDED.domains, seniority=EXCLUDED.seniority, model=EXCLUDED.model, embedding=EXCLUDED.embedding",
+        (
+            profile.job_id,
+            profile.document_id,
+            profile.skills,
+            profile.domains,
+            profile.seniority,
+            get_embedding_backend().model_id,
+            embedding,
+        ),
+    )
+
+
+def _load_jd_profile(job_id: str) -> Optional[JDProfile]:
+    row = fetch_one(
+        "SELECT job_id, document_id, skills, domains, seniority, model, embedding FROM jd_profiles WHERE job_id = %s",
+        (job_id,),
+    )
+    if not row:
+        return None
+    embedding = np.frombuffer(bytes(row["embedding"]), dtype="<f4") if row["embedding"] is not None else None
+    if embedding is not None and row["model"] != get_embedding_backend().model_id:
+        # Stored with another embedding backend; rebuild so similarities stay comparable
+        return None
+    return JDProfile(
+        job_id=str(row["job_id"]),
+        document_id=str(row["document_id"]) if row["document_id"] else None,
+        skills=list(row["skills"] or []),
+        domains=list(row["domains"] or []),
+        seniority=row["seniority"] or "",
+        embedding=embedding,
+    )
+
+
+def _active_jd_document_id(job_id: str) -> Optional[str]:
+    row = fetch_one("SELECT id FROM documents WHERE job_id = %s AND source_type = 'jd' AND is_active", (job_id,))
+    return str(row["id"]) if row else None
+
+
+def _rebuild_jd_profile(job_id: str) -> Optional[JDProfile]:
+    # For JDs ingested before profiles existed: rebuild from the latest JD's chunks
+    doc = fetch_one(
+        "SELECT id FROM documents WHERE job_id = %s AND source_type = 'jd' AND is_active ORDER BY created_at DESC LIMIT 1",
+        (job_id,),
+    )
+    if not doc:
+        return None
+    rows = fetch_all(
+        "SELECT section, heading, content, token_count, position FROM chunks WHERE document_id = %s ORDER BY position",
+        (doc["id"],),
+    )
+    chunks = [
+        Chunk(content=r["content"], section=r["section"], heading=r["heading"], position=r["position"], token_count=r["token_count"])
+        for r in rows
+    ]
+    profile = build_jd_profile(job_id, chunks, document_id=str(doc["id"]))
+    with get_cursor(commit=True) as cur:
+        save_jd_profile(cur, profile)
+    return profile
+
+
+class _ProfileCache:
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[str, Tuple[float, JDProfile]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a profile read across one is not stored
+        self.generation = 0
+
+    @staticmethod
+    def _ttl() -> float:
+        return float(os.getenv("JD_PROFILE_CACHE_TTL_SECONDS") or DEFAULT_CACHE_TTL_SECONDS)
+
+    def get(self, job_id: str) -> Optional[JDProfile]:
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return None
+            loaded_at, profile = entry
+            if time.monotonic() - loaded_at > self._ttl():
+                del self._entries[job_id]
+                return None
+            self._entries.move_to_end(job_id)
+            return profile
+
+    def put(self, profile: JDProfile, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[profile.job_id] = (time.monotonic(), profile)
+            self._entries.move_to_end(profile.job_id)
+            while len(self._entries) > DEFAULT_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tags: Optional[Set[str]]) -> None:
+        with self._lock:
+            self.generation += 1
+            if tags is None:
+                self._entries.clear()
+                return
+            for tag in tags:
+                if tag.startswith("job:"):
+                    self._entries.pop(tag[len("job:"):], None)
+
+
+_cache = _ProfileCache()
+# Re-ingesting a JD anywhere notifies job:<id> on commit
+subscribe_invalidations(lambda tags: _cache.invalidate(tags))
+
+
+def get_jd_profile(job_id: str) -> Optional[JDProfile]:
+    if invalidations_heard():
+        # The listener drops the entry when any process re-ingests this job's JD
+        profile = _cache.get(job_id)
+        if profile is not None:
+            return profile
+    generation = _cache.generation
+    # The JD may have been re-ingested by another process: check the cached and
+    # stored profiles against the active JD version (one lookup on uq_documents_active_jd)
+    active_document_id = _active_jd_document_id(job_id)
+    profile = _cache.get(job_id)
+    if profile is not None and profile.document_id == active_document_id:
+        return profile
+    profile = _load_jd_profile(job_id)
+    if profile is None or profile.document_id != active_document_id:
+        profile = _rebuild_jd_profile(job_id)
+    if profile is not None:
+        _cache.put(profile, generation)
+    return profile
+
+
+def cache_jd_profile(profile: JDProfile) -> None:
+    _cache.put(profile)
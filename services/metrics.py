@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Sequence
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style (``le`` buckets)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets, self._counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            buckets["+Inf"] = self._count
+            return {
+                "count": self._count,
+                "sum": round(self._sum, 6),
+                "mean": round(self._sum / self._count, 6) if self._count else 0.0,
+                "buckets": buckets,
+            }
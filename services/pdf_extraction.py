@@ -0,0 +1,258 @@
+"""PDF text extraction on a process pool, from in-memory bytes.
+
+Layout analysis in pymupdf4llm is CPU-bound and holds the GIL, so it runs in
+worker processes (PDF_EXTRACT_PROCESSES, default: one per core) rather than
+on API or worker threads. Documents of PDF_PARALLEL_MIN_PAGES pages or more
+are split into page ranges that extract in parallel.
+
+Each document gets a deadline (PDF_EXTRACT_TIMEOUT_SECONDS). Inside the
+worker an interval timer interrupts the Python side of extraction; if the
+worker is stuck inside MuPDF and misses that, the caller stops waiting after
+a grace period and the pool is recycled so the process does not stay pinned.
+
+Extraction is tiered (PDF_EXTRACTION_MODE=tiered, the default): a cheap
+plain-text pass runs first and is kept unless a quality check fails (too
+little text, no recognizable resume sections, or side-by-side text columns
+whose reading order plain extraction scrambles). Only then does the document
+go through pymupdf4llm's markdown layout analysis. ``plain`` and ``markdown``
+force a single tier.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import re
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pymupdf
+    import pymupdf4llm
+except Exception as exc:  # pragma: no cover
+    raise RuntimeError("pymupdf4llm is required for PDF text extraction") from exc
+
+
+DEFAULT_TIMEOUT_SECONDS = 60.0
+DEFAULT_PARALLEL_MIN_PAGES = 8
+DEFAULT_PAGES_PER_TASK = 4
+TIMEOUT_GRACE_SECONDS = 5.0
+
+TIER_PLAIN = "plain"
+TIER_MARKDOWN = "markdown"
+EXTRACTION_MODES = ("tiered", TIER_PLAIN, TIER_MARKDOWN)
+
+PLAIN_MIN_CHARS_PER_PAGE = 200
+PLAIN_MIN_SECTIONS = 2
+# Same section keywords chunking.py splits on
+_SECTION_HEADING = re.compile(
+    r"^\s*(work experience|experience|skills|projects|education|certifications|certs)\b", re.IGNORECASE | re.MULTILINE
+)
+# A text column: a block spanning at least this share of the page height while
+# no wider than this share of the page width
+COLUMN_MIN_HEIGHT_RATIO = 0.15
+COLUMN_MAX_WIDTH_RATIO = 0.55
+
+
+@dataclass
+class ExtractionResult:
+    text: str
+    tier: str
+    elapsed_ms: float
+
+
+class PdfExtractionTimeout(RuntimeError):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise PdfExtractionTimeout("PDF extraction exceeded its deadline")
+
+
+@contextmanager
+def _deadline_alarm(deadline: float) -> Iterator[None]:
+    """Interrupt the Python side of a pool task once the caller's deadline passes.
+
+    Runs in a pool process, on its main thread, so SIGALRM is delivered here.
+    ``deadline`` is the caller's time.monotonic() value: CLOCK_MONOTONIC is
+    system-wide, and the remaining budget is taken when the task starts, so
+    a task that sat in the queue does not outlive the caller's wait.
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        # setitimer(0) would disable the timer instead of firing it
+        raise PdfExtractionTimeout("PDF extraction exceeded its deadline")
+    signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, remaining)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+def _extract_pages(data: bytes, pages: Optional[List[int]], deadline: float) -> str:
+    with _deadline_alarm(deadline):
+        with pymupdf.open(stream=data, filetype="pdf") as doc:
+            return pymupdf4llm.to_markdown(doc, pages=pages)
+
+
+def _has_text_columns(page) -> bool:
+    width, height = page.rect.width, page.rect.height
+    columns = [
+        b for b in page.get_text("blocks")
+        if b[6] == 0 and (b[3] - b[1]) >= COLUMN_MIN_HEIGHT_RATIO * height and (b[2] - b[0]) <= COLUMN_MAX_WIDTH_RATIO * width
+    ]
+    for i, a in enumerate(columns):
+        for b in columns[i + 1 :]:
+            side_by_side = a[2] <= b[0] or b[2] <= a[0]
+            overlap = min(a[3], b[3]) - max(a[1], b[1])
+            if side_by_side and overlap >= COLUMN_MIN_HEIGHT_RATIO * height:
+                return True
+    return False
+
+
+def _plain_text_problem(doc, text: str) -> Optional[str]:
+    if len(text.strip()) < PLAIN_MIN_CHARS_PER_PAGE * max(1, doc.page_count):
+        return "too little text"
+    sections = {m.group(1).lower() for m in _SECTION_HEADING.finditer(text)}
+    if len(sections) < PLAIN_MIN_SECTIONS:
+        return "no section headings"
+    if any(_has_text_columns(page) for page in doc):
+        return "multi-column layout"
+    return None
+
+
+def _extract_plain(data: bytes, deadline: float) -> Tuple[str, Optional[str]]:
+    """Plain-text tier; returns the text and why it is not good enough, if so."""
+    with _deadline_alarm(deadline):
+        with pymupdf.open(stream=data, filetype="pdf") as doc:
+            text = "\n".join(page.get_text("text", sort=True) for page in doc)
+            return text, _plain_text_problem(doc, text)
+
+
+def _register_worker(pids) -> None:
+    pids.put(os.getpid())
+
+
+class _PdfExecutor(ProcessPoolExecutor):
+    """Process pool that records its workers' pids, so stuck ones can be killed."""
+
+    def __init__(self, max_workers: int):
+        # forkserver: workers fork from a small server process that preloaded
+        # this module (and pymupdf), never from a parent running torch or DB
+        # pool threads. Children still re-import __main__, so entry points
+        # keep heavy imports out of module scope.
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        self._worker_pids = context.SimpleQueue()
+        super().__init__(
+            max_workers=max_workers, mp_context=context, initializer=_register_worker, initargs=(self._worker_pids,)
+        )
+
+    def terminate_workers(self) -> None:
+        while not self._worker_pids.empty():
+            try:
+                os.kill(self._worker_pids.get(), signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+_executor: Optional[_PdfExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_pdf_executor() -> _PdfExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = _PdfExecutor(int(os.getenv("PDF_EXTRACT_PROCESSES") or os.cpu_count() or 1))
+    return _executor
+
+
+def _recycle_pdf_executor(executor: _PdfExecutor) -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.terminate_workers()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pdf_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+def _page_ranges(page_count: int) -> List[Optional[List[int]]]:
+    min_pages = int(os.getenv("PDF_PARALLEL_MIN_PAGES") or DEFAULT_PARALLEL_MIN_PAGES)
+    per_task = int(os.getenv("PDF_PAGES_PER_TASK") or DEFAULT_PAGES_PER_TASK)
+    if page_count < min_pages:
+        return [None]
+    return [list(range(start, min(start + per_task, page_count))) for start in range(0, page_count, per_task)]
+
+
+def _page_count(data: bytes) -> int:
+    with pymupdf.open(stream=data, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def _result(future, deadline: float, futures, executor: _PdfExecutor, timeout: float):
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic() + TIMEOUT_GRACE_SECONDS))
+    except FutureTimeoutError:
+        # A task that started but missed its in-worker timer is stuck in native
+        # code; one that is still queued only means the pool is saturated
+        if any(f.running() for f in futures):
+            _recycle_pdf_executor(executor)
+        raise PdfExtractionTimeout(f"PDF extraction did not finish within {timeout:.0f}s") from None
+
+
+def _extract_markdown(data: bytes, deadline: float, timeout: float) -> str:
+    executor = get_pdf_executor()
+    ranges: Sequence[Optional[List[int]]] = _page_ranges(_page_count(data))
+    futures = [executor.submit(_extract_pages, data, pages, deadline) for pages in ranges]
+    try:
+        return "".join(_result(f, deadline, futures, executor, timeout) for f in futures)
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def extract_pdf(data: bytes, *, mode: Optional[str] = None, timeout: Optional[float] = None) -> ExtractionResult:
+    """Extract text from PDF bytes, reporting the tier used and the time spent.
+
+    Raises PdfExtractionTimeout past the per-document deadline.
+    """
+    mode = mode or os.getenv("PDF_EXTRACTION_MODE") or "tiered"
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Unknown PDF_EXTRACTION_MODE {mode!r}; expected one of {EXTRACTION_MODES}")
+    timeout = timeout or float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS") or DEFAULT_TIMEOUT_SECONDS)
+    started = time.perf_counter()
+    deadline = time.monotonic() + timeout
+
+    if mode != TIER_MARKDOWN:
+        executor = get_pdf_executor()
+        future = executor.submit(_extract_plain, data, deadline)
+        text, problem = _result(future, deadline, [future], executor, timeout)
+        if problem is None or mode == TIER_PLAIN:
+            return ExtractionResult(text, TIER_PLAIN, round((time.perf_counter() - started) * 1000, 1))
+
+    text = _extract_markdown(data, deadline, timeout)
+    return ExtractionResult(text, TIER_MARKDOWN, round((time.perf_counter() - started) * 1000, 1))
+
+
+def extract_pdf_file(path: str, **kwargs) -> ExtractionResult:
+    with open(path, "rb") as f:
+        return extract_pdf(f.read(), **kwargs)
+
+
+def extract_pdf_text(data: bytes, *, timeout: Optional[float] = None) -> str:
+    return extract_pdf(data, timeout=timeout).text
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+import uuid
+from typing import Optional
+
+from services.db import execute, fetch_one_commit
+from services.document_dedup import content_sha256, find_current_duplicate
+from services.ingest_resume import ingest_resume
+from services.pdf_extraction import extract_pdf
+from services.screening import run_screening
+
+
+DEFAULT_SPOOL_DIR = os.path.join("storage", "spool")
+
+
+def spool_dir() -> str:
+    path = os.getenv("PROCESSING_SPOOL_DIR") or DEFAULT_SPOOL_DIR
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _spool_payload(processing_id: str, data: bytes) -> str:
+    directory = spool_dir()
+    final_path = os.path.join(directory, f"{processing_id}.pdf")
+    # Write-then-rename so a worker never sees a partially written payload
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, final_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return final_path
+
+
+def enqueue_resume_processing(*, job_id: str, candidate_id: str, data: bytes, filename: Optional[str]) -> str:
+    processing_id = str(uuid.uuid4())
+    payload_path = _spool_payload(processing_id, data)
+    try:
+        fetch_one_commit(
+            "INSERT INTO processing_jobs (id, job_id, candidate_id, status, progress, payload_path, filename) "
+            "VALUES (%s, %s, %s, 'queued', 0, %s, %s) RETURNING id",
+            (processing_id, job_id, candidate_id, payload_path, filename),
+        )
+    except Exception:
+        os.remove(payload_path)
+        raise
+    return processing_id
+
+
+_PLAIN_NAME = re.compile(r"\s*([A-Z][A-Za-z.'-]+(?:[ \t]+[A-Z][A-Za-z.'-]+){1,3})[ \t]*$", re.MULTILINE)
+
+
+def _update_candidate_from_resume(candidate_id: str, text: str) -> None:
+    email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', text)
+    phone_match = re.search(r'(\+?91[\s-]?)?[6-9]\d{9}', text)
+    # Markdown tier renders the name as "# **Name**"; plain text has it as the first line
+    name_match = re.search(r'^#\s*\*\*([^*]+)\*\*', text, re.MULTILINE) or _PLAIN_NAME.match(text)
+
+    extracted_email = email_match.group(0) if email_match else None
+    extracted_phone = phone_match.group(0) if phone_match else None
+    extracted_name = name_match.group(1).strip() if name_match else None
+
+    update_fields = []
+    params = []
+    if extracted_name:
+        update_fields.append("full_name = %s")
+        params.append(extracted_name)
+    if extracted_email:
+        update_fields.append("email = %s")
+        params.append(extracted_email)
+    if extracted_phone:
+        update_fields.append("phone = %s")
+        params.append(extracted_phone)
+
+    if update_fields:
+        params.append(candidate_id)
+        execute(f"UPDATE candidates SET {', '.join(update_fields)} WHERE id = %s", tuple(params))
+
+
+def process_resume_job(*, processing_id: str, job_id: str, candidate_id: str, payload_path: str, filename: Optional[str]) -> None:
+    """Extract, ingest and screen one spooled resume upload.
+
+    Raises on failure; the worker decides whether to retry.
+    """
+    execute("UPDATE processing_jobs SET progress=10 WHERE id=%s", (processing_id,))
+    with open(payload_path, "rb") as f:
+        data = f.read()
+    content_hash = content_sha256(data)
+    # The same resume uploaded again (e.g. for another job) skips straight to screening
+    if find_current_duplicate(source_type="resume", candidate_id=candidate_id, content_hash=content_hash) is None:
+        extraction = extract_pdf(data)
+        _update_candidate_from_resume(candidate_id, extraction.text)
+
+        ingest_resume(
+            candidate_id=candidate_id,
+            resume_title=filename or os.path.basename(payload_path),
+            raw_text=extraction.text,
+            extraction=extraction,
+            content_sha256=content_hash,
+        )
+    execute("UPDATE processing_jobs SET progress=60 WHERE id=%s", (processing_id,))
+
+    run_screening(job_id=job_id, candidate_id=candidate_id)
@@ -1,8 +1,91 @@
 from __future__ import annotations
 
-from typing import Any, List, Optional
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
 
-from services.db import fetch_all
+from services.db import fetch_all, get_cursor, get_server_cursor
+from services.metrics import Histogram
+from services.retrieval_cache import get_retrieval_cache, search_tags, vector_digest
+
+
+# Vector search plans. Candidate- and job-scoped queries touch one active
+# document (a resume or a JD, at most a few dozen chunks): an exact scan of
+# those rows is cheaper and complete, whereas HNSW would walk the graph over
+# every embedding and drop most hits in the post-filter. Broad queries use
+# HNSW; with a residual filter (section) they use iterative index scans
+# (pgvector >= 0.8) so filtering cannot starve the LIMIT.
+PLAN_EXACT = "exact"
+PLAN_HNSW = "hnsw"
+PLAN_HNSW_ITERATIVE = "hnsw_iterative"
+SEARCH_PLANS = (PLAN_EXACT, PLAN_HNSW, PLAN_HNSW_ITERATIVE)
+
+DEFAULT_EF_SEARCH = 40
+MAX_EF_SEARCH = 1000
+SEARCH_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Compact vector storage (migration 0016). With VECTOR_STORAGE_MODE=halfvec or
+# binary the HNSW plans walk a half-precision or binary-quantized expression
+# index for a coarse top-N (limit x VECTOR_RERANK_FACTOR) and rerank those rows
+# by cosine distance on the full-precision vectors, which stay in embeddings.
+STORAGE_FULL = "full"
+STORAGE_HALFVEC = "halfvec"
+STORAGE_BINARY = "binary"
+STORAGE_MODES = (STORAGE_FULL, STORAGE_HALFVEC, STORAGE_BINARY)
+# Binary codes only approximate the ranking, so they need a wider candidate set
+DEFAULT_RERANK_FACTOR = {STORAGE_HALFVEC: 2, STORAGE_BINARY: 8}
+# Must match the index expressions in migration 0016 exactly
+_COARSE_DISTANCE = {
+    STORAGE_HALFVEC: "e.vector::halfvec(768) <=> %s::halfvec(768)",
+    STORAGE_BINARY: "binary_quantize(e.vector)::bit(768) <~> binary_quantize(%s::vector)::bit(768)",
+}
+
+_plan_latency = {
+    plan if storage == STORAGE_FULL else f"{plan}+{storage}": Histogram(SEARCH_LATENCY_BUCKETS)
+    for plan in SEARCH_PLANS
+    for storage in (STORAGE_MODES if plan != PLAN_EXACT else (STORAGE_FULL,))
+}
+
+
+class SearchResults(list):
+    """Result rows of one search, plus the plan that produced them."""
+
+    def __init__(self, rows, plan: str):
+        super().__init__(rows)
+        self.plan = plan
+
+
+def choose_search_plan(*, job_id: Optional[str] = None, candidate_id: Optional[str] = None, section: Optional[str] = None) -> str:
+    forced = os.getenv("VECTOR_SEARCH_PLAN")
+    if forced and forced != "auto":
+        if forced not in SEARCH_PLANS:
+            raise ValueError(f"Unknown VECTOR_SEARCH_PLAN {forced!r}; expected auto or one of {SEARCH_PLANS}")
+        return forced
+    if candidate_id or job_id:
+        return PLAN_EXACT
+    if section and (os.getenv("HNSW_ITERATIVE_SCAN") or "relaxed_order") != "off":
+        return PLAN_HNSW_ITERATIVE
+    return PLAN_HNSW
+
+
+def vector_storage_mode() -> str:
+    mode = os.getenv("VECTOR_STORAGE_MODE") or STORAGE_FULL
+    if mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown VECTOR_STORAGE_MODE {mode!r}; expected one of {STORAGE_MODES}")
+    return mode
+
+
+def _ef_search(limit: int, filtered: bool) -> int:
+    base = int(os.getenv("HNSW_EF_SEARCH") or DEFAULT_EF_SEARCH)
+    # Filtered searches discard candidates after the graph walk; widen the beam
+    return min(MAX_EF_SEARCH, max(base, limit * (4 if filtered else 2)))
+
+
+def get_retrieval_stats() -> dict:
+    return {"search_latency_seconds": {plan: h.snapshot() for plan, h in _plan_latency.items()}}
 
 
 def search_similar_chunks(
@@ -13,33 +96,173 @@ def search_similar_chunks(
     section: Optional[str] = None,
     limit: int = 5,
     similarity_threshold: float = 0.6,
-):
-    # Use SQL function if present; else inline query
+) -> SearchResults:
+    cache = get_retrieval_cache()
+    storage = vector_storage_mode()
+    cache_key = ("similar", storage, vector_digest(query_vector), job_id, candidate_id, section, limit)
+    cached, generation = cache.get(cache_key)
+    if cached is not None:
+        rows, plan = cached
+        return SearchResults([dict(r) for r in rows], plan)
+
     params: list[Any] = []
-    where = []
+    # Active versions only; matches the partial HNSW index predicate
+    where = ["e.is_active", "c.is_active"]
     if job_id:
         where.append("c.job_id = %s"); params.append(job_id)
     if candidate_id:
         where.append("c.candidate_id = %s"); params.append(candidate_id)
     if section:
         where.append("c.section = %s"); params.append(section)
+    where_sql = "WHERE " + " AND ".join(where)
+
+    plan = choose_search_plan(job_id=job_id, candidate_id=candidate_id, section=section)
+    label, scan_limit = plan, limit
+    if plan == PLAN_EXACT:
+        # MATERIALIZED fences the filter off from the ORDER BY, so the planner
+        # reads the few scoped rows by their btree index instead of the HNSW graph
+        sql = f'''
+            WITH scoped AS MATERIALIZED (
+                SELECT c.id, c.content, c.section, c.heading, c.document_id, e.vector
+                FROM chunks c
+                JOIN embeddings e ON c.id = e.chunk_id
+                {where_sql}
+            )
+            SELECT s.id as chunk_id, s.content, s.section, s.heading,
+                   1 - (s.vector <=> %s::vector) as similarity,
+                   d.title as document_title
+            FROM scoped s
+            JOIN documents d ON s.document_id = d.id
+            ORDER BY s.vector <=> %s::vector
+            LIMIT %s
+        '''
+        query_params = [*params, query_vector, query_vector, limit]
+    elif storage != STORAGE_FULL:
+        label = f"{plan}+{storage}"
+        scan_limit = limit * int(os.getenv("VECTOR_RERANK_FACTOR") or DEFAULT_RERANK_FACTOR[storage])
+        # The inner ORDER BY walks the compact index; the outer one is the exact rerank
+        sql = f'''
+            SELECT * FROM (
+                SELECT c.id as chunk_id, c.content, c.section, c.heading,
+                       1 - (e.vector <=> %s::vector) as similarity,
+                       d.title as document_title
+                FROM chunks c
+                JOIN embeddings e ON c.id = e.chunk_id
+                JOIN documents d ON c.document_id = d.id
+                {where_sql}
+                ORDER BY {_COARSE_DISTANCE[storage]}
+                LIMIT %s
+            ) coarse
+            ORDER BY similarity DESC
+            LIMIT %s
+        '''
+        query_params = [query_vector, *params, query_vector, scan_limit, limit]
+    else:
+        # Iterative scans may return rows slightly out of order; re-sort the few hits
+        sql = f'''
+            SELECT * FROM (
+                SELECT c.id as chunk_id, c.content, c.section, c.heading,
+                       1 - (e.vector <=> %s::vector) as similarity,
+                       d.title as document_title
+                FROM chunks c
+                JOIN embeddings e ON c.id = e.chunk_id
+                JOIN documents d ON c.document_id = d.id
+                {where_sql}
+                ORDER BY e.vector <=> %s::vector
+                LIMIT %s
+            ) hits
+            ORDER BY similarity DESC
+        '''
+        query_params = [query_vector, *params, query_vector, limit]
+
+    started = time.perf_counter()
+    with get_cursor(commit=False) as cur:
+        if plan != PLAN_EXACT:
+            # is_local=true: settings end with this transaction, not the pooled connection
+            cur.execute("SELECT set_config('hnsw.ef_search', %s, true)", (str(_ef_search(scan_limit, bool(section))),))
+            if plan == PLAN_HNSW_ITERATIVE:
+                cur.execute(
+                    "SELECT set_config('hnsw.iterative_scan', %s, true)",
+                    (os.getenv("HNSW_ITERATIVE_SCAN") or "relaxed_order",),
+                )
+        cur.execute(sql, tuple(query_params))
+        rows = cur.fetchall()
+    _plan_latency[label].observe(time.perf_counter() - started)
+    cache.put(cache_key, ([dict(r) for r in rows], label), search_tags(job_id=job_id, candidate_id=candidate_id), generation)
+    return SearchResults(rows, label)
+
+
+JOB_APPLICANTS_SQL = (
+    "SELECT candidate_id FROM processing_jobs WHERE job_id = %s AND candidate_id IS NOT NULL "
+    "UNION SELECT candidate_id FROM screenings WHERE job_id = %s"
+)
+
+
+def search_similar_chunks_for_candidates(
+    *,
+    query_vector: list[float],
+    candidate_ids: Optional[Sequence[str]] = None,
+    applicants_of_job: Optional[str] = None,
+    section: Optional[str] = None,
+    limit_per_candidate: int = 10,
+) -> Iterator[Tuple[str, List[dict]]]:
+    """Top chunks per candidate for one query vector, in a single query.
+
+    Scope is either ``candidate_ids`` or every applicant of
+    ``applicants_of_job`` (resolved server-side). The vector is sent once;
+    per-candidate top-k comes from a window over the scoped rows, which is an
+    exact scan like the per-candidate plan of search_similar_chunks.
+
+    Yields ``(candidate_id, rows)`` ordered by candidate, rows by similarity,
+    streamed from a server-side cursor. Candidates without active chunks are
+    not yielded. The pooled connection is held until the iterator is
+    exhausted or closed.
+    """
+    if (candidate_ids is None) == (applicants_of_job is None):
+        raise ValueError("Provide exactly one of candidate_ids or applicants_of_job")
+    if candidate_ids is not None:
+        scope_sql = "SELECT unnest(%s::uuid[]) AS candidate_id"
+        scope_params: list[Any] = [list(candidate_ids)]
+    else:
+        scope_sql = JOB_APPLICANTS_SQL
+        scope_params = [applicants_of_job, applicants_of_job]
+    section_sql = "WHERE c.section = %s" if section else ""
 
-    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
     sql = f'''
-        SELECT c.id as chunk_id, c.content, c.section, c.heading,
-               1 - (e.vector <=> %s::vector) as similarity,
+        WITH q AS MATERIALIZED (SELECT %s::vector AS v),
+        scope AS MATERIALIZED ({scope_sql}),
+        scored AS (
+            SELECT c.candidate_id, c.id as chunk_id, c.content, c.section, c.heading, c.document_id,
+                   e.vector <=> q.v as distance
+            FROM scope a
+            JOIN chunks c ON c.candidate_id = a.candidate_id AND c.is_active
+            JOIN embeddings e ON c.id = e.chunk_id AND e.is_active
+            CROSS JOIN q
+            {section_sql}
+        ),
+        ranked AS (
+            SELECT scored.*, row_number() OVER (PARTITION BY candidate_id ORDER BY distance) as rank
+            FROM scored
+        )
+        SELECT r.candidate_id, r.chunk_id, r.content, r.section, r.heading,
+               1 - r.distance as similarity,
                d.title as document_title
-        FROM chunks c
-        JOIN embeddings e ON c.id = e.chunk_id
-        JOIN documents d ON c.document_id = d.id
-        {where_sql}
-        ORDER BY e.vector <=> %s::vector
-        LIMIT %s
+        FROM ranked r
+        JOIN documents d ON r.document_id = d.id
+        WHERE r.rank <= %s
+        ORDER BY r.candidate_id, r.rank
     '''
-    # Vector needs to be cast; we'll pass as tuple/list and rely on psycopg2 adaptation
-    params2 = [query_vector, *params, query_vector, limit]
-    # Fallback: we can also use the SQL function search_similar_chunks if needed
-    return fetch_all(sql, tuple(params2))
+    params = [query_vector, *scope_params, *([section] if section else []), limit_per_candidate]
+
+    with get_server_cursor("search_similar_chunks_for_candidates") as cur:
+        cur.execute(sql, tuple(params))
+        for candidate_id, rows in groupby(cur, key=lambda r: r["candidate_id"]):
+            hits = []
+            for r in rows:
+                hit = dict(r)
+                del hit["candidate_id"]
+                hits.append(hit)
+            yield str(candidate_id), hits
 
 
 def hybrid_search_chunks(
@@ -52,8 +275,69 @@ def hybrid_search_chunks(
     limit: int = 5,
 ):
     params: list[Any] = []
-    where = ["to_tsvector('english', c.content) @@ plainto_tsquery('english', %s)"]
-    params.append(query_text)
+    # content_tsv is maintained by a trigger (migration 0015); the query is parsed once
+    where = ["c.content_tsv @@ q.tsq", "c.is_active", "e.is_active"]
+    if job_id:
+        where.append("c.job_id = %s"); params.append(job_id)
+    if candidate_id:
+        where.append("c.candidate_id = %s"); params.append(candidate_id)
+    if section:
+        where.append("c.section = %s"); params.append(section)
+    where_sql = "WHERE " + " AND ".join(where)
+    # MATERIALIZED: a LATERAL or plain subquery would be flattened and the
+    # similarity and rank recomputed for the ORDER BY; here each is computed once per row
+    sql = f'''
+        WITH scored AS MATERIALIZED (
+            SELECT c.id as chunk_id, c.content, c.section, c.heading,
+                   1 - (e.vector <=> %s::vector) as vector_similarity,
+                   ts_rank(c.content_tsv, q.tsq) as text_rank,
+                   d.title as document_title
+            FROM chunks c
+            JOIN embeddings e ON c.id = e.chunk_id
+            JOIN documents d ON c.document_id = d.id
+            CROSS JOIN plainto_tsquery('english', %s) AS q(tsq)
+            {where_sql}
+        )
+        SELECT * FROM scored
+        ORDER BY vector_similarity * 0.7 + text_rank * 0.3 DESC
+        LIMIT %s
+    '''
+    params2 = [query_vector, query_text, *params, limit]
+    return fetch_all(sql, tuple(params2))
+
+
+# Reciprocal rank fusion: each leg ranks independently (the vector leg through
+# the plan chooser above, the lexical leg through the content_tsv GIN index)
+# and a chunk scores sum(1 / (k + rank)) over the legs that returned it, so
+# chunks without lexical overlap still compete and neither score scale dominates.
+DEFAULT_RRF_K = 60
+DEFAULT_LEG_LIMIT_FACTOR = 4
+DEFAULT_HYBRID_LEG_THREADS = 8
+
+_leg_executor: Optional[ThreadPoolExecutor] = None
+_leg_executor_lock = threading.Lock()
+
+
+def _get_leg_executor() -> ThreadPoolExecutor:
+    global _leg_executor
+    if _leg_executor is None:
+        with _leg_executor_lock:
+            if _leg_executor is None:
+                size = int(os.getenv("HYBRID_LEG_THREADS") or DEFAULT_HYBRID_LEG_THREADS)
+                _leg_executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="hybrid-leg")
+    return _leg_executor
+
+
+def search_lexical_chunks(
+    *,
+    query_text: str,
+    job_id: Optional[str] = None,
+    candidate_id: Optional[str] = None,
+    section: Optional[str] = None,
+    limit: int = 20,
+) -> List[dict]:
+    params: list[Any] = []
+    where = ["c.content_tsv @@ q.tsq", "c.is_active"]
     if job_id:
         where.append("c.job_id = %s"); params.append(job_id)
     if candidate_id:
@@ -63,16 +347,64 @@ def hybrid_search_chunks(
     where_sql = "WHERE " + " AND ".join(where)
     sql = f'''
         SELECT c.id as chunk_id, c.content, c.section, c.heading,
-               1 - (e.vector <=> %s::vector) as vector_similarity,
-               ts_rank(to_tsvector('english', c.content), plainto_tsquery('english', %s)) as text_rank,
+               ts_rank(c.content_tsv, q.tsq) as text_rank,
                d.title as document_title
         FROM chunks c
-        JOIN embeddings e ON c.id = e.chunk_id
         JOIN documents d ON c.document_id = d.id
+        CROSS JOIN plainto_tsquery('english', %s) AS q(tsq)
         {where_sql}
-        ORDER BY (1 - (e.vector <=> %s::vector)) * 0.7 + ts_rank(to_tsvector('english', c.content), plainto_tsquery('english', %s)) * 0.3 DESC
+        ORDER BY text_rank DESC
         LIMIT %s
     '''
-    params2 = [query_vector, query_text, *params, query_vector, query_text, limit]
-    return fetch_all(sql, tuple(params2))
+    return fetch_all(sql, (query_text, *params, limit))
+
+
+def rrf_hybrid_search_chunks(
+    *,
+    query_vector: list[float],
+    query_text: str,
+    job_id: Optional[str] = None,
+    candidate_id: Optional[str] = None,
+    section: Optional[str] = None,
+    limit: int = 5,
+    k: Optional[int] = None,
+    vector_limit: Optional[int] = None,
+    text_limit: Optional[int] = None,
+) -> SearchResults:
+    """Hybrid retrieval fusing a vector leg and a lexical leg with RRF.
+
+    The legs run concurrently on separate pooled connections. ``k``
+    (HYBRID_RRF_K, default 60) damps the weight of top ranks; each leg
+    fetches ``vector_limit``/``text_limit`` rows (HYBRID_VECTOR_LIMIT /
+    HYBRID_TEXT_LIMIT, default 4x ``limit``). Rows carry the leg scores and
+    positions they were found at (None when a leg missed them) and
+    ``rrf_score``; ``.plan`` is ``rrf+<vector plan>``. Raises ValueError
+    when ``k`` is not positive.
+    """
+    if k is None:
+        k = int(os.getenv("HYBRID_RRF_K") or DEFAULT_RRF_K)
+    if k <= 0:
+        raise ValueError(f"RRF k must be positive, got {k}")
+    if vector_limit is None:
+        vector_limit = int(os.getenv("HYBRID_VECTOR_LIMIT") or limit * DEFAULT_LEG_LIMIT_FACTOR)
+    if text_limit is None:
+        text_limit = int(os.getenv("HYBRID_TEXT_LIMIT") or limit * DEFAULT_LEG_LIMIT_FACTOR)
+    filters = {"job_id": job_id, "candidate_id": candidate_id, "section": section}
+
+    lexical = _get_leg_executor().submit(search_lexical_chunks, query_text=query_text, limit=text_limit, **filters)
+    vector_hits = search_similar_chunks(query_vector=query_vector, limit=vector_limit, **filters)
+    text_hits = lexical.result()
+
+    fused: dict = {}
+    for position, hit in enumerate(vector_hits, start=1):
+        row = fused.setdefault(hit["chunk_id"], {**hit, "text_rank": None, "vector_position": None, "text_position": None})
+        row["vector_position"] = position
+    for position, hit in enumerate(text_hits, start=1):
+        row = fused.setdefault(hit["chunk_id"], {**hit, "similarity": None, "vector_position": None, "text_position": None})
+        row["text_rank"] = hit["text_rank"]
+        row["text_position"] = position
+    for row in fused.values():
+        row["rrf_score"] = sum(1.0 / (k + p) for p in (row["vector_position"], row["text_position"]) if p is not None)
 
+    ranked = sorted(fused.values(), key=lambda r: r["rrf_score"], reverse=True)[:limit]
+    return SearchResults(ranked, f"rrf+{vector_hits.plan}")
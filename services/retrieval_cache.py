@@ -0,0 +1,270 @@
+"""In-process LRU of retrieval results with ingest-driven invalidation.
+
+Re-running a screening or refreshing a page repeats identical searches, so
+results are cached under (kind, query vector hash, filters, limit). Each
+entry is tagged with what can change it: ``candidate:<id>`` and
+``job:<id>`` for scoped searches, ``global`` for unscoped ones.
+
+ingest_document sends ``pg_notify('retrieval_invalidate', tag)`` inside its
+transaction, so the notification is delivered only on commit and reaches
+every process, including API processes when the worker ingests. Each
+process runs one listener thread on a dedicated connection. Entries are
+only served while that listener is connected: a process that cannot hear
+invalidations (a script, a listener reconnecting) bypasses the cache, and
+the cache is cleared whenever the listener (re)connects, since
+notifications sent in between are lost.
+
+Other per-process caches keyed by the same owners (JD profiles) subscribe
+to the heard tags with ``subscribe_invalidations``.
+
+RETRIEVAL_CACHE_MAX_ENTRIES (default 5000) bounds the LRU; 0 disables it.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import select
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from services.db import connect_unpooled
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 5000
+INVALIDATION_CHANNEL = "retrieval_invalidate"
+TAG_GLOBAL = "global"
+LISTENER_POLL_SECONDS = 5.0
+LISTENER_RETRY_SECONDS = 5.0
+
+
+def vector_digest(query_vector) -> bytes:
+    return hashlib.sha256(np.ascontiguousarray(query_vector, dtype="<f4").tobytes()).digest()
+
+
+def search_tags(*, job_id: Optional[str] = None, candidate_id: Optional[str] = None) -> Tuple[str, ...]:
+    """Tags of a search's entry: its scope, or ``global`` when it spans all chunks."""
+    tags = []
+    if job_id:
+        tags.append(f"job:{job_id}")
+    if candidate_id:
+        tags.append(f"candidate:{candidate_id}")
+    return tuple(tags) or (TAG_GLOBAL,)
+
+
+def ingest_tags(*, job_id: Optional[str] = None, candidate_id: Optional[str] = None) -> Tuple[str, ...]:
+    """Tags to invalidate after new chunks are written for this owner."""
+    scoped = search_tags(job_id=job_id, candidate_id=candidate_id)
+    return scoped if scoped == (TAG_GLOBAL,) else (*scoped, TAG_GLOBAL)
+
+
+class RetrievalCache:
+    """LRU of search results bounded by entry count, with tag invalidation."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Tuple[str, ...]]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a result computed across one is not stored
+        self._generation = 0
+        self.listening = False
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def active(self) -> bool:
+        return self.max_entries > 0 and self.listening
+
+    def get(self, key: Hashable) -> Tuple[Optional[Any], int]:
+        """Cached value (or None) and the generation to pass to ``put``."""
+        with self._lock:
+            if not self.active:
+                self.bypassed += 1
+                return None, self._generation
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, self._generation
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], self._generation
+
+    def put(self, key: Hashable, value: Any, tags: Iterable[str], generation: int) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            if not self.active or generation != self._generation:
+                return
+            self._remove(key)
+            self._entries[key] = (value, tags)
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            self._generation += 1
+            removed = 0
+            for tag in tags:
+                for key in list(self._by_tag.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+            self.invalidations += removed
+            return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "listening": self.listening,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+_cache: Optional[RetrievalCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = RetrievalCache(int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES") or DEFAULT_MAX_ENTRIES))
+    return _cache
+
+
+def get_retrieval_cache_stats() -> dict:
+    if _cache is None:
+        return {"initialized": False}
+    return {"initialized": True, **_cache.stats()}
+
+
+# Called with the invalidated tags, or None when everything must be dropped
+_subscribers: List[Callable[[Optional[Set[str]]], None]] = []
+
+
+def subscribe_invalidations(callback: Callable[[Optional[Set[str]]], None]) -> None:
+    _subscribers.append(callback)
+
+
+def _publish(tags: Optional[Set[str]]) -> None:
+    for callback in _subscribers:
+        callback(tags)
+
+
+def invalidations_heard() -> bool:
+    """Whether this process's listener is connected, so every invalidation reaches it."""
+    return _cache is not None and _cache.listening
+
+
+def notify_invalidation(cur, *, job_id: Optional[str] = None, candidate_id: Optional[str] = None) -> None:
+    """Queue invalidations on the writer's transaction; delivered on commit."""
+    for tag in ingest_tags(job_id=job_id, candidate_id=candidate_id):
+        cur.execute("SELECT pg_notify(%s, %s)", (INVALIDATION_CHANNEL, tag))
+
+
+def invalidate_local(*, job_id: Optional[str] = None, candidate_id: Optional[str] = None) -> None:
+    # The listener will hear the same tags; this only removes the delay for the writing process
+    tags = ingest_tags(job_id=job_id, candidate_id=candidate_id)
+    if _cache is not None:
+        _cache.invalidate(tags)
+    _publish(set(tags))
+
+
+class _InvalidationListener(threading.Thread):
+    def __init__(self, cache: RetrievalCache):
+        super().__init__(name="retrieval-cache-listener", daemon=True)
+        self.cache = cache
+        self._stopping = threading.Event()
+
+    def _listen(self) -> None:
+        conn = connect_unpooled()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {INVALIDATION_CHANNEL}")
+            # Anything committed before LISTEN took effect was never heard
+            self.cache.clear()
+            _publish(None)
+            self.cache.listening = True
+            while not self._stopping.is_set():
+                if select.select([conn], [], [], LISTENER_POLL_SECONDS) == ([], [], []):
+                    # A dead connection never becomes readable: probe it so a
+                    # lost server raises here and goes through reconnect-and-clear
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT 1")
+                conn.poll()
+                tags = {n.payload for n in conn.notifies}
+                conn.notifies.clear()
+                if tags:
+                    self.cache.invalidate(tags)
+                    _publish(tags)
+        finally:
+            self.cache.listening = False
+            conn.close()
+
+    def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("retrieval cache listener failed; bypassing cache until it reconnects")
+                self._stopping.wait(LISTENER_RETRY_SECONDS)
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+_listener: Optional[_InvalidationListener] = None
+
+
+def start_invalidation_listener() -> None:
+    global _listener
+    cache = get_retrieval_cache()
+    if cache.max_entries <= 0 or _listener is not None:
+        return
+    _listener = _InvalidationListener(cache)
+    _listener.start()
+
+
+def stop_invalidation_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener.join(timeout=LISTENER_POLL_SECONDS + 1)
+        _listener = None
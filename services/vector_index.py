@@ -0,0 +1,420 @@
+"""In-process mirror of a hot job's applicant chunk embeddings.
+
+Bulk screening and per-candidate screening of a job with many applicants
+run the same exact per-candidate similarity scan against pgvector over and
+over. With VECTOR_INDEX_ENABLED=1, a job with at least
+VECTOR_INDEX_MIN_APPLICANTS applicants gets its applicants' active chunks
+loaded once into a contiguous float32 matrix of unit vectors; queries are
+then a matrix-vector product in process, with the same results as the
+exact SQL plan.
+
+Indexes are loaded lazily on first use and kept within
+VECTOR_INDEX_MAX_BYTES (LRU over jobs). Resumes ingested in this process
+mark the candidate stale at once (``note_resume_ingested``); changes made
+by other processes (the worker) are picked up by comparing each
+applicant's active resume document every VECTOR_INDEX_REVALIDATE_SECONDS.
+Only changed candidates are reloaded.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from services.db import fetch_all, get_server_cursor
+from services.embeddings import EMBEDDING_DIMENSION
+from services.retrieval import JOB_APPLICANTS_SQL
+
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MIN_APPLICANTS = 200
+DEFAULT_REVALIDATE_SECONDS = 30.0
+# Python-side bookkeeping per row (ids, section, heading strings) on top of
+# the vector and the content text
+ROW_OVERHEAD_BYTES = 256
+
+
+def vector_index_enabled() -> bool:
+    return os.getenv("VECTOR_INDEX_ENABLED", "0").lower() not in ("0", "false", "no")
+
+
+@dataclass(frozen=True)
+class _Rows:
+    """Immutable row set; updates build a new one so readers never lock."""
+
+    vectors: np.ndarray  # (n, dim) float32 unit vectors
+    candidate_ids: np.ndarray  # (n,) str
+    chunk_ids: np.ndarray  # (n,) object
+    contents: np.ndarray  # (n,) object
+    sections: np.ndarray  # (n,) object
+    headings: np.ndarray  # (n,) object
+    document_titles: np.ndarray  # (n,) object
+    content_bytes: np.ndarray  # (n,) int64
+
+    @classmethod
+    def from_records(cls, records: Sequence[dict]) -> "_Rows":
+        vectors = np.empty((len(records), EMBEDDING_DIMENSION), dtype=np.float32)
+        for i, r in enumerate(records):
+            vectors[i] = r["vector"]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+        return cls(
+            vectors=vectors,
+            candidate_ids=np.array([r["candidate_id"] for r in records], dtype=str),
+            chunk_ids=np.array([r["chunk_id"] for r in records], dtype=object),
+            contents=np.array([r["content"] for r in records], dtype=object),
+            sections=np.array([r["section"] for r in records], dtype=object),
+            headings=np.array([r["heading"] for r in records], dtype=object),
+            document_titles=np.array([r["document_title"] for r in records], dtype=object),
+            content_bytes=np.array([len(r["content"]) for r in records], dtype=np.int64),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + int(self.content_bytes.sum()) + ROW_OVERHEAD_BYTES * len(self.chunk_ids)
+
+    def replace_candidates(self, candidate_ids: Sequence[str], loaded: "_Rows") -> "_Rows":
+        """Drop these candidates' rows and append ``loaded``, column by column."""
+        keep = ~np.isin(self.candidate_ids, list(candidate_ids))
+        return _Rows(**{f.name: np.concatenate([getattr(self, f.name)[keep], getattr(loaded, f.name)]) for f in fields(self)})
+
+
+def _decode_vector(value) -> np.ndarray:
+    # vector_send(): int16 dim, int16 unused, then big-endian float4 values
+    return np.frombuffer(bytes(value), dtype=">f4", offset=4)
+
+
+def _load_records(candidate_ids: Sequence[str]) -> List[dict]:
+    if not candidate_ids:
+        return []
+    records = []
+    with get_server_cursor("vector_index_load") as cur:
+        cur.execute(
+            """
+            SELECT c.candidate_id, c.id AS chunk_id, c.content, c.section, c.heading,
+                   d.title AS document_title, vector_send(e.vector) AS vector
+            FROM chunks c
+            JOIN embeddings e ON e.chunk_id = c.id AND e.is_active
+            JOIN documents d ON d.id = c.document_id
+            WHERE c.candidate_id = ANY(%s::uuid[]) AND c.is_active
+            """,
+            (list(candidate_ids),),
+        )
+        for r in cur:
+            records.append({**r, "candidate_id": str(r["candidate_id"]), "chunk_id": str(r["chunk_id"]),
+                            "vector": _decode_vector(r["vector"])})
+    return records
+
+
+def _active_resumes(job_id: str) -> Dict[str, Optional[str]]:
+    """Applicant -> id of their active resume document (None without one)."""
+    rows = fetch_all(
+        f"""
+        SELECT a.candidate_id, d.id AS document_id
+        FROM ({JOB_APPLICANTS_SQL}) a
+        LEFT JOIN documents d ON d.candidate_id = a.candidate_id AND d.source_type = 'resume' AND d.is_active
+        """,
+        (job_id, job_id),
+    )
+    return {str(r["candidate_id"]): str(r["document_id"]) if r["document_id"] else None for r in rows}
+
+
+def _resume_documents(candidate_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+    candidate_ids = list(candidate_ids)
+    rows = fetch_all(
+        "SELECT candidate_id, id FROM documents WHERE candidate_id = ANY(%s::uuid[]) AND source_type = 'resume' "
+        "AND is_active",
+        (candidate_ids,),
+    )
+    found = {str(r["candidate_id"]): str(r["id"]) for r in rows}
+    return {c: found.get(c) for c in candidate_ids}
+
+
+class JobVectorIndex:
+    """Exact top-k-per-candidate search over one job's applicant chunks."""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._rows = _Rows.from_records([])
+        # Candidate -> active resume document the loaded rows came from
+        self._documents: Dict[str, Optional[str]] = {}
+        self._stale: Set[str] = set()
+        self._validated_at = 0.0
+        # _lock guards the fields above and is never held across a query;
+        # _reload_lock serializes loads and reloads, the only writers of _rows
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self.queries = 0
+        self.candidate_reloads = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._rows.nbytes
+
+    def __len__(self) -> int:
+        return len(self._rows.chunk_ids)
+
+    def load(self) -> None:
+        with self._reload_lock:
+            documents = _active_resumes(self.job_id)
+            rows = _Rows.from_records(_load_records(list(documents)))
+            with self._lock:
+                self._rows = rows
+                self._documents = documents
+                self._stale.clear()
+                self._validated_at = time.monotonic()
+
+    def mark_stale(self, candidate_id: str) -> bool:
+        with self._lock:
+            if candidate_id not in self._documents:
+                return False
+            self._stale.add(candidate_id)
+            return True
+
+    def _needs_refresh(self, candidate_ids: Sequence[str], revalidate: float) -> bool:
+        # Caller holds self._lock
+        return (
+            time.monotonic() - self._validated_at >= revalidate
+            or bool(self._stale)
+            or any(c not in self._documents for c in candidate_ids)
+        )
+
+    def _reload(self, pending: Set[str]) -> None:
+        # Caller holds self._reload_lock, so self._rows only changes here: the
+        # queries and the splice run without self._lock, which is only taken
+        # for the swap
+        documents = _resume_documents(pending)
+        loaded = _Rows.from_records(_load_records(list(documents)))
+        rows = self._rows.replace_candidates(list(documents), loaded)
+        with self._lock:
+            self._rows = rows
+            self._documents.update(documents)
+            self.candidate_reloads += len(documents)
+
+    def _refresh(self, candidate_ids: Sequence[str]) -> None:
+        revalidate = float(os.getenv("VECTOR_INDEX_REVALIDATE_SECONDS") or DEFAULT_REVALIDATE_SECONDS)
+        with self._lock:
+            self.queries += 1
+            if not self._needs_refresh(candidate_ids, revalidate):
+                return
+        with self._reload_lock:
+            with self._lock:
+                due = time.monotonic() - self._validated_at >= revalidate
+            if due:
+                # Another process may have ingested resumes or added applicants
+                documents = _active_resumes(self.job_id)
+                with self._lock:
+                    self._stale.update(c for c, d in documents.items() if self._documents.get(c, "") != d)
+                    self._validated_at = time.monotonic()
+            with self._lock:
+                pending = set(self._stale) | {c for c in candidate_ids if c not in self._documents}
+                # Marks that arrive during the reload are kept for the next one
+                self._stale.difference_update(pending)
+            if not pending:
+                return
+            try:
+                self._reload(pending)
+            except BaseException:
+                with self._lock:
+                    self._stale.update(c for c in pending if c in self._documents)
+                raise
+
+    def top_k_per_candidate(
+        self,
+        query_vector,
+        candidate_ids: Sequence[str],
+        k: int,
+        *,
+        section: Optional[str] = None,
+    ) -> Dict[str, List[dict]]:
+        """Same rows as retrieval.search_similar_chunks_for_candidates, as a dict.
+
+        Candidates outside the index (new applicants) are loaded first.
+        """
+        candidate_ids = [str(c) for c in candidate_ids]
+        self._refresh(candidate_ids)
+        rows = self._rows
+        if not len(rows.chunk_ids) or not candidate_ids or k <= 0:
+            return {}
+
+        mask = np.isin(rows.candidate_ids, candidate_ids)
+        if section:
+            mask &= rows.sections == section
+        idx = np.flatnonzero(mask)
+        if not len(idx):
+            return {}
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        similarity = rows.vectors[idx] @ (query / norm if norm else query)
+
+        owners = rows.candidate_ids[idx]
+        order = np.lexsort((-similarity, owners))
+        owners, idx, similarity = owners[order], idx[order], similarity[order]
+        position = np.arange(len(idx))
+        starts = np.r_[True, owners[1:] != owners[:-1]]
+        rank = position - np.maximum.accumulate(np.where(starts, position, 0))
+
+        hits: Dict[str, List[dict]] = {}
+        for j in np.flatnonzero(rank < k):
+            i = idx[j]
+            hits.setdefault(str(owners[j]), []).append(
+                {
+                    "chunk_id": rows.chunk_ids[i],
+                    "content": rows.contents[i],
+                    "section": rows.sections[i],
+                    "heading": rows.headings[i],
+                    "similarity": float(similarity[j]),
+                    "document_title": rows.document_titles[i],
+                }
+            )
+        return hits
+
+
+class _LoadSlot:
+    """Lock for one job's load plus the threads holding or waiting on it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0  # guarded by the registry's _lock
+
+
+class VectorIndexRegistry:
+    """LRU of JobVectorIndex objects bounded by their total bytes."""
+
+    def __init__(self, max_bytes: int, min_applicants: int):
+        self.max_bytes = max_bytes
+        self.min_applicants = min_applicants
+        self._indexes: "OrderedDict[str, JobVectorIndex]" = OrderedDict()
+        # Jobs found too small or too large, until the next revalidation
+        self._skipped: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Job -> slot serializing its load, while one is running or awaited
+        self._loading: Dict[str, _LoadSlot] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def _bytes(self) -> int:
+        return sum(index.nbytes for index in self._indexes.values())
+
+    def get(self, job_id: str) -> Optional[JobVectorIndex]:
+        with self._lock:
+            index = self._indexes.get(job_id)
+            if index is not None:
+                self._indexes.move_to_end(job_id)
+                return index
+            skipped_at = self._skipped.get(job_id)
+            revalidate = float(os.getenv("VECTOR_INDEX_REVALIDATE_SECONDS") or DEFAULT_REVALIDATE_SECONDS)
+            if skipped_at is not None and time.monotonic() - skipped_at < revalidate:
+                return None
+            slot = self._loading.get(job_id)
+            if slot is None:
+                slot = self._loading[job_id] = _LoadSlot()
+            slot.users += 1
+
+        try:
+            with slot.lock:
+                return self._load(job_id)
+        finally:
+            with self._lock:
+                slot.users -= 1
+                # Only in-flight loads keep a slot, so the map stays as small as they are
+                if not slot.users:
+                    del self._loading[job_id]
+
+    def _load(self, job_id: str) -> Optional[JobVectorIndex]:
+        # Caller holds the job's load slot
+        with self._lock:
+            index = self._indexes.get(job_id)
+        if index is not None:
+            return index
+        size = fetch_all(
+            f"""
+            SELECT count(DISTINCT a.candidate_id) AS applicants, count(c.id) AS chunks
+            FROM ({JOB_APPLICANTS_SQL}) a
+            LEFT JOIN chunks c ON c.candidate_id = a.candidate_id AND c.is_active
+            """,
+            (job_id, job_id),
+        )[0]
+        if size["applicants"] < self.min_applicants:
+            return self._skip(job_id)
+        # Vectors alone already over budget: skip without loading the job
+        if size["chunks"] * (EMBEDDING_DIMENSION * 4 + ROW_OVERHEAD_BYTES) > self.max_bytes:
+            return self._skip(job_id)
+        index = JobVectorIndex(job_id)
+        index.load()
+        if index.nbytes > self.max_bytes:
+            return self._skip(job_id)
+        with self._lock:
+            self.loads += 1
+            self._indexes[job_id] = index
+            self._skipped.pop(job_id, None)
+            while self._bytes() > self.max_bytes and len(self._indexes) > 1:
+                self._indexes.popitem(last=False)
+                self.evictions += 1
+        return index
+
+    def _skip(self, job_id: str) -> None:
+        with self._lock:
+            self._skipped[job_id] = time.monotonic()
+        return None
+
+    def mark_stale(self, candidate_id: str) -> None:
+        with self._lock:
+            indexes = list(self._indexes.values())
+        for index in indexes:
+            index.mark_stale(candidate_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "jobs": len(self._indexes),
+                "rows": sum(len(index) for index in self._indexes.values()),
+                "bytes": self._bytes(),
+                "max_bytes": self.max_bytes,
+                "min_applicants": self.min_applicants,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "queries": sum(index.queries for index in self._indexes.values()),
+                "candidate_reloads": sum(index.candidate_reloads for index in self._indexes.values()),
+            }
+
+
+_registry: Optional[VectorIndexRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_vector_index_registry() -> VectorIndexRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = VectorIndexRegistry(
+                    max_bytes=int(os.getenv("VECTOR_INDEX_MAX_BYTES") or DEFAULT_MAX_BYTES),
+                    min_applicants=int(os.getenv("VECTOR_INDEX_MIN_APPLICANTS") or DEFAULT_MIN_APPLICANTS),
+                )
+    return _registry
+
+
+def get_job_vector_index(job_id: str) -> Optional[JobVectorIndex]:
+    """The job's in-process index, or None when disabled or the job is not hot."""
+    if not vector_index_enabled():
+        return None
+    return get_vector_index_registry().get(str(job_id))
+
+
+def note_resume_ingested(candidate_id: Optional[str]) -> None:
+    if candidate_id and _registry is not None:
+        _registry.mark_stale(str(candidate_id))
+
+
+def get_vector_index_stats() -> dict:
+    if _registry is None:
+        return {"enabled": vector_index_enabled(), "initialized": False}
+    return {"enabled": vector_index_enabled(), "initialized": True, **_registry.stats()}
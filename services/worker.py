@@ -0,0 +1,194 @@
+"""Processing worker: claims queued rows from processing_jobs and runs them.
+
+    python -m services.worker --concurrency 4
+
+Any number of workers, on any number of nodes, can run against the same
+database: rows are claimed with FOR UPDATE SKIP LOCKED and held under a
+lease that the worker renews while the job runs. A worker that dies stops
+renewing, and its jobs become claimable again once the lease expires.
+Failed jobs are retried with exponential backoff up to max_attempts.
+Payloads are read from PROCESSING_SPOOL_DIR, which must be shared storage
+when workers run on other nodes than the API.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+from services.db import execute, get_cursor
+from services.pdf_extraction import shutdown_pdf_executor
+from services.processing import process_resume_job
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 2
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_POLL_SECONDS = 1.0
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 900
+
+
+def _backoff_seconds(attempts: int) -> int:
+    return min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+
+class Worker:
+    def __init__(self, *, concurrency: int, lease_seconds: int, poll_seconds: float):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="processing")
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def claim(self, limit: int) -> List[dict]:
+        with get_cursor(commit=True) as cur:
+            cur.execute(
+                """
+                UPDATE processing_jobs p
+                SET status = 'running', attempts = p.attempts + 1, locked_by = %s,
+                    lease_expires_at = NOW() + make_interval(secs => %s)
+                FROM (
+                    SELECT id FROM processing_jobs
+                    WHERE (status = 'queued' AND run_after <= NOW())
+                       OR (status = 'running' AND lease_expires_at < NOW())
+                    ORDER BY run_after
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ) picked
+                WHERE p.id = picked.id
+                RETURNING p.id, p.job_id, p.candidate_id, p.attempts, p.max_attempts, p.payload_path, p.filename
+                """,
+                (self.worker_id, self.lease_seconds, limit),
+            )
+            return cur.fetchall()
+
+    def _renew_leases(self) -> None:
+        with self._lock:
+            ids = list(self._in_flight)
+        if ids:
+            execute(
+                "UPDATE processing_jobs SET lease_expires_at = NOW() + make_interval(secs => %s) "
+                "WHERE id = ANY(%s::uuid[]) AND locked_by = %s AND status = 'running'",
+                (self.lease_seconds, ids, self.worker_id),
+            )
+
+    def _finish(self, query: str, params: tuple) -> bool:
+        """Run a terminal UPDATE; False when the lease was lost to another worker."""
+        with get_cursor(commit=True) as cur:
+            cur.execute(query, params)
+            return cur.rowcount > 0
+
+    def _complete(self, job: dict) -> None:
+        owned = self._finish(
+            "UPDATE processing_jobs SET status = 'done', progress = 100, error_message = NULL, "
+            "lease_expires_at = NULL, locked_by = NULL WHERE id = %s AND locked_by = %s",
+            (job["id"], self.worker_id),
+        )
+        self._remove_payload(job, owned)
+
+    def _fail(self, job: dict, error: str) -> None:
+        if job["attempts"] < job["max_attempts"]:
+            execute(
+                "UPDATE processing_jobs SET status = 'queued', error_message = %s, "
+                "run_after = NOW() + make_interval(secs => %s), lease_expires_at = NULL, locked_by = NULL "
+                "WHERE id = %s AND locked_by = %s",
+                (error, _backoff_seconds(job["attempts"]), job["id"], self.worker_id),
+            )
+            return
+        owned = self._finish(
+            "UPDATE processing_jobs SET status = 'error', error_message = %s, lease_expires_at = NULL, locked_by = NULL "
+            "WHERE id = %s AND locked_by = %s",
+            (error, job["id"], self.worker_id),
+        )
+        self._remove_payload(job, owned)
+
+    @staticmethod
+    def _remove_payload(job: dict, owned: bool) -> None:
+        if not owned:
+            # The lease expired and another worker reclaimed the job: the payload is theirs now
+            logger.warning("lost lease on processing job %s; leaving %s in place", job["id"], job.get("payload_path"))
+            return
+        path = job.get("payload_path")
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def _run_job(self, job: dict) -> None:
+        job_key = str(job["id"])
+        try:
+            if job["attempts"] > job["max_attempts"]:
+                # Reclaimed after its last lease expired: the job keeps crashing workers
+                self._fail(job, "exceeded max attempts (worker lease expired)")
+                return
+            if not job["payload_path"] or not os.path.exists(job["payload_path"]):
+                job["attempts"] = job["max_attempts"]
+                self._fail(job, f"payload not found: {job['payload_path']}")
+                return
+            process_resume_job(
+                processing_id=job_key,
+                job_id=str(job["job_id"]),
+                candidate_id=str(job["candidate_id"]),
+                payload_path=job["payload_path"],
+                filename=job["filename"],
+            )
+            self._complete(job)
+        except Exception as exc:
+            self._fail(job, f"{type(exc).__name__}: {exc}")
+        finally:
+            with self._lock:
+                self._in_flight.pop(job_key, None)
+
+    def _lease_keeper(self) -> None:
+        interval = max(1.0, self.lease_seconds / 3)
+        while not self._stopping.wait(interval):
+            try:
+                self._renew_leases()
+            except Exception:
+                # A missed renewal is retried next tick; the lease has slack for it
+                pass
+
+    def run(self) -> None:
+        threading.Thread(target=self._lease_keeper, name="lease-keeper", daemon=True).start()
+        while not self._stopping.is_set():
+            with self._lock:
+                free = self.concurrency - len(self._in_flight)
+            jobs = self.claim(free) if free > 0 else []
+            for job in jobs:
+                with self._lock:
+                    self._in_flight[str(job["id"])] = self._executor.submit(self._run_job, job)
+            if not jobs:
+                self._stopping.wait(self.poll_seconds)
+        self._executor.shutdown(wait=True)
+        shutdown_pdf_executor()
+
+    def stop(self, *_args) -> None:
+        self._stopping.set()
+
+
+def main() -> None:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="HireLoom processing worker")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("WORKER_CONCURRENCY") or DEFAULT_CONCURRENCY))
+    parser.add_argument("--lease-seconds", type=int, default=int(os.getenv("WORKER_LEASE_SECONDS") or DEFAULT_LEASE_SECONDS))
+    parser.add_argument("--poll-seconds", type=float, default=DEFAULT_POLL_SECONDS)
+    args = parser.parse_args()
+
+    worker = Worker(concurrency=args.concurrency, lease_seconds=args.lease_seconds, poll_seconds=args.poll_seconds)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import main
+
+
+async def test_app_starts_and_shuts_down_through_lifespan(monkeypatch):
+    calls = []
+
+    async def open_async_pool():
+        calls.append("open_async_pool")
+
+    async def close_async_pool():
+        calls.append("close_async_pool")
+
+    monkeypatch.setattr(main, "open_async_pool", open_async_pool)
+    monkeypatch.setattr(main, "close_async_pool", close_async_pool)
+    for name in ("start_invalidation_listener", "stop_invalidation_listener", "shutdown_executors",
+                 "shutdown_pdf_executor", "close_pool"):
+        monkeypatch.setattr(main, name, lambda name=name: calls.append(name))
+
+    app = main.main()
+    async with app.router.lifespan_context(app):
+        assert calls == ["open_async_pool", "start_invalidation_listener"]
+
+    assert calls[2:] == [
+        "stop_invalidation_listener", "shutdown_executors", "shutdown_pdf_executor", "close_async_pool", "close_pool",
+    ]
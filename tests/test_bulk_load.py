@@ -0,0 +1,68 @@
+import csv
+import io
+import struct
+import uuid
+
+import numpy as np
+import pytest
+
+from services.bulk_load import copy_chunks, encode_embeddings_copy_binary
+from services.chunking import Chunk
+
+
+class _RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def copy_expert(self, sql, buf):
+        self.statements.append((sql, buf.read()))
+
+
+def test_binary_copy_layout_matches_pgcopy_and_pgvector():
+    chunk_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+    vectors = np.array([[1.0, -2.5, 0.0], [0.25, 3.0, -1.0]], dtype=np.float32)
+
+    payload = encode_embeddings_copy_binary(chunk_ids, vectors, "m")
+
+    assert payload[:11] == b"PGCOPY\n\xff\r\n\x00"
+    assert struct.unpack(">ii", payload[11:19]) == (0, 0)
+    assert payload[-2:] == struct.pack(">h", -1)
+
+    offset = 19
+    for chunk_id, vector in zip(chunk_ids, vectors):
+        (nfields,) = struct.unpack_from(">h", payload, offset)
+        assert nfields == 4
+        offset += 2
+        assert struct.unpack_from(">i", payload, offset) == (16,)
+        assert payload[offset + 4 : offset + 20] == uuid.UUID(chunk_id).bytes
+        offset += 20
+        assert struct.unpack_from(">i", payload, offset) == (1,)
+        assert payload[offset + 4 : offset + 5] == b"m"
+        offset += 5
+        assert struct.unpack_from(">ii", payload, offset) == (4, 3)
+        offset += 8
+        # pgvector binary: int16 dim, int16 unused, then big-endian float4
+        assert struct.unpack_from(">ihh", payload, offset) == (4 + 4 * 3, 3, 0)
+        offset += 8
+        assert np.array_equal(np.frombuffer(payload, dtype=">f4", count=3, offset=offset), vector)
+        offset += 12
+    assert offset == len(payload) - 2
+
+
+def test_binary_copy_rejects_mismatched_vectors():
+    with pytest.raises(ValueError):
+        encode_embeddings_copy_binary([str(uuid.uuid4())], np.zeros((2, 3), dtype=np.float32), "m")
+
+
+def test_copy_chunks_writes_nulls_and_hex_hashes():
+    cur = _RecordingCursor()
+    chunks = [Chunk(content='says "hi", twice', section="skills", heading=None, position=0, token_count=4)]
+
+    chunk_ids = copy_chunks(cur, "doc", chunks, candidate_id="cand", content_hashes=[b"\x01\xab"])
+
+    sql, data = cur.statements[0]
+    assert "content_sha256" in sql
+    row = next(csv.reader(io.StringIO(data)))
+    assert row == [chunk_ids[0], "doc", "", "cand", "skills", "", 'says "hi", twice', "4", "0", "\\x01ab"]
+    # QUOTE_NOTNULL: None is written unquoted so COPY reads it as NULL
+    assert data.count(',,') == 2
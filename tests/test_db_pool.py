@@ -0,0 +1,144 @@
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+import pytest
+
+from services import db
+from services.db import ConnectionPool, PoolTimeoutError
+
+
+class _FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = 0
+        self.healthy = True
+        self.close_started = threading.Event()
+        self.close_delay = 0.0
+
+    def get_transaction_status(self):
+        return psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query):
+        if not self.healthy:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.close_started.set()
+        time.sleep(self.close_delay)
+        self.closed = 1
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    made = []
+
+    def connect(**kwargs):
+        made.append(_FakeConnection(len(made)))
+        return made[-1]
+
+    monkeypatch.setattr(db.psycopg2, "connect", connect)
+    return made
+
+
+def _pool(**kwargs):
+    options = {"min_size": 0, "max_size": 1, "checkout_timeout": 0.2, "healthcheck_idle": 60.0}
+    return ConnectionPool({"dsn": "fake"}, **{**options, **kwargs})
+
+
+def test_exhausted_pool_times_out(connections):
+    pool = _pool()
+    pool.getconn()
+
+    started = time.monotonic()
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn()
+
+    assert time.monotonic() - started >= 0.2
+    assert pool.stats()["timeouts"] == 1 and pool.stats()["in_use"] == 1
+
+
+def test_waiter_gets_the_connection_returned_to_an_exhausted_pool(connections):
+    pool = _pool(checkout_timeout=5.0)
+    conn = pool.getconn()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.getconn()))
+    waiter.start()
+    time.sleep(0.1)
+
+    pool.putconn(conn)
+    waiter.join(timeout=5)
+
+    assert got == [conn]
+    assert pool.stats()["waits"] == 1 and len(connections) == 1
+
+
+def test_discarded_connection_is_closed_and_replaced(connections):
+    pool = _pool()
+    first = pool.getconn()
+    pool.putconn(first, discard=True)
+
+    second = pool.getconn()
+
+    assert first.closed and second is not first
+    assert pool.stats()["connections_created"] == 2 and pool.stats()["connections_closed"] == 1
+
+
+def test_broken_idle_connection_is_replaced_on_checkout(connections):
+    pool = _pool()
+    first = pool.getconn()
+    pool.putconn(first)
+    first.closed = 2  # the server dropped it while idle
+
+    assert pool.getconn() is not first
+    assert pool.stats()["size"] == 1
+
+
+def test_failed_health_check_replaces_the_connection(connections):
+    pool = _pool(healthcheck_idle=0.0)
+    first = pool.getconn()
+    pool.putconn(first)
+    first.healthy = False
+
+    assert pool.getconn() is not first
+    assert first.closed and pool.stats()["healthcheck_failures"] == 1
+
+
+def test_foreign_connection_is_rejected(connections):
+    pool = _pool()
+    pool.getconn()
+    foreign = _FakeConnection(99)
+
+    with pytest.raises(ValueError):
+        pool.putconn(foreign)
+
+    assert not foreign.closed
+    assert pool.stats()["in_use"] == 1 and pool.stats()["connections_closed"] == 0
+
+
+def test_slow_close_does_not_block_checkouts(connections):
+    pool = _pool(max_size=2)
+    slow, other = pool.getconn(), pool.getconn()
+    slow.close_delay = 1.0
+    closer = threading.Thread(target=pool.putconn, args=(slow,), kwargs={"discard": True})
+    closer.start()
+    slow.close_started.wait(timeout=5)
+
+    started = time.monotonic()
+    pool.putconn(other)
+    assert pool.getconn() is other
+    assert time.monotonic() - started < 0.5
+    closer.join(timeout=5)
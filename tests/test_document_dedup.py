@@ -0,0 +1,47 @@
+import re
+import sys
+from pathlib import Path
+
+from services.document_dedup import is_same_document, text_sha256
+
+
+MIGRATIONS = Path(__file__).resolve().parent.parent / "migrations"
+MIGRATION = MIGRATIONS / "0012_document_hashes.sql"
+
+
+def _sql_whitespace_class() -> set:
+    pattern = re.search(r"'(\[[^']*\])\+'", MIGRATION.read_text()).group(1)
+    # The class only uses \uXXXX escapes, which Python's re reads the same way
+    return {chr(c) for c in range(sys.maxunicode + 1) if re.fullmatch(pattern, chr(c))}
+
+
+def test_text_sha256_ignores_whitespace_layout():
+    assert text_sha256("Senior  Engineer\n\n Python\tSQL ") == text_sha256("Senior Engineer Python SQL")
+    assert text_sha256("Senior Engineer") != text_sha256("SeniorEngineer")
+
+
+def test_text_sha256_treats_unicode_whitespace_as_whitespace():
+    assert text_sha256("Senior\u00a0Engineer\u2028Python") == text_sha256("Senior Engineer Python")
+
+
+def test_text_sha256_normalizes_composition():
+    assert text_sha256("Jose\u0301") == text_sha256("Jos\u00e9")
+
+
+def test_migration_backfill_splits_on_the_same_whitespace_as_python():
+    assert _sql_whitespace_class() == {chr(c) for c in range(sys.maxunicode + 1) if chr(c).isspace()}
+
+
+def test_hash_backfills_share_the_normalization_function():
+    for name in ("0012_document_hashes.sql", "0013_document_versions.sql"):
+        sql = "\n".join(line for line in (MIGRATIONS / name).read_text().splitlines() if not line.startswith("--"))
+        assert "\\s" not in sql
+        assert "normalized_text_sha256(" in sql
+
+
+def test_is_same_document_compares_bytes_or_text():
+    row = {"content_sha256": b"bytes", "text_sha256": memoryview(b"text")}
+    assert is_same_document(row, content_hash=b"bytes", text_hash=None)
+    assert is_same_document(row, content_hash=b"other", text_hash=b"text")
+    assert not is_same_document(row, content_hash=b"other", text_hash=b"other")
+    assert not is_same_document({"content_sha256": None, "text_sha256": None}, content_hash=b"bytes", text_hash=b"text")
@@ -0,0 +1,64 @@
+import numpy as np
+
+from services.embedding_cache import EmbeddingCache, EmbeddingLRU, cache_key, normalize_text
+
+
+def _vector(value: float, dim: int = 4) -> np.ndarray:
+    return np.full(dim, value, dtype=np.float32)
+
+
+def test_cache_key_ignores_whitespace_differences():
+    assert normalize_text(" Python  and\nSQL ") == "Python and SQL"
+    assert cache_key("m", "Python  and\nSQL") == cache_key("m", " Python and SQL ")
+    assert cache_key("m", "Python") != cache_key("other", "Python")
+
+
+def test_lru_evicts_least_recently_used_within_byte_budget():
+    entry = EmbeddingLRU._entry_size(b"a", _vector(0))
+    lru = EmbeddingLRU(max_bytes=2 * entry)
+    lru.put(b"a", _vector(1))
+    lru.put(b"b", _vector(2))
+    assert lru.get(b"a") is not None  # a is now most recent
+
+    lru.put(b"c", _vector(3))
+
+    assert lru.get(b"b") is None
+    assert lru.get(b"a") is not None and lru.get(b"c") is not None
+    assert lru.stats() == {"entries": 2, "bytes": 2 * entry, "max_bytes": 2 * entry, "evictions": 1}
+
+
+def test_lru_skips_entries_larger_than_budget_and_replaces_in_place():
+    lru = EmbeddingLRU(max_bytes=EmbeddingLRU._entry_size(b"a", _vector(0)))
+    lru.put(b"big", _vector(0, dim=64))
+    assert lru.get(b"big") is None
+
+    lru.put(b"a", _vector(1))
+    lru.put(b"a", _vector(2))
+    assert lru.get(b"a")[0] == 2
+    assert lru.stats()["evictions"] == 0
+
+
+def test_put_many_stores_independent_copies():
+    cache = EmbeddingCache(max_bytes=1 << 20, persistent=False)
+    batch = np.arange(12, dtype=np.float32).reshape(3, 4)
+    keys = [cache_key("m", t) for t in ("a", "b", "c")]
+
+    cache.put_many("m", keys, batch)
+    stored = cache.get_many(keys)
+
+    for key, row in zip(keys, batch):
+        assert stored[key].base is None
+        assert np.array_equal(stored[key], row)
+    assert cache.memory.stats()["bytes"] == sum(len(k) + 16 for k in keys)
+
+
+def test_get_many_counts_memory_hits_and_misses_without_persistence():
+    cache = EmbeddingCache(max_bytes=1 << 20, persistent=False)
+    cache.put_many("m", [b"k"], _vector(1)[None, :])
+
+    found = cache.get_many([b"k", b"missing"])
+
+    assert list(found) == [b"k"]
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["persistent_hits"], stats["misses"]) == (1, 0, 1)
+    assert normalize_text("a  b") == "a b"
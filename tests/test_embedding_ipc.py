@@ -0,0 +1,156 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from services import embedding_ipc
+from services.embedding_ipc import (
+    STATUS_ERROR,
+    STATUS_OK,
+    FrameTooLargeError,
+    RemoteEmbeddingBackend,
+    recv_exact,
+    recv_frame,
+    send_frame,
+)
+from services.embedding_worker import _handle_connection
+
+
+@pytest.fixture
+def pair():
+    a, b = socket.socketpair()
+    a.settimeout(5)
+    b.settimeout(5)
+    yield a, b
+    a.close()
+    b.close()
+
+
+def test_frames_round_trip(pair):
+    a, b = pair
+    for payload in (b"", b"model", json.dumps(["x" * 100_000]).encode()):
+        sender = threading.Thread(target=send_frame, args=(a, payload))
+        sender.start()
+        assert recv_frame(b) == payload
+        sender.join()
+
+
+def test_frame_arriving_in_pieces_is_reassembled(pair):
+    a, b = pair
+    wire = (5).to_bytes(4, "big") + b"hello"
+
+    def trickle():
+        for i in range(len(wire)):
+            a.sendall(wire[i : i + 1])
+            time.sleep(0.001)
+
+    threading.Thread(target=trickle).start()
+    assert recv_frame(b) == b"hello"
+
+
+def test_short_read_raises_connection_error(pair):
+    a, b = pair
+    a.sendall((10).to_bytes(4, "big") + b"only5")
+    a.shutdown(socket.SHUT_WR)
+
+    with pytest.raises(ConnectionError):
+        recv_frame(b)
+    with pytest.raises(ConnectionError):
+        recv_exact(b, 1)
+
+
+def test_oversized_frames_are_refused_both_ways(pair, monkeypatch):
+    a, b = pair
+    monkeypatch.setattr(embedding_ipc, "MAX_FRAME_BYTES", 8)
+
+    with pytest.raises(FrameTooLargeError):
+        send_frame(a, b"123456789")
+
+    a.sendall((2**31).to_bytes(4, "big"))
+    with pytest.raises(FrameTooLargeError):
+        recv_frame(b)
+
+
+class _Backend:
+    model_id = "test-model"
+
+
+class _Scheduler:
+    def embed(self, texts):
+        if "boom" in texts:
+            raise RuntimeError("model failed")
+        return np.array([[len(t), i] for i, t in enumerate(texts)], dtype=np.float32)
+
+
+def _read_response(sock):
+    status = recv_exact(sock, 1)[0]
+    if status == STATUS_ERROR:
+        return recv_frame(sock).decode()
+    assert status == STATUS_OK
+    rows, dim = embedding_ipc._SHAPE.unpack(recv_exact(sock, embedding_ipc._SHAPE.size))
+    return np.frombuffer(recv_exact(sock, rows * dim * 4), dtype="<f4").reshape(rows, dim)
+
+
+def test_worker_handler_serves_requests_and_errors_on_one_connection(pair):
+    client, server = pair
+    handler = threading.Thread(target=_handle_connection, args=(server, _Backend(), _Scheduler()))
+    handler.start()
+
+    assert recv_frame(client) == b"test-model"
+    send_frame(client, json.dumps(["ab", "cde"]).encode())
+    np.testing.assert_array_equal(_read_response(client), [[2, 0], [3, 1]])
+
+    send_frame(client, json.dumps(["boom"]).encode())
+    assert _read_response(client) == "RuntimeError: model failed"
+
+    send_frame(client, b"not json")
+    assert _read_response(client).startswith("invalid request")
+
+    send_frame(client, json.dumps(["still", "served"]).encode())
+    assert _read_response(client).shape == (2, 2)
+
+    client.shutdown(socket.SHUT_WR)
+    handler.join(timeout=5)
+    assert not handler.is_alive()
+
+
+def test_worker_handler_drops_a_connection_with_an_oversized_frame(pair, monkeypatch):
+    client, server = pair
+    monkeypatch.setattr(embedding_ipc, "MAX_FRAME_BYTES", 1024)
+    handler = threading.Thread(target=_handle_connection, args=(server, _Backend(), _Scheduler()))
+    handler.start()
+    recv_frame(client)
+
+    client.sendall((4096).to_bytes(4, "big"))
+    handler.join(timeout=5)
+
+    assert not handler.is_alive()
+    assert client.recv(1) == b""
+
+
+def test_remote_backend_round_trip_over_a_unix_socket():
+    path = os.path.join(tempfile.mkdtemp(), "embed.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+
+    def serve_one():
+        conn, _ = listener.accept()
+        _handle_connection(conn, _Backend(), _Scheduler())
+
+    threading.Thread(target=serve_one, daemon=True).start()
+    backend = RemoteEmbeddingBackend(path, timeout=5)
+    try:
+        assert backend.model_id == "test-model"
+        np.testing.assert_array_equal(backend.encode(["abcd"]), [[4, 0]])
+        with pytest.raises(embedding_ipc.EmbeddingWorkerError, match="model failed"):
+            backend.encode(["boom"])
+    finally:
+        backend._drop_socket()
+        listener.close()
+        os.remove(path)
@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+import pytest
+
+from services.embedding_scheduler import EmbeddingScheduler
+
+
+class _FakeModel:
+    """Encodes each text as [len(text), first char code]; the first call can be held."""
+
+    def __init__(self, hold_first: bool = False):
+        self.batches = []
+        self.first_started = threading.Event()
+        self.release = threading.Event()
+        if not hold_first:
+            self.release.set()
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.first_started.set()
+        self.release.wait(timeout=5)
+        return np.array([[len(t), ord(t[0])] for t in texts], dtype=np.float32)
+
+
+def test_requests_queued_behind_a_running_batch_share_the_next_batch():
+    model = _FakeModel(hold_first=True)
+    scheduler = EmbeddingScheduler(model, max_batch_size=64, max_wait_ms=50)
+    first = scheduler.submit(["warm"])
+    assert model.first_started.wait(timeout=5)
+
+    futures = [scheduler.submit([f"text-{i}" * (i + 1)]) for i in range(5)]
+    model.release.set()
+
+    assert first.result(timeout=5).shape == (1, 2)
+    results = [f.result(timeout=5) for f in futures]
+    assert len(model.batches) == 2
+    assert len(model.batches[1]) == 5
+    # Results go back to the right caller even though the batch is length-sorted
+    for i, vectors in enumerate(results):
+        assert vectors.tolist() == [[len(f"text-{i}" * (i + 1)), ord("t")]]
+    assert model.batches[1] == sorted(model.batches[1], key=len)
+
+
+def test_batches_close_at_max_batch_size_without_splitting_requests():
+    model = _FakeModel(hold_first=True)
+    scheduler = EmbeddingScheduler(model, max_batch_size=4, max_wait_ms=50)
+    scheduler.submit(["warm"])
+    assert model.first_started.wait(timeout=5)
+
+    futures = [scheduler.submit(["aa", "bb", "cc"]), scheduler.submit(["dd", "ee"]), scheduler.submit(["x"] * 6)]
+    model.release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert [len(b) for b in model.batches[1:]] == [3, 2, 6]
+
+
+def test_encode_errors_reach_every_caller_in_the_batch():
+    def failing(texts):
+        raise RuntimeError("model unavailable")
+
+    scheduler = EmbeddingScheduler(failing, max_batch_size=8, max_wait_ms=1)
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        scheduler.embed(["a"])
+    assert scheduler.stats()["batch_size"]["count"] >= 1
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api import routes
+from services import executors
+
+
+BLOCK_SECONDS = 0.3
+UPLOADS = 4
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("API_CPU_THREADS", str(UPLOADS))
+    monkeypatch.setenv("API_DB_THREADS", str(UPLOADS))
+    executors.shutdown_executors()
+
+    def extract_pdf(content):
+        time.sleep(BLOCK_SECONDS)
+        return SimpleNamespace(text=content.decode())
+
+    def ingest_resume(**kwargs):
+        time.sleep(BLOCK_SECONDS)
+        return "doc", 1, 1
+
+    async def fetch_candidate(query, params=None):
+        return {"id": params[0]}
+
+    monkeypatch.setattr(routes, "fetch_one", lambda query, params=None: {"ok": 1})
+    monkeypatch.setattr(routes, "find_current_duplicate", lambda **kwargs: None)
+    monkeypatch.setattr(routes, "extract_pdf", extract_pdf)
+    monkeypatch.setattr(routes, "ingest_resume", ingest_resume)
+    monkeypatch.setattr(routes.db_async, "fetch_one", fetch_candidate)
+
+    app = FastAPI()
+    app.include_router(routes.router)
+    yield httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    executors.shutdown_executors()
+
+
+async def _upload(client: httpx.AsyncClient, i: int) -> None:
+    response = await client.post(f"/candidates/c{i}/resumes:upload", files={"file": (f"{i}.pdf", f"resume {i}".encode())})
+    response.raise_for_status()
+    assert response.json() == {"document_id": "doc", "chunks": 1, "embedded": 1}
+
+
+async def test_uploads_overlap_and_polls_stay_responsive(client):
+    async with client:
+        started = time.perf_counter()
+        uploads = asyncio.gather(*(_upload(client, i) for i in range(UPLOADS)))
+
+        await asyncio.sleep(BLOCK_SECONDS / 3)
+        polled = time.perf_counter()
+        response = await client.get("/candidates/c0")
+        poll_seconds = time.perf_counter() - polled
+
+        await uploads
+        elapsed = time.perf_counter() - started
+
+    assert response.json() == {"id": "c0"}
+    # Serialized on the loop the uploads take UPLOADS * 2 * BLOCK_SECONDS and the poll waits behind them
+    assert elapsed < 2 * BLOCK_SECONDS * 1.5
+    assert poll_seconds < BLOCK_SECONDS / 2
+
+
+@pytest.mark.parametrize("upload", [{"files": {"file": ("jd.txt", b"")}}, {"files": {"file": ("jd.txt", b" \n\t")}},
+                                    {"data": {"text": "  "}}, {}])
+async def test_empty_jd_is_rejected_before_ingest(client, monkeypatch, upload):
+    monkeypatch.setattr(routes, "ingest_jd", lambda **kwargs: pytest.fail("empty JD ingested"))
+    async with client:
+        response = await client.post("/jobs/j1/jd:upload", data={"title": "Engineer", **upload.get("data", {})},
+                                     files=upload.get("files"))
+    assert "error" in response.json()
+
+
+async def test_jd_upload_ingests_the_decoded_file(client, monkeypatch):
+    ingested = {}
+    monkeypatch.setattr(routes, "ingest_jd", lambda **kwargs: ingested.update(kwargs) or ("doc", 2, 2))
+    async with client:
+        response = await client.post("/jobs/j1/jd:upload", data={"title": "Engineer"},
+                                     files={"file": ("jd.txt", "Requirements\nPython".encode())})
+    assert response.json() == {"document_id": "doc", "chunks": 2, "embedded": 2}
+    assert ingested == {"job_id": "j1", "title": "Engineer", "text": "Requirements\nPython"}
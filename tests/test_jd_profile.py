@@ -0,0 +1,83 @@
+import numpy as np
+
+from services import jd_profile, retrieval_cache
+from services.jd_profile import JDProfile
+
+
+def _profile(document_id):
+    return JDProfile(job_id="job", document_id=document_id, skills=["python"], domains=[], seniority="mid",
+                     embedding=np.zeros(4, dtype=np.float32))
+
+
+def test_cached_profile_is_replaced_when_another_process_ingests_a_new_jd(monkeypatch):
+    active = {"document_id": "doc-1"}
+    stored = {"profile": _profile("doc-1")}
+    monkeypatch.setattr(jd_profile, "_cache", jd_profile._ProfileCache())
+    monkeypatch.setattr(jd_profile, "_active_jd_document_id", lambda job_id: active["document_id"])
+    monkeypatch.setattr(jd_profile, "_load_jd_profile", lambda job_id: stored["profile"])
+    monkeypatch.setattr(jd_profile, "_rebuild_jd_profile", lambda job_id: None)
+
+    assert jd_profile.get_jd_profile("job").document_id == "doc-1"
+
+    # The worker ingests version 2 and saves its profile; this process's cache still holds version 1
+    active["document_id"] = "doc-2"
+    stored["profile"] = _profile("doc-2")
+    assert jd_profile.get_jd_profile("job").document_id == "doc-2"
+
+
+def test_stored_profile_of_an_older_version_is_rebuilt(monkeypatch):
+    monkeypatch.setattr(jd_profile, "_cache", jd_profile._ProfileCache())
+    monkeypatch.setattr(jd_profile, "_active_jd_document_id", lambda job_id: "doc-2")
+    monkeypatch.setattr(jd_profile, "_load_jd_profile", lambda job_id: _profile("doc-1"))
+    monkeypatch.setattr(jd_profile, "_rebuild_jd_profile", lambda job_id: _profile("doc-2"))
+
+    assert jd_profile.get_jd_profile("job").document_id == "doc-2"
+
+
+def test_cache_hits_skip_the_version_lookup_while_invalidations_are_heard(monkeypatch):
+    active = {"document_id": "doc-1"}
+    lookups = []
+
+    def active_jd_document_id(job_id):
+        lookups.append(job_id)
+        return active["document_id"]
+
+    monkeypatch.setattr(jd_profile, "_cache", jd_profile._ProfileCache())
+    monkeypatch.setattr(jd_profile, "invalidations_heard", lambda: True)
+    monkeypatch.setattr(jd_profile, "_active_jd_document_id", active_jd_document_id)
+    monkeypatch.setattr(jd_profile, "_load_jd_profile", lambda job_id: _profile(active["document_id"]))
+    monkeypatch.setattr(jd_profile, "_rebuild_jd_profile", lambda job_id: None)
+
+    assert jd_profile.get_jd_profile("job").document_id == "doc-1"
+    assert jd_profile.get_jd_profile("job").document_id == "doc-1"
+    assert lookups == ["job"]
+
+    # Another process re-ingests the JD; its commit notifies job:job
+    active["document_id"] = "doc-2"
+    retrieval_cache._publish({"job:other", "candidate:job", "global"})
+    assert jd_profile.get_jd_profile("job").document_id == "doc-1"
+    retrieval_cache._publish({"job:job", "global"})
+    assert jd_profile.get_jd_profile("job").document_id == "doc-2"
+    assert lookups == ["job", "job"]
+
+    # The listener reconnected and may have missed notifications
+    retrieval_cache._publish(None)
+    jd_profile.get_jd_profile("job")
+    assert lookups == ["job", "job", "job"]
+
+
+def test_profile_read_across_an_invalidation_is_not_cached(monkeypatch):
+    cache = jd_profile._ProfileCache()
+    monkeypatch.setattr(jd_profile, "_cache", cache)
+    monkeypatch.setattr(jd_profile, "invalidations_heard", lambda: True)
+    monkeypatch.setattr(jd_profile, "_active_jd_document_id", lambda job_id: "doc-1")
+    monkeypatch.setattr(jd_profile, "_rebuild_jd_profile", lambda job_id: None)
+
+    def load_jd_profile(job_id):
+        cache.invalidate({"job:job"})
+        return _profile("doc-1")
+
+    monkeypatch.setattr(jd_profile, "_load_jd_profile", load_jd_profile)
+
+    assert jd_profile.get_jd_profile("job").document_id == "doc-1"
+    assert cache.get("job") is None
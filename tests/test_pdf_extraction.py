@@ -0,0 +1,186 @@
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from services import pdf_extraction
+from services.pdf_extraction import (
+    PdfExtractionTimeout,
+    _deadline_alarm,
+    _page_ranges,
+    _plain_text_problem,
+    extract_pdf,
+    get_pdf_executor,
+)
+
+
+# Pool tasks are pickled by reference, so the stand-ins live at module level
+def _plain_with_problem(data, deadline):
+    with _deadline_alarm(deadline):
+        time.sleep(float(data))
+        return "plain", "too little text"
+
+
+def _slow_pages(data, pages, deadline):
+    with _deadline_alarm(deadline):
+        time.sleep(60)
+
+
+def _stuck_pages(data, pages, deadline):
+    # Like a worker inside MuPDF: the in-worker alarm never gets through
+    signal.signal(signal.SIGALRM, signal.SIG_IGN)
+    time.sleep(60)
+
+
+def _nap(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setenv("PDF_EXTRACT_PROCESSES", "2")
+    monkeypatch.setattr(pdf_extraction, "TIMEOUT_GRACE_SECONDS", 0.5)
+    monkeypatch.setattr(pdf_extraction, "_page_count", lambda data: 1)
+    monkeypatch.setattr(pdf_extraction, "_extract_plain", _plain_with_problem)
+    pdf_extraction.shutdown_pdf_executor()
+    yield get_pdf_executor()
+    pdf_extraction.shutdown_pdf_executor()
+
+
+def test_markdown_tier_gets_only_the_budget_the_plain_tier_left(pool, monkeypatch):
+    monkeypatch.setattr(pdf_extraction, "_extract_pages", _slow_pages)
+    sibling = pool.submit(_nap, 2.0)
+
+    started = time.monotonic()
+    with pytest.raises(PdfExtractionTimeout):
+        # The plain tier uses 1.2 s of 2 s; the page task must stop within the remaining 0.8 s
+        extract_pdf(b"1.2", timeout=2.0)
+
+    # The worker's own alarm fired: no recycle, so the other request still completes
+    assert time.monotonic() - started < 2.0 + pdf_extraction.TIMEOUT_GRACE_SECONDS
+    assert pdf_extraction._executor is pool
+    assert sibling.result(timeout=5) == 2.0
+
+
+def test_stuck_worker_recycles_the_pool(pool, monkeypatch):
+    monkeypatch.setattr(pdf_extraction, "_extract_pages", _stuck_pages)
+
+    with pytest.raises(PdfExtractionTimeout):
+        extract_pdf(b"0", mode="markdown", timeout=0.5)
+
+    assert pdf_extraction._executor is None
+    # Later submissions go to a fresh pool
+    assert get_pdf_executor() is not pool
+    assert get_pdf_executor().submit(_nap, 0).result(timeout=10) == 0
+
+
+PAGE = SimpleNamespace(width=600, height=800)
+RESUME = "Experience\n" + "Built ingestion pipelines. " * 8 + "\nSkills\n" + "Python, SQL, Postgres. " * 4
+# Blocks are (x0, y0, x1, y1, text, block_no, block_type)
+FULL_WIDTH = [(50, 50, 550, 750, RESUME, 0, 0)]
+TWO_COLUMNS = [(50, 50, 280, 700, "left", 0, 0), (320, 50, 550, 700, "right", 1, 0)]
+STACKED = [(50, 50, 280, 300, "top", 0, 0), (50, 350, 280, 700, "bottom", 1, 0)]
+SHORT_SIDE_BY_SIDE = [(50, 50, 280, 100, "name", 0, 0), (320, 50, 550, 100, "contact", 1, 0)]
+IMAGE_COLUMNS = [(50, 50, 280, 700, "", 0, 1), (320, 50, 550, 700, "", 1, 1)]
+
+
+class _Page:
+    def __init__(self, blocks):
+        self.rect = PAGE
+        self._blocks = blocks
+
+    def get_text(self, kind):
+        assert kind == "blocks"
+        return self._blocks
+
+
+class _Doc:
+    def __init__(self, *pages):
+        self._pages = [_Page(blocks) for blocks in pages]
+        self.page_count = len(self._pages)
+
+    def __iter__(self):
+        return iter(self._pages)
+
+
+@pytest.mark.parametrize(
+    "text, pages, problem",
+    [
+        (RESUME, [FULL_WIDTH], None),
+        ("", [FULL_WIDTH], "too little text"),
+        ("   \n" * 300, [FULL_WIDTH], "too little text"),
+        # The minimum scales with the page count
+        (RESUME, [FULL_WIDTH, FULL_WIDTH], "too little text"),
+        ("Built ingestion pipelines. " * 12, [FULL_WIDTH], "no section headings"),
+        (RESUME.replace("Skills", "Experience"), [FULL_WIDTH], "no section headings"),
+        (RESUME.lower().replace("skills", "Education"), [FULL_WIDTH], None),
+        (RESUME, [TWO_COLUMNS], "multi-column layout"),
+        (RESUME * 2, [FULL_WIDTH, TWO_COLUMNS], "multi-column layout"),
+        (RESUME, [STACKED], None),
+        (RESUME, [SHORT_SIDE_BY_SIDE], None),
+        (RESUME, [IMAGE_COLUMNS], None),
+    ],
+)
+def test_plain_text_problem(text, pages, problem):
+    assert _plain_text_problem(_Doc(*pages), text) == problem
+
+
+@pytest.mark.parametrize(
+    "page_count, ranges",
+    [
+        (0, [None]),
+        (1, [None]),
+        (7, [None]),
+        (8, [[0, 1, 2, 3], [4, 5, 6, 7]]),
+        (9, [[0, 1, 2, 3], [4, 5, 6, 7], [8]]),
+    ],
+)
+def test_page_ranges_split_at_the_threshold(monkeypatch, page_count, ranges):
+    monkeypatch.setenv("PDF_PARALLEL_MIN_PAGES", "8")
+    monkeypatch.setenv("PDF_PAGES_PER_TASK", "4")
+    assert _page_ranges(page_count) == ranges
+
+
+def test_page_ranges_cover_every_page_once(monkeypatch):
+    monkeypatch.setenv("PDF_PARALLEL_MIN_PAGES", "1")
+    monkeypatch.setenv("PDF_PAGES_PER_TASK", "3")
+    for page_count in range(1, 20):
+        ranges = _page_ranges(page_count)
+        assert [page for pages in ranges for page in pages] == list(range(page_count))
+        assert all(1 <= len(pages) <= 3 for pages in ranges)
+
+
+@pytest.mark.parametrize(
+    "mode, problem, tiers_run",
+    [
+        ("tiered", None, ["plain"]),
+        ("tiered", "multi-column layout", ["plain", "markdown"]),
+        ("plain", "too little text", ["plain"]),
+        ("markdown", None, ["markdown"]),
+    ],
+)
+def test_tier_selection(monkeypatch, mode, problem, tiers_run):
+    calls = []
+
+    def extract_plain(data, deadline):
+        calls.append("plain")
+        return "plain text", problem
+
+    def extract_markdown(data, deadline, timeout):
+        calls.append("markdown")
+        return "# markdown"
+
+    executor = ThreadPoolExecutor(1)
+    monkeypatch.setattr(pdf_extraction, "get_pdf_executor", lambda: executor)
+    monkeypatch.setattr(pdf_extraction, "_extract_plain", extract_plain)
+    monkeypatch.setattr(pdf_extraction, "_extract_markdown", extract_markdown)
+
+    result = extract_pdf(b"%PDF", mode=mode)
+    executor.shutdown()
+
+    assert calls == tiers_run
+    assert result.tier == tiers_run[-1]
+    assert result.text == {"plain": "plain text", "markdown": "# markdown"}[result.tier]
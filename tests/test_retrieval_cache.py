@@ -0,0 +1,109 @@
+import socket
+
+import psycopg2
+import pytest
+
+from services import retrieval_cache
+from services.retrieval_cache import TAG_GLOBAL, RetrievalCache, ingest_tags, search_tags
+
+
+@pytest.fixture
+def cache():
+    cache = RetrievalCache(max_entries=3)
+    cache.listening = True
+    return cache
+
+
+def test_tags_scope_searches_and_ingests_also_invalidate_global():
+    assert search_tags() == (TAG_GLOBAL,)
+    assert search_tags(job_id="j", candidate_id="c") == ("job:j", "candidate:c")
+    assert ingest_tags(candidate_id="c") == ("candidate:c", TAG_GLOBAL)
+    assert ingest_tags() == (TAG_GLOBAL,)
+
+
+def test_invalidate_removes_only_entries_with_the_tag(cache):
+    _, generation = cache.get("a")
+    cache.put("a", 1, search_tags(candidate_id="c1"), generation)
+    cache.put("b", 2, search_tags(candidate_id="c2"), generation)
+    cache.put("g", 3, search_tags(), generation)
+
+    assert cache.invalidate(ingest_tags(candidate_id="c1")) == 2
+
+    assert cache.get("a")[0] is None and cache.get("g")[0] is None
+    assert cache.get("b")[0] == 2
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_result_computed_across_an_invalidation_is_not_stored(cache):
+    _, generation = cache.get("a")
+    cache.invalidate(["candidate:other"])
+    cache.put("a", 1, ["candidate:c1"], generation)
+    assert cache.get("a")[0] is None
+
+    _, generation = cache.get("a")
+    cache.clear()
+    cache.put("a", 1, ["candidate:c1"], generation)
+    assert cache.get("a")[0] is None
+
+
+def test_lru_eviction_drops_tag_index_entries(cache):
+    _, generation = cache.get("x")
+    for key in ("a", "b", "c"):
+        cache.put(key, key, [f"candidate:{key}"], generation)
+    cache.get("a")
+    cache.put("d", "d", ["candidate:d"], generation)
+
+    assert cache.get("b")[0] is None and cache.get("a")[0] == "a"
+    assert cache.stats()["evictions"] == 1
+    assert "candidate:b" not in cache._by_tag
+
+
+def test_bypassed_while_not_listening(cache):
+    cache.listening = False
+    value, generation = cache.get("a")
+    cache.put("a", 1, ["global"], generation)
+
+    assert value is None
+    assert cache.stats()["entries"] == 0 and cache.bypassed == 1
+
+
+class _DeadConnection:
+    """Never readable, like a connection whose server went away silently."""
+
+    def __init__(self):
+        self._socket, self._peer = socket.socketpair()
+        self.notifies = []
+        self.closed = False
+
+    def fileno(self):
+        return self._socket.fileno()
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query):
+        if query == "SELECT 1":
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    def close(self):
+        self.closed = True
+        self._socket.close()
+        self._peer.close()
+
+
+def test_listener_probes_an_idle_connection_and_gives_it_up(cache, monkeypatch):
+    conn = _DeadConnection()
+    monkeypatch.setattr(retrieval_cache, "connect_unpooled", lambda: conn)
+    monkeypatch.setattr(retrieval_cache, "LISTENER_POLL_SECONDS", 0.01)
+
+    with pytest.raises(psycopg2.OperationalError):
+        retrieval_cache._InvalidationListener(cache)._listen()
+
+    assert conn.closed
+    assert cache.listening is False
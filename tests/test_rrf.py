@@ -0,0 +1,74 @@
+import pytest
+
+from services import retrieval
+from services.retrieval import SearchResults, rrf_hybrid_search_chunks
+
+
+VECTOR_HITS = [
+    {"chunk_id": "a", "content": "a", "similarity": 0.9},
+    {"chunk_id": "b", "content": "b", "similarity": 0.8},
+    {"chunk_id": "c", "content": "c", "similarity": 0.7},
+]
+TEXT_HITS = [
+    {"chunk_id": "c", "content": "c", "text_rank": 0.5},
+    {"chunk_id": "d", "content": "d", "text_rank": 0.4},
+    {"chunk_id": "a", "content": "a", "text_rank": 0.3},
+]
+
+
+@pytest.fixture
+def legs(monkeypatch):
+    calls = {}
+
+    def search_similar_chunks(*, query_vector, limit, **filters):
+        calls["vector"] = {"limit": limit, **filters}
+        return SearchResults([dict(h) for h in VECTOR_HITS[:limit]], "hnsw")
+
+    def search_lexical_chunks(*, query_text, limit, **filters):
+        calls["text"] = {"limit": limit, **filters}
+        return [dict(h) for h in TEXT_HITS[:limit]]
+
+    monkeypatch.setattr(retrieval, "search_similar_chunks", search_similar_chunks)
+    monkeypatch.setattr(retrieval, "search_lexical_chunks", search_lexical_chunks)
+    for name in ("HYBRID_RRF_K", "HYBRID_VECTOR_LIMIT", "HYBRID_TEXT_LIMIT"):
+        monkeypatch.delenv(name, raising=False)
+    return calls
+
+
+def test_fuses_both_legs_by_reciprocal_rank(legs):
+    rows = rrf_hybrid_search_chunks(query_vector=[0.0], query_text="q", limit=4, k=1)
+
+    assert [r["chunk_id"] for r in rows] == ["a", "c", "b", "d"]
+    assert rows.plan == "rrf+hnsw"
+    by_id = {r["chunk_id"]: r for r in rows}
+    assert by_id["a"]["rrf_score"] == pytest.approx(1 / 2 + 1 / 4)
+    assert by_id["c"]["rrf_score"] == pytest.approx(1 / 4 + 1 / 2)
+    assert (by_id["b"]["vector_position"], by_id["b"]["text_position"], by_id["b"]["text_rank"]) == (2, None, None)
+    assert (by_id["d"]["vector_position"], by_id["d"]["text_position"], by_id["d"]["similarity"]) == (None, 2, None)
+
+
+def test_truncates_to_limit_and_passes_filters_and_leg_limits(legs):
+    rows = rrf_hybrid_search_chunks(query_vector=[0.0], query_text="q", candidate_id="c1", limit=2)
+
+    assert len(rows) == 2
+    assert legs["vector"] == {"limit": 8, "job_id": None, "candidate_id": "c1", "section": None}
+    assert legs["text"]["limit"] == 8
+
+
+def test_explicit_zero_leg_limit_is_not_replaced_by_the_default(legs):
+    rows = rrf_hybrid_search_chunks(query_vector=[0.0], query_text="q", limit=3, text_limit=0)
+
+    assert legs["text"]["limit"] == 0
+    assert [r["chunk_id"] for r in rows] == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("k", [0, -5])
+def test_rejects_non_positive_k(legs, k):
+    with pytest.raises(ValueError, match="RRF k"):
+        rrf_hybrid_search_chunks(query_vector=[0.0], query_text="q", k=k)
+
+
+def test_rejects_non_positive_k_from_the_environment(legs, monkeypatch):
+    monkeypatch.setenv("HYBRID_RRF_K", "0")
+    with pytest.raises(ValueError, match="RRF k"):
+        rrf_hybrid_search_chunks(query_vector=[0.0], query_text="q")
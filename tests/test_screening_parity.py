@@ -0,0 +1,83 @@
+"""Bulk screening (NumPy over a batch) must score exactly like run_screening."""
+import numpy as np
+import pytest
+
+from services import bulk_screening, screening
+from services.candidate_features import CandidateFeatures
+from services.jd_profile import JDProfile
+
+
+JOB = {"title": "Backend Engineer", "team": "core", "seniority": "Senior", "location": "Berlin"}
+JD = JDProfile(
+    job_id="job",
+    document_id="jd-doc",
+    skills=["python", "postgresql", "docker", "aws"],
+    domains=["fintech", "saas"],
+    seniority="senior",
+    embedding=np.ones(4, dtype=np.float32),
+)
+CANDIDATES = {
+    "c-senior": ("Berlin, Germany", CandidateFeatures("c-senior", "d1", ["python", "docker", "go"], ["fintech"], 8.0, "senior", True)),
+    "c-junior": ("Remote", CandidateFeatures("c-junior", "d2", ["python"], [], 1.0, "junior", True)),
+    "c-mid": ("Paris", CandidateFeatures("c-mid", "d3", ["aws", "postgresql", "docker", "python"], ["saas", "fintech"], 4.5, "mid", True)),
+    "c-notext": (None, CandidateFeatures("c-notext", "d4", [], [], 0.0, "junior", False)),
+}
+HITS = {
+    "c-senior": [{"chunk_id": f"s{i}", "content": "x", "section": "experience", "heading": None, "similarity": s,
+                  "document_title": "cv"} for i, s in enumerate([0.81, 0.77, 0.7])],
+    "c-junior": [{"chunk_id": "j0", "content": "y", "section": "skills", "heading": None, "similarity": 0.52,
+                  "document_title": "cv"}],
+    "c-mid": [{"chunk_id": f"m{i}", "content": "z", "section": "projects", "heading": None, "similarity": s,
+               "document_title": "cv"} for i, s in enumerate([0.9, 0.61, 0.6, 0.55, 0.5, 0.49])],
+}
+
+
+@pytest.fixture
+def fake_data(monkeypatch):
+    stored = {}
+
+    def fetch_one(sql, params):
+        if "FROM jobs" in sql:
+            return JOB
+        location = CANDIDATES[params[0]][0]
+        return {"full_name": params[0], "location": location}
+
+    def fetch_one_commit(sql, params):
+        stored[params[0]] = params
+        return {"id": f"screening-{params[0]}"}
+
+    monkeypatch.setattr(screening, "fetch_one", fetch_one)
+    monkeypatch.setattr(screening, "fetch_one_commit", fetch_one_commit)
+    monkeypatch.setattr(screening, "get_jd_profile", lambda job_id: JD)
+    monkeypatch.setattr(screening, "get_candidate_features", lambda c: CANDIDATES[c][1])
+    monkeypatch.setattr(screening, "get_job_vector_index", lambda job_id: None)
+    monkeypatch.setattr(screening, "search_similar_chunks", lambda **kw: list(HITS.get(kw["candidate_id"], [])))
+
+    monkeypatch.setattr(
+        bulk_screening, "_load_batch",
+        lambda ids: ({c: CANDIDATES[c][0] for c in ids}, {c: CANDIDATES[c][1] for c in ids}),
+    )
+    monkeypatch.setattr(bulk_screening, "get_job_vector_index", lambda job_id: None)
+    monkeypatch.setattr(
+        bulk_screening, "search_similar_chunks_for_candidates",
+        lambda **kw: ((c, HITS[c][: kw["limit_per_candidate"]]) for c in kw["candidate_ids"] if c in HITS),
+    )
+    return stored
+
+
+def test_score_batch_matches_run_screening(fake_data):
+    batch = bulk_screening._score_batch(
+        job_id="job", job_seniority=JOB["seniority"], job_location=JOB["location"], jd_profile=JD,
+        candidate_ids=list(CANDIDATES),
+    )
+
+    assert [row[0] for row in batch] == list(CANDIDATES)
+    for candidate_id, job_id, score, summary, evidence in batch:
+        single = screening.run_screening(job_id="job", candidate_id=candidate_id)
+        _, _, single_score, single_summary, single_evidence = fake_data[candidate_id]
+        assert score == pytest.approx(single_score, abs=1e-9)
+        assert single["fit_score"] == round(score, 4)
+        assert summary == single_summary
+        batch_evidence, single_evidence = evidence.adapted, single_evidence.adapted
+        assert sorted(batch_evidence.pop("domain_match")) == sorted(single_evidence.pop("domain_match"))
+        assert batch_evidence == single_evidence
@@ -0,0 +1,164 @@
+import re
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+
+from services import retrieval
+from services.retrieval import (
+    _COARSE_DISTANCE,
+    MAX_EF_SEARCH,
+    PLAN_EXACT,
+    PLAN_HNSW,
+    PLAN_HNSW_ITERATIVE,
+    _ef_search,
+    choose_search_plan,
+    search_similar_chunks,
+)
+from services.retrieval_cache import RetrievalCache
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    for name in ("VECTOR_SEARCH_PLAN", "HNSW_ITERATIVE_SCAN", "HNSW_EF_SEARCH", "VECTOR_STORAGE_MODE", "VECTOR_RERANK_FACTOR"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_scoped_searches_scan_exactly():
+    assert choose_search_plan(candidate_id="c1") == PLAN_EXACT
+    assert choose_search_plan(job_id="j1", section="skills") == PLAN_EXACT
+
+
+def test_section_filter_uses_iterative_scan_unless_disabled(monkeypatch):
+    assert choose_search_plan(section="skills") == PLAN_HNSW_ITERATIVE
+    monkeypatch.setenv("HNSW_ITERATIVE_SCAN", "off")
+    assert choose_search_plan(section="skills") == PLAN_HNSW
+
+
+def test_unfiltered_search_uses_hnsw():
+    assert choose_search_plan() == PLAN_HNSW
+
+
+def test_forced_plan_overrides_the_heuristics(monkeypatch):
+    monkeypatch.setenv("VECTOR_SEARCH_PLAN", PLAN_HNSW)
+    assert choose_search_plan(candidate_id="c1") == PLAN_HNSW
+    monkeypatch.setenv("VECTOR_SEARCH_PLAN", "auto")
+    assert choose_search_plan(candidate_id="c1") == PLAN_EXACT
+
+
+def test_unknown_forced_plan_is_rejected(monkeypatch):
+    monkeypatch.setenv("VECTOR_SEARCH_PLAN", "ivfflat")
+    with pytest.raises(ValueError, match="ivfflat"):
+        choose_search_plan()
+
+
+def test_ef_search_widens_for_filtered_searches_within_the_cap(monkeypatch):
+    monkeypatch.setenv("HNSW_EF_SEARCH", "40")
+    assert _ef_search(5, filtered=False) == 40
+    assert _ef_search(50, filtered=False) == 100
+    assert _ef_search(50, filtered=True) == 200
+    assert _ef_search(10_000, filtered=True) == MAX_EF_SEARCH
+
+
+DIM = 768
+
+
+def _cosine(a, b):
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class _CompactIndexCursor:
+    """Runs the compact-storage query over an in-memory corpus.
+
+    The inner ORDER BY ranks by the coarse metric the SQL names (Hamming
+    distance of sign bits, or cosine on float16) and keeps the oversampled
+    LIMIT; the outer ORDER BY re-sorts those rows by exact similarity.
+    """
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self.statements = []
+        self._rows = []
+
+    def execute(self, sql, params):
+        self.statements.append((sql, params))
+        if "set_config" in sql:
+            return
+        query = np.asarray(params[0], dtype=np.float64)
+        scan_limit, limit = params[-2], params[-1]
+        if "<~>" in sql:
+            bits = query > 0
+            coarse = sorted(self.corpus, key=lambda i: int(np.count_nonzero((self.corpus[i] > 0) != bits)))
+        else:
+            half = query.astype(np.float16).astype(np.float64)
+            coarse = sorted(self.corpus, key=lambda i: -_cosine(self.corpus[i].astype(np.float16).astype(np.float64), half))
+        hits = [{"chunk_id": i, "similarity": _cosine(self.corpus[i], query)} for i in coarse[:scan_limit]]
+        self._rows = sorted(hits, key=lambda r: r["similarity"], reverse=True)[:limit]
+
+    def fetchall(self):
+        return self._rows
+
+
+@pytest.fixture
+def compact_search(monkeypatch):
+    rng = np.random.default_rng(7)
+    query = rng.standard_normal(DIM)
+    corpus = {f"random-{i}": rng.standard_normal(DIM) for i in range(200)}
+    # Near neighbours: the true top-k, a few sign bits away from the query
+    corpus.update({f"near-{i}": query + 0.3 * rng.standard_normal(DIM) for i in range(5)})
+    # Decoys share every sign bit with the query (Hamming distance 0) but are
+    # further away by cosine, so they lead the binary coarse ranking
+    corpus.update({f"decoy-{i}": np.sign(query) * rng.uniform(0.1, 3.0, DIM) for i in range(10)})
+    cursor = _CompactIndexCursor(corpus)
+
+    @contextmanager
+    def get_cursor(commit=True):
+        yield cursor
+
+    monkeypatch.setattr(retrieval, "get_cursor", get_cursor)
+    monkeypatch.setattr(retrieval, "get_retrieval_cache", lambda: RetrievalCache(0))
+    exact = sorted(corpus, key=lambda i: _cosine(corpus[i], query), reverse=True)
+    return cursor, query.tolist(), exact
+
+
+@pytest.mark.parametrize("storage, factor", [("halfvec", 2), ("binary", 8)])
+def test_compact_storage_walks_the_coarse_index_and_reranks_exactly(monkeypatch, compact_search, storage, factor):
+    cursor, query, exact = compact_search
+    monkeypatch.setenv("VECTOR_STORAGE_MODE", storage)
+
+    results = search_similar_chunks(query_vector=query, limit=5)
+
+    assert results.plan == f"{PLAN_HNSW}+{storage}"
+    assert set(exact[:5]) == {f"near-{i}" for i in range(5)}
+    assert [r["chunk_id"] for r in results] == exact[:5]
+
+    (ef_sql, ef_params), (sql, params) = cursor.statements
+    assert "hnsw.ef_search" in ef_sql and ef_params == (str(_ef_search(5 * factor, False)),)
+    assert f"ORDER BY {_COARSE_DISTANCE[storage]}" in sql
+    assert re.search(r"\) coarse\s+ORDER BY similarity DESC\s+LIMIT %s\s*$", sql)
+    assert params == (query, query, 5 * factor, 5)
+
+
+def test_binary_rerank_needs_the_oversampled_set(monkeypatch, compact_search):
+    cursor, query, exact = compact_search
+    monkeypatch.setenv("VECTOR_STORAGE_MODE", "binary")
+
+    # Without oversampling the coarse top-5 is all decoys
+    monkeypatch.setenv("VECTOR_RERANK_FACTOR", "1")
+    assert all(r["chunk_id"].startswith("decoy-") for r in search_similar_chunks(query_vector=query, limit=5))
+
+    monkeypatch.delenv("VECTOR_RERANK_FACTOR")
+    assert [r["chunk_id"] for r in search_similar_chunks(query_vector=query, limit=5)] == exact[:5]
+
+
+def test_scoped_search_stays_exact_under_compact_storage(monkeypatch, compact_search):
+    cursor, query, _ = compact_search
+    monkeypatch.setenv("VECTOR_STORAGE_MODE", "binary")
+    cursor.execute = lambda sql, params: cursor.statements.append((sql, params))
+
+    results = search_similar_chunks(query_vector=query, candidate_id="c1", limit=5)
+
+    assert results.plan == PLAN_EXACT
+    [(sql, params)] = cursor.statements
+    assert "<~>" not in sql and "halfvec" not in sql
+    assert params == ("c1", query, query, 5)
@@ -0,0 +1,123 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from services import vector_index
+from services.embeddings import EMBEDDING_DIMENSION
+from services.vector_index import JobVectorIndex, VectorIndexRegistry
+
+
+def _records(candidate_id, n, seed, document="d1"):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "candidate_id": candidate_id,
+            "chunk_id": f"{candidate_id}-{document}-{i}",
+            "content": f"{candidate_id} chunk {i}",
+            "section": "skills" if i % 2 else "experience",
+            "heading": None,
+            "document_title": document,
+            "vector": rng.standard_normal(EMBEDDING_DIMENSION).astype(np.float32),
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    state = {"documents": {"a": "d1", "b": "d1"}, "records": {"a": _records("a", 4, 0), "b": _records("b", 3, 1)}}
+    monkeypatch.setattr(vector_index, "_active_resumes", lambda job_id: dict(state["documents"]))
+    monkeypatch.setattr(
+        vector_index, "_resume_documents", lambda ids: {c: state["documents"].get(c) for c in ids}
+    )
+
+    def load_records(candidate_ids):
+        state["lock_held_during_load"] = state.get("index") is not None and state["index"]._lock.locked()
+        return [r for c in candidate_ids for r in state["records"].get(c, [])]
+
+    monkeypatch.setattr(vector_index, "_load_records", load_records)
+    monkeypatch.setenv("VECTOR_INDEX_REVALIDATE_SECONDS", "3600")
+    return state
+
+
+def test_top_k_per_candidate_matches_brute_force(db):
+    index = JobVectorIndex("job")
+    index.load()
+    query = np.random.default_rng(7).standard_normal(EMBEDDING_DIMENSION).astype(np.float32)
+
+    hits = index.top_k_per_candidate(query, ["a", "b"], 2)
+
+    for candidate_id, records in db["records"].items():
+        vectors = np.array([r["vector"] for r in records])
+        similarity = vectors @ query / np.linalg.norm(vectors, axis=1) / np.linalg.norm(query)
+        expected = [records[i]["chunk_id"] for i in np.argsort(-similarity)[:2]]
+        assert [h["chunk_id"] for h in hits[candidate_id]] == expected
+        assert hits[candidate_id][0]["similarity"] == pytest.approx(similarity.max(), abs=1e-5)
+
+
+def test_stale_candidate_is_reloaded_outside_the_lock(db):
+    index = JobVectorIndex("job")
+    db["index"] = index
+    index.load()
+    bytes_before = index.nbytes
+
+    db["documents"]["a"] = "d2"
+    db["records"]["a"] = _records("a", 2, 3, document="d2")
+    index.mark_stale("a")
+    hits = index.top_k_per_candidate(np.ones(EMBEDDING_DIMENSION), ["a", "b"], 10)
+
+    assert db["lock_held_during_load"] is False
+    assert {h["document_title"] for h in hits["a"]} == {"d2"} and len(hits["a"]) == 2
+    assert len(hits["b"]) == 3
+    assert len(index) == 5 and index.candidate_reloads == 1
+    assert index.nbytes < bytes_before
+
+
+def test_new_applicant_is_loaded_on_first_query(db):
+    index = JobVectorIndex("job")
+    index.load()
+    db["documents"]["c"] = "d1"
+    db["records"]["c"] = _records("c", 2, 4)
+
+    hits = index.top_k_per_candidate(np.ones(EMBEDDING_DIMENSION), ["c"], 5)
+
+    assert len(hits["c"]) == 2 and len(index) == 9
+
+
+def test_registry_skips_jobs_estimated_over_budget_without_loading(monkeypatch):
+    monkeypatch.setattr(vector_index, "fetch_all", lambda sql, params: [{"applicants": 500, "chunks": 1000}])
+    monkeypatch.setattr(JobVectorIndex, "load", lambda self: pytest.fail("job loaded despite its estimated size"))
+
+    registry = VectorIndexRegistry(max_bytes=1000 * EMBEDDING_DIMENSION * 4 - 1, min_applicants=200)
+
+    assert registry.get("job") is None
+    assert registry.loads == 0
+
+
+def test_registry_keeps_load_slots_only_while_loads_are_in_flight(monkeypatch, db):
+    applicants = {"hot": 500, "cold": 1}
+    started, release = threading.Event(), threading.Event()
+
+    def fetch_size(sql, params):
+        started.set()
+        release.wait(5)
+        return [{"applicants": applicants[params[0]], "chunks": 7}]
+
+    monkeypatch.setattr(vector_index, "fetch_all", fetch_size)
+    registry = VectorIndexRegistry(max_bytes=10 * 1024 * 1024, min_applicants=200)
+
+    with ThreadPoolExecutor(4) as pool:
+        gets = [pool.submit(registry.get, "hot") for _ in range(4)]
+        started.wait(5)
+        assert list(registry._loading) == ["hot"]
+        release.set()
+        indexes = {id(f.result(timeout=5)) for f in gets}
+
+    assert len(indexes) == 1 and registry.loads == 1
+    assert registry.get("cold") is None
+    monkeypatch.setattr(vector_index, "fetch_all", lambda sql, params: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        registry.get("failing")
+    assert registry._loading == {}
@@ -0,0 +1,193 @@
+from contextlib import contextmanager
+
+import pytest
+
+from services import worker as worker_module
+from services.worker import BACKOFF_MAX_SECONDS, Worker, _backoff_seconds
+
+
+class _Queue:
+    """processing_jobs in memory, applying the worker's statements by their SET clause."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.rows = {}
+        self.rowcount = 0
+        self._result = []
+
+    def add(self, job_id, payload_path, max_attempts=3):
+        self.rows[job_id] = {
+            "id": job_id, "job_id": "job", "candidate_id": "cand", "filename": "cv.pdf", "payload_path": payload_path,
+            "status": "queued", "attempts": 0, "max_attempts": max_attempts, "run_after": 0.0,
+            "locked_by": None, "lease_expires_at": None, "error_message": None,
+        }
+
+    def _owned(self, job_id, worker_id):
+        row = self.rows.get(job_id)
+        return [row] if row is not None and row["locked_by"] == worker_id else []
+
+    def execute(self, query, params):
+        q = " ".join(query.split())
+        matched = []
+        if "SET status = 'running'" in q:
+            worker_id, lease, limit = params
+            claimable = [
+                r for r in self.rows.values()
+                if (r["status"] == "queued" and r["run_after"] <= self.now)
+                or (r["status"] == "running" and r["lease_expires_at"] < self.now)
+            ]
+            for r in sorted(claimable, key=lambda r: r["run_after"])[:limit]:
+                r.update(status="running", attempts=r["attempts"] + 1, locked_by=worker_id,
+                         lease_expires_at=self.now + lease)
+                matched.append(r)
+        elif "SET status = 'done'" in q:
+            for r in self._owned(*params):
+                r.update(status="done", locked_by=None, lease_expires_at=None, error_message=None)
+                matched.append(r)
+        elif "SET status = 'queued'" in q:
+            error, backoff, job_id, worker_id = params
+            for r in self._owned(job_id, worker_id):
+                r.update(status="queued", error_message=error, run_after=self.now + backoff, locked_by=None,
+                         lease_expires_at=None)
+                matched.append(r)
+        elif "SET status = 'error'" in q:
+            error, job_id, worker_id = params
+            for r in self._owned(job_id, worker_id):
+                r.update(status="error", error_message=error, locked_by=None, lease_expires_at=None)
+                matched.append(r)
+        elif "SET lease_expires_at" in q:
+            lease, ids, worker_id = params
+            for job_id in ids:
+                for r in self._owned(job_id, worker_id):
+                    if r["status"] == "running":
+                        r["lease_expires_at"] = self.now + lease
+                        matched.append(r)
+        else:
+            raise AssertionError(f"unexpected statement: {q}")
+        self.rowcount = len(matched)
+        self._result = [{k: r[k] for k in ("id", "job_id", "candidate_id", "attempts", "max_attempts",
+                                            "payload_path", "filename")} for r in matched]
+
+    def fetchall(self):
+        return self._result
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    queue = _Queue()
+
+    @contextmanager
+    def get_cursor(commit=True):
+        yield queue
+
+    monkeypatch.setattr(worker_module, "get_cursor", get_cursor)
+    monkeypatch.setattr(worker_module, "execute", lambda query, params=None: queue.execute(query, params))
+    return queue
+
+
+def _worker(worker_id):
+    worker = Worker(concurrency=2, lease_seconds=60, poll_seconds=0.01)
+    worker.worker_id = worker_id
+    return worker
+
+
+def _payload(tmp_path, name="j1"):
+    path = tmp_path / f"{name}.pdf"
+    path.write_bytes(b"%PDF")
+    return str(path)
+
+
+def test_backoff_doubles_up_to_the_cap():
+    assert [_backoff_seconds(n) for n in (1, 2, 3, 4)] == [10, 20, 40, 80]
+    assert _backoff_seconds(0) == 10
+    assert _backoff_seconds(30) == BACKOFF_MAX_SECONDS
+
+
+def test_claim_skips_jobs_before_run_after_and_respects_limit(queue, tmp_path):
+    for job_id in ("j1", "j2", "j3"):
+        queue.add(job_id, _payload(tmp_path, job_id))
+    queue.rows["j3"]["run_after"] = 100.0
+
+    claimed = _worker("w1").claim(5)
+
+    assert sorted(r["id"] for r in claimed) == ["j1", "j2"]
+    assert queue.rows["j1"]["status"] == "running" and queue.rows["j1"]["attempts"] == 1
+    assert _worker("w2").claim(5) == []
+
+
+def test_successful_job_is_done_and_its_payload_removed(queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(worker_module, "process_resume_job", lambda **kwargs: None)
+    path = _payload(tmp_path)
+    queue.add("j1", path)
+    worker = _worker("w1")
+
+    worker._run_job(worker.claim(1)[0])
+
+    assert queue.rows["j1"]["status"] == "done"
+    assert not (tmp_path / "j1.pdf").exists()
+
+
+def test_failures_back_off_then_error_at_max_attempts(queue, tmp_path, monkeypatch):
+    def process_resume_job(**kwargs):
+        raise RuntimeError("extraction failed")
+
+    monkeypatch.setattr(worker_module, "process_resume_job", process_resume_job)
+    path = _payload(tmp_path)
+    queue.add("j1", path, max_attempts=2)
+    worker = _worker("w1")
+
+    worker._run_job(worker.claim(1)[0])
+    row = queue.rows["j1"]
+    assert (row["status"], row["run_after"], row["error_message"]) == ("queued", 10, "RuntimeError: extraction failed")
+    assert worker.claim(1) == []  # still backing off
+
+    queue.now = 10
+    worker._run_job(worker.claim(1)[0])
+    assert (row["status"], row["attempts"]) == ("error", 2)
+    assert not (tmp_path / "j1.pdf").exists()
+
+
+def test_expired_lease_is_reclaimed_and_the_old_owner_cannot_finish(queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(worker_module, "process_resume_job", lambda **kwargs: None)
+    path = _payload(tmp_path)
+    queue.add("j1", path)
+    first, second = _worker("w1"), _worker("w2")
+    stale = first.claim(1)[0]
+
+    queue.now = 61  # w1 stopped renewing
+    reclaimed = second.claim(1)[0]
+    assert (reclaimed["attempts"], queue.rows["j1"]["locked_by"]) == (2, "w2")
+
+    first._complete(stale)
+    assert queue.rows["j1"]["status"] == "running"
+    assert (tmp_path / "j1.pdf").exists()  # w2 still needs it
+
+    second._run_job(reclaimed)
+    assert queue.rows["j1"]["status"] == "done"
+
+
+def test_renewal_extends_only_this_workers_leases(queue, tmp_path):
+    queue.add("j1", _payload(tmp_path))
+    worker = _worker("w1")
+    worker.claim(1)
+    worker._in_flight["j1"] = None
+
+    queue.now = 50
+    worker._renew_leases()
+    assert queue.rows["j1"]["lease_expires_at"] == 110
+
+    queue.now = 100
+    assert _worker("w2").claim(1) == []
+
+
+def test_job_reclaimed_past_max_attempts_is_failed_without_running(queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(worker_module, "process_resume_job", lambda **kwargs: pytest.fail("ran a crashing job again"))
+    queue.add("j1", _payload(tmp_path), max_attempts=1)
+    worker = _worker("w1")
+    worker.claim(1)
+
+    queue.now = 61
+    worker._run_job(worker.claim(1)[0])
+
+    assert queue.rows["j1"]["status"] == "error"
+    assert queue.rows["j1"]["error_message"] == "exceeded max attempts (worker lease expired)"